@@ -2,14 +2,19 @@
 # Exceptions. See /LICENSE for license information.
 # SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
 
+from __future__ import annotations
+
 import argparse
 import ast
+import concurrent.futures
+import importlib
 import os
 import pathlib
 import subprocess
 import sys
 
 from tapl_lang.__about__ import __version__
+from tapl_lang.core import parser
 from tapl_lang.lib.compiler import compile_tapl
 
 # If you want to install it in editable mode for development,
@@ -17,14 +22,28 @@ from tapl_lang.lib.compiler import compile_tapl
 # pip install -e .
 
 
-def compile_and_run(path: str) -> None:
+def write_profile(profile: parser.ParseProfile, path: str, profile_format: str) -> None:
+    """
+    Writes the parser profile as JSON, or as folded stacks for flamegraph tools.
+    """
+    output = profile.to_folded_stacks() if profile_format == 'folded' else profile.to_json()
+    pathlib.Path(path).write_text(output)
+
+
+def compile_and_run(path: str, *, profile_path: str | None = None, profile_format: str = 'json', jobs: int = 1) -> None:
     """
-    Compiles the TAPL file at the given path.
+    Compiles the TAPL file at the given path, parsing it with a pool of jobs processes when jobs is more than 1.
     """
     absolute_path = os.path.abspath(path)
     p = pathlib.Path(absolute_path)
-    source = p.read_text()
-    layers = compile_tapl(source)
+    profile = parser.ParseProfile() if profile_path else None
+    if jobs > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            layers = compile_tapl(p, profile=profile, executor=executor)
+    else:
+        layers = compile_tapl(p, profile=profile)
+    if profile is not None and profile_path is not None:
+        write_profile(profile, profile_path, profile_format)
     dir_path = os.path.dirname(absolute_path)
     for i in reversed(range(len(layers))):
         suffix = i if i else ''
@@ -37,24 +56,76 @@ def compile_and_run(path: str) -> None:
             sys.exit(result.returncode)
 
 
-def main():
+def format_grammar_stats(grammar: parser.CompiledGrammar) -> str:
+    """
+    Formats the static analysis of the grammar, listing the rules of each set.
+    """
+    analysis = grammar.analysis
+    lines = [f'rules: {len(grammar.rule_names)}']
+    for title, rules in [
+        ('empty', analysis.empty_rules),
+        ('undefined', analysis.undefined_rules),
+        ('unreachable', analysis.unreachable_rules),
+        ('nullable', analysis.nullable_rules),
+        ('left recursive', analysis.left_recursive_rules),
+    ]:
+        lines.append(f'{title} rules: {len(rules)}')
+        lines.extend(f'  {rule}' for rule in sorted(rules))
+    lines.append(f'dropped aliases: {analysis.dropped_aliases}')
+    lines.append(f'opaque parse functions: {len(analysis.opaque_functions)}')
+    lines.extend(f'  {name}' for name in analysis.opaque_functions)
+    return '\n'.join(lines)
+
+
+def grammar_stats(argv: list[str]) -> None:
+    """
+    Prints the static analysis of the grammar of a language.
+    """
+    arg_parser = argparse.ArgumentParser(
+        prog='tapl grammar-stats',
+        description='Prints the empty, unreachable, nullable and left recursive rules of a language grammar.',
+    )
+    arg_parser.add_argument('language', nargs='?', default='pythonlike', help='name of the language')
+    args = arg_parser.parse_args(argv)
+    language = importlib.import_module(f'tapl_language.{args.language}').get_language()
+    print(format_grammar_stats(language.get_grammar([])))
+
+
+def main(argv: list[str] | None = None):
     """
     Main function for the CLI application.
     """
-    parser = argparse.ArgumentParser(
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ['grammar-stats']:
+        grammar_stats(argv[1:])
+        return
+    arg_parser = argparse.ArgumentParser(
         prog='tapl',
         description='TAPL compiler CLI — compiles and runs .tapl source files.',
     )
-    parser.add_argument(
+    arg_parser.add_argument(
         '-v',
         '--version',
         action='version',
         version=f'%(prog)s {__version__}',
     )
-    parser.add_argument('file', type=str, help='path to a .tapl source file')
-    args = parser.parse_args()
+    arg_parser.add_argument('file', type=str, help='path to a .tapl source file')
+    arg_parser.add_argument('--profile', type=str, metavar='PATH', help='write a parser profile to PATH')
+    arg_parser.add_argument(
+        '--profile-format',
+        choices=['json', 'folded'],
+        default='json',
+        help='format of the parser profile: per-rule counters as JSON, or folded stacks for flamegraphs',
+    )
+    arg_parser.add_argument(
+        '-j', '--jobs', type=int, default=1, help='number of processes parsing the top-level chunks in parallel'
+    )
+    args = arg_parser.parse_args(argv)
+    if args.profile and args.jobs > 1:
+        arg_parser.error('--profile cannot be used with --jobs greater than 1, the parsing processes do not share it')
 
-    compile_and_run(args.file)
+    compile_and_run(args.file, profile_path=args.profile, profile_format=args.profile_format, jobs=args.jobs)
 
 
 if __name__ == '__main__':
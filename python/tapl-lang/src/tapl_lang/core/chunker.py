@@ -4,68 +4,126 @@
 
 from __future__ import annotations
 
+import mmap
+from collections.abc import Iterable, Iterator, Sequence
+
 from tapl_lang.core import line_record, tapl_error
 
 
 class Chunk:
-    def __init__(self, line_records: list[line_record.LineRecord], children: list[Chunk]) -> None:
-        self.line_records = line_records
-        self.children = children
+    """Lines of a chunk and the chunks nested in it.
 
+    The lines are a view of the range [start, end) of line records shared by all the chunks of a text, so chunking
+    does not copy them. The line_records method returns a copy of the range, so callers bind it once.
+    """
 
-def min_indentation(line_records: list[line_record.LineRecord]) -> int | None:
-    min_indent = None
-    for line in line_records:
-        if line.empty:
-            continue
-        if min_indent is None:
-            min_indent = line.indent
-        elif line.indent is not None:
-            min_indent = min(min_indent, line.indent)
-    return min_indent
+    __slots__ = ('children', 'end', 'records', 'start')
 
+    def __init__(
+        self,
+        line_records: Sequence[line_record.LineRecord],
+        children: list[Chunk],
+        start: int = 0,
+        end: int | None = None,
+    ) -> None:
+        self.records = line_records
+        self.start = start
+        self.end = len(line_records) if end is None else end
+        self.children = children
 
-def get_same_indent_indexes(line_records: list[line_record.LineRecord], indent: int) -> list[int]:
-    result = [i for i in range(len(line_records)) if line_records[i].indent == indent]
-    first_non_empty = next((i for i in range(len(line_records)) if not line_records[i].empty), None)
-    if len(result) > 0 and result[0] != first_non_empty:
-        raise tapl_error.TaplError('First line should have the same indent as the given indent.')
-    return result
+    def line_records(self) -> list[line_record.LineRecord]:
+        """Returns a copy of the lines of the chunk."""
+        return list(self.records[self.start : self.end])
 
+    @property
+    def nested_end(self) -> int:
+        """Returns the end of the range of the lines of the chunk and of the chunks nested in it."""
+        last = self
+        while last.children:
+            last = last.children[-1]
+        return last.end
 
-def find_first_ends_with_colon(line_records: list[line_record.LineRecord]) -> int | None:
-    for i in range(len(line_records)):
-        if line_records[i].ends_with_colon:
-            return i
-    return None
+    def nested_line_records(self) -> list[line_record.LineRecord]:
+        """Returns a copy of the lines of the chunk and of the chunks nested in it, which are chunked back into it."""
+        return list(self.records[self.start : self.nested_end])
 
 
 class Chunker:
-    def decode_chunk(self, line_records: list[line_record.LineRecord]) -> Chunk:
-        index = find_first_ends_with_colon(line_records)
-        if index is not None:
-            children_start_index = index + 1
-            children = self.decode_chunks(line_records[children_start_index:])
-            return Chunk(line_records[:children_start_index], children)
-        return Chunk(line_records, [])
-
-    def decode_chunks(self, line_records: list[line_record.LineRecord]) -> list[Chunk]:
-        min_indent = min_indentation(line_records)
-        # If all line records are empty
-        if min_indent is None:
-            return []
-        indexes = get_same_indent_indexes(line_records, min_indent)
+    """Splits line records into chunks in a single pass, with a stack of the regions of nested chunks.
+
+    A region holds the chunks starting at the indentation of its first non-empty line, e.g. the body of a chunk whose
+    header ends with a colon. A chunk extends over the more indented lines which follow it, until one of them ends
+    with a colon. The lines after it, up to the next line indented as much as the chunk or less, are its children.
+    """
+
+    def decode_chunks(self, line_records: Sequence[line_record.LineRecord]) -> list[Chunk]:
+        # The lines of a LineStore are read from its columns, without creating their records. Empty lines are -1.
+        line_indents: Iterable[int]
+        line_colons: Iterable[int | bool]
+        if isinstance(line_records, line_record.LineStore):
+            line_indents = line_records.indents
+            line_colons = (flags & line_record.ENDS_WITH_COLON for flags in line_records.flags)
+        else:
+            line_indents = (-1 if (line_indent := line.indent) is None else line_indent for line in line_records)
+            line_colons = (line.ends_with_colon for line in line_records)
         chunks: list[Chunk] = []
-        for i in range(len(indexes)):
-            start_index = indexes[i]
-            if i + 1 < len(indexes):
-                end_index = indexes[i + 1]
+        # The chunks and the indentation of each open region, from the outermost. The indentations are preceded by
+        # -1 for the text around the outermost region, and are -1 until the first non-empty line of their region.
+        # The last chunk of the innermost region is open.
+        regions = [chunks]
+        indents = [-1, -1]
+        for index, (indent, colon) in enumerate(zip(line_indents, line_colons)):
+            if indent < 0:
+                # Empty lines extend the open chunk. The ones before the first chunk of a region are dropped.
+                if regions[-1]:
+                    regions[-1][-1].end = index + 1
+                continue
+            # A line indented no more than the chunk holding a region closes the region.
+            while indent <= indents[-2]:
+                regions.pop()
+                indents.pop()
+            if indents[-1] < 0 or indent == indents[-1]:
+                indents[-1] = indent
+                regions[-1].append(Chunk(line_records, [], index, index + 1))
+            elif indent > indents[-1]:
+                regions[-1][-1].end = index + 1
             else:
-                end_index = len(line_records)
-            chunk = self.decode_chunk(line_records[start_index:end_index])
-            chunks.append(chunk)
+                raise tapl_error.TaplError('First line should have the same indent as the given indent.')
+            if colon:
+                regions.append(regions[-1][-1].children)
+                indents.append(-1)
         return chunks
 
 
-def chunk_text(text: str) -> list[Chunk]:
-    return Chunker().decode_chunks(line_record.split_text_to_lines(text))
+def chunk_text(text: str | bytes | mmap.mmap) -> list[Chunk]:
+    """Chunks a text, or a UTF-8 encoded text whose lines are decoded when their chunk is read."""
+    return Chunker().decode_chunks(line_record.LineStore(text))
+
+
+def chunk_stream(lines: Iterable[str]) -> Iterator[Chunk]:
+    """Yields the top-level chunks of the lines of a text, e.g. of an open file, reading the lines lazily.
+
+    A chunk is yielded as soon as the next top-level line closes it, so only the lines of one top-level chunk are held
+    at a time. The chunks are the same as those of chunk_text, but an indentation error is raised after the chunks
+    preceding it were yielded.
+    """
+    line_records: list[line_record.LineRecord] = []
+    top_indent: int | None = None
+    line_number = 0
+    for line in lines:
+        # Files split lines only on line feeds, unlike str.splitlines.
+        for text in line.splitlines(keepends=True):
+            line_number += 1
+            if line_record.is_comment_line(text):
+                continue
+            record = line_record.LineRecord(line_number, text)
+            if record.indent is not None:
+                if top_indent is None:
+                    top_indent = record.indent
+                elif record.indent < top_indent:
+                    raise tapl_error.TaplError('First line should have the same indent as the given indent.')
+                elif record.indent == top_indent:
+                    yield from Chunker().decode_chunks(line_records)
+                    line_records = []
+            line_records.append(record)
+    yield from Chunker().decode_chunks(line_records)
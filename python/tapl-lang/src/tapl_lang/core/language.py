@@ -4,43 +4,308 @@
 
 from __future__ import annotations
 
+import collections
+import concurrent.futures
+import dataclasses
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
 
-from tapl_lang.core import chunker, parser, syntax, tapl_error
+from tapl_lang.core import chunker, line_record, parser, syntax, tapl_error
+from tapl_lang.lib import terms
+
+# Number of lines above which a batch of top-level chunks is sent to a worker of the executor.
+PARALLEL_BATCH_LINES = 2000
+# Number of batches sent to the executor ahead of the one whose terms are awaited.
+PARALLEL_PENDING_BATCHES = 16
 
 
 class Language(ABC):
-    def parse_chunks(self, chunks: list[chunker.Chunk], parent_stack: list[syntax.Term]) -> None:
+    # Whether get_grammar reads parent_stack. The chunks of a language whose grammar does not depend on the parents
+    # can be parsed without them, see parse_chunks_in_parallel.
+    grammar_depends_on_parents = True
+
+    def parse_chunks(
+        self,
+        chunks: Iterable[chunker.Chunk],
+        parent_stack: list[syntax.Term],
+        *,
+        profile: parser.ParseProfile | None = None,
+        session: ParseSession | None = None,
+        budget: parser.ParseBudget | None = None,
+        executor: concurrent.futures.Executor | None = None,
+    ) -> None:
+        """Parses the chunks into the placeholder of the top of parent_stack.
+
+        With an executor, e.g. a ProcessPoolExecutor, the chunks are parsed in batches by its workers, see
+        parse_chunks_in_parallel. The sibling terms are integrated in source order either way.
+        """
+        if executor is not None and (profile is not None or session is not None):
+            raise tapl_error.TaplError('Parallel parsing does not support profiles and sessions.')
         delayed_statements: syntax.TermList | None = syntax.find_placeholder(parent_stack[-1])
         if delayed_statements is None:
             raise tapl_error.TaplError(
                 f'The top of parent_stack[{parent_stack[-1].__class__.__name__}] does not have a placeholder to hold parsed child terms.'
             )
+        parsed: Iterable[tuple[chunker.Chunk, syntax.Term]]
+        if executor is not None:
+            parsed = self.parse_chunks_in_parallel(chunks, executor, budget=budget)
+        else:
+            parsed = (
+                (chunk, self.parse_chunk(chunk, parent_stack, profile=profile, session=session, budget=budget))
+                for chunk in chunks
+            )
         body: list[syntax.Term] = []
-        for chunk in chunks:
-            term = self.parse_chunk(chunk, parent_stack)
+        last_chunk: chunker.Chunk | None = None
+        for chunk, term in parsed:
             if isinstance(term, syntax.SiblingTerm):
+                if session is not None and last_chunk is not None:
+                    # The sibling is integrated into the term of the last chunk, which cannot be reused anymore.
+                    session.forget(last_chunk.line_records())
                 term.integrate_into(body)
             else:
                 body.append(term)
+                last_chunk = chunk
         delayed_statements.terms = body
         delayed_statements.is_placeholder = False
 
-    def parse_chunk(self, chunk: chunker.Chunk, parent_stack: list[syntax.Term]) -> syntax.Term:
+    def parse_chunk(
+        self,
+        chunk: chunker.Chunk,
+        parent_stack: list[syntax.Term],
+        *,
+        profile: parser.ParseProfile | None = None,
+        session: ParseSession | None = None,
+        budget: parser.ParseBudget | None = None,
+    ) -> syntax.Term:
+        """Parses the chunk and its children. The budget bounds the parse of each chunk."""
         grammar = self.get_grammar(parent_stack)
-        term = parser.parse_line_records(chunk.line_records, grammar)
+        if session is not None:
+            term = session.parse_line_records(
+                chunk.line_records(), grammar, has_children=bool(chunk.children), budget=budget
+            )
+        else:
+            term = parser.parse_line_records(chunk.line_records(), grammar, profile=profile or False, budget=budget)
         if not isinstance(term, syntax.ErrorTerm) and chunk.children:
             parent_stack.append(term)
             try:
-                self.parse_chunks(chunk.children, parent_stack)
+                self.parse_chunks(chunk.children, parent_stack, profile=profile, session=session, budget=budget)
             finally:
                 parent_stack.pop()
         return term
 
+    def parse_chunks_in_parallel(
+        self,
+        chunks: Iterable[chunker.Chunk],
+        executor: concurrent.futures.Executor,
+        *,
+        budget: parser.ParseBudget | None = None,
+    ) -> Iterator[tuple[chunker.Chunk, syntax.Term]]:
+        """Yields the chunks with their terms, parsed in batches by the workers of the executor.
+
+        The language and the lines of each batch, nested chunks included, are sent to a worker, which parses each
+        chunk with its children and sends back the terms. A worker process keeps the grammar compiled at the import of
+        the language for the following batches. The parents of the chunks are not sent, so the grammar of the language
+        must not depend on them. A batch is sent as soon as it is full, and up to PARALLEL_PENDING_BATCHES batches are
+        sent ahead, so the chunks are read lazily, e.g. from chunker.chunk_stream. The terms are yielded in source
+        order, and an exception is raised when the batch raising it is reached, so the reported errors do not depend
+        on the scheduling.
+        """
+        if self.grammar_depends_on_parents:
+            raise tapl_error.TaplError(
+                f'The grammar of {self.__class__.__name__} depends on the parents of the chunks, so they cannot be '
+                'parsed in parallel.'
+            )
+        pending: collections.deque[tuple[list[chunker.Chunk], concurrent.futures.Future[list[syntax.Term]]]]
+        pending = collections.deque()
+
+        def submit(batch: list[chunker.Chunk]) -> None:
+            lines = [chunk.nested_line_records() for chunk in batch]
+            pending.append((batch, executor.submit(parse_chunk_batch, self, lines, budget)))
+
+        try:
+            batch: list[chunker.Chunk] = []
+            batch_lines = 0
+            for chunk in chunks:
+                batch.append(chunk)
+                batch_lines += chunk.nested_end - chunk.start
+                if batch_lines >= PARALLEL_BATCH_LINES:
+                    submit(batch)
+                    batch, batch_lines = [], 0
+                # The terms of the batches already parsed are yielded while the next chunks are read.
+                while pending and (len(pending) > PARALLEL_PENDING_BATCHES or pending[0][1].done()):
+                    done_batch, future = pending.popleft()
+                    yield from zip(done_batch, future.result())
+            if batch:
+                submit(batch)
+            while pending:
+                done_batch, future = pending.popleft()
+                yield from zip(done_batch, future.result())
+        finally:
+            for _, future in pending:
+                future.cancel()
+
     @abstractmethod
-    def get_grammar(self, parent_stack: list[syntax.Term]) -> parser.Grammar:
+    def get_grammar(self, parent_stack: list[syntax.Term]) -> parser.CompiledGrammar:
         """Returns the grammar for the language."""
 
     @abstractmethod
     def get_predef_headers(self) -> list[syntax.Term]:
         """Returns the list of each layer's predefined headers for the language."""
+
+
+def parse_chunk_batch(
+    language: Language, batch: list[list[line_record.LineRecord]], budget: parser.ParseBudget | None
+) -> list[syntax.Term]:
+    """Parses the lines of each top-level chunk of a batch, in a worker of Language.parse_chunks_in_parallel.
+
+    The chunks are parsed without their parents, which the grammar of the language does not depend on.
+    """
+    parsed: list[syntax.Term] = []
+    for line_records in batch:
+        (chunk,) = chunker.Chunker().decode_chunks(line_records)
+        parsed.append(language.parse_chunk(chunk, [], budget=budget))
+    return parsed
+
+
+@dataclasses.dataclass
+class ChunkParse:
+    grammar: parser.CompiledGrammar
+    term: syntax.Term
+    # Line number of the first line of the chunk, which the locations of the term refer to.
+    first_line: int
+    # Placeholder of the term where the terms of the chunk's children are stored.
+    placeholder: syntax.TermList | None = None
+
+
+# Lines of a chunk, as their line numbers relative to the first line and their texts.
+ChunkKey = tuple[tuple[int, str], ...]
+
+
+def chunk_key(line_records: list[line_record.LineRecord]) -> ChunkKey:
+    first_line = line_records[0].line_number if line_records else 0
+    return tuple((line.line_number - first_line, line.text) for line in line_records)
+
+
+def shift_term_lines(term: syntax.Term, delta: int) -> bool:
+    """Moves the locations of the term and its children by delta lines.
+
+    Returns False without moving anything if the term has errors, as their messages may quote locations.
+    """
+    locations: dict[int, syntax.Location] = {}
+    stack = [term]
+    while stack:
+        t = stack.pop()
+        if isinstance(t, syntax.ErrorTerm):
+            return False
+        location = getattr(t, 'location', None)
+        if isinstance(location, syntax.Location):
+            # Locations may be shared by several terms.
+            locations[id(location)] = location
+        stack.extend(t.children())
+    for location in locations.values():
+        location.shift_lines(delta)
+    return True
+
+
+class ParseSession:
+    """Parses successive versions of a source, reusing the work done for the previous version.
+
+    A chunk whose lines did not change reuses its previous term, after its children's terms are removed from it. The
+    lines are compared relative to the first line of the chunk, so a chunk moved by lines inserted or deleted above it
+    is reused, and the locations of its term are moved along unless it has errors. An edited chunk without children is
+    parsed again, reusing the memo cells of the previous parse of the chunk starting at the same line which did not
+    see the edit. A term modified by a following sibling term is not reused.
+    """
+
+    def __init__(self, *, keep_memo: bool = True) -> None:
+        self.keep_memo = keep_memo
+        # Results of the previous version, and of the version being parsed, in source order by the lines of the chunks.
+        # Identical chunks have a result each, so a term is never reused twice.
+        self.chunk_parses: dict[ChunkKey, list[ChunkParse]] = {}
+        self.next_chunk_parses: dict[ChunkKey, list[ChunkParse]] = {}
+        # Engines of the chunks without children, by first line number.
+        self.engines: dict[int, parser.IncrementalPegEngine] = {}
+        self.next_engines: dict[int, parser.IncrementalPegEngine] = {}
+        self.reused_chunks = 0
+        self.parsed_chunks = 0
+
+    def parse_chunks(
+        self,
+        language: Language,
+        chunks: Iterable[chunker.Chunk],
+        parent_stack: list[syntax.Term],
+        *,
+        budget: parser.ParseBudget | None = None,
+    ) -> None:
+        """Same as language.parse_chunks, for the next version of the source."""
+        self.reused_chunks = self.parsed_chunks = 0
+        language.parse_chunks(chunks, parent_stack, session=self, budget=budget)
+        self.chunk_parses, self.next_chunk_parses = self.next_chunk_parses, {}
+        self.engines, self.next_engines = self.next_engines, {}
+
+    def parse_line_records(
+        self,
+        line_records: list[line_record.LineRecord],
+        grammar: parser.CompiledGrammar,
+        *,
+        has_children: bool,
+        budget: parser.ParseBudget | None = None,
+    ) -> syntax.Term:
+        key = chunk_key(line_records)
+        first_line = line_records[0].line_number if line_records else -1
+        previous = self.engines.get(first_line)
+        chunk_parse = self.reusable_chunk_parse(key, grammar, first_line)
+        if chunk_parse is not None:
+            self.next_chunk_parses.setdefault(key, []).append(chunk_parse)
+            if previous is not None:
+                self.next_engines[first_line] = previous
+            self.reused_chunks += 1
+            return chunk_parse.term
+        self.parsed_chunks += 1
+        config = parser.Config(mode=terms.MODE_SAFE)
+        if has_children:
+            # The memo holds the term, in which the children's terms are stored, so it cannot be reused.
+            engine: parser.PegEngine = parser.PegEngine(line_records, grammar)
+            engine.set_parse_budget(budget)
+            term = parser.parse_with_engine(engine, config)
+            if engine.exhausted is None:
+                chunk_parse = ChunkParse(grammar, term, first_line, syntax.find_placeholder(term))
+                self.next_chunk_parses.setdefault(key, []).append(chunk_parse)
+            return term
+        if previous is not None and (previous.grammar is not grammar or not self.keep_memo):
+            previous = None
+        engine = parser.IncrementalPegEngine(line_records, grammar, previous)
+        engine.set_parse_budget(budget)
+        term = parser.parse_with_engine(engine, config)
+        # A chunk which exceeded the budget is parsed again in the next version, as the budget may allow it then.
+        if engine.exhausted is None:
+            self.next_chunk_parses.setdefault(key, []).append(ChunkParse(grammar, term, first_line))
+        if self.keep_memo:
+            self.next_engines[first_line] = engine
+        return term
+
+    def reusable_chunk_parse(
+        self, key: ChunkKey, grammar: parser.CompiledGrammar, first_line: int
+    ) -> ChunkParse | None:
+        """Takes the first previous result of a chunk with the same lines, moved to the first line."""
+        chunk_parses = self.chunk_parses.get(key)
+        if not chunk_parses or chunk_parses[0].grammar is not grammar:
+            return None
+        chunk_parse = chunk_parses.pop(0)
+        if chunk_parse.placeholder is not None:
+            chunk_parse.placeholder.terms = []
+            chunk_parse.placeholder.is_placeholder = True
+        if first_line != chunk_parse.first_line:
+            if not shift_term_lines(chunk_parse.term, first_line - chunk_parse.first_line):
+                return None
+            chunk_parse.first_line = first_line
+        return chunk_parse
+
+    def forget(self, line_records: list[line_record.LineRecord]) -> None:
+        """Drops the results of the chunk parsed in this version, as its term is about to be modified."""
+        chunk_parses = self.next_chunk_parses.get(chunk_key(line_records))
+        if chunk_parses:
+            # The chunk is the last one parsed with these lines.
+            chunk_parses.pop()
+        if line_records:
+            self.next_engines.pop(line_records[0].line_number, None)
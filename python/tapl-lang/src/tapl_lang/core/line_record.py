@@ -4,47 +4,160 @@
 
 from __future__ import annotations
 
+import array
+import bisect
+import itertools
+import mmap
+import re
+from collections.abc import Sequence
+from typing import overload
+
 
 def count_indentation(text: str) -> int:
-    count = 0
-    for char in text:
-        if char == ' ':
-            count += 1
-        else:
-            break
-    return count
+    return len(text) - len(text.lstrip(' '))
 
 
 def ends_with_colon(text: str) -> bool:
-    for char in reversed(text):
-        if char.isspace():
-            continue
-        return char == ':'
-    return False
+    return text.rstrip().endswith(':')
 
 
 class LineRecord:
+    __slots__ = ('empty', 'ends_with_colon', 'indent', 'line_number', 'text')
+
     def __init__(self, line_number: int, text: str) -> None:
         self.line_number = line_number
         self.text = text
-        self.empty: bool = all(char.isspace() for char in text)
-        self.ends_with_colon: bool = ends_with_colon(text)
-        self.indent: int | None = None
-        if not self.empty:
-            self.indent = count_indentation(text)
+        stripped = text.strip()
+        self.empty: bool = not stripped
+        self.ends_with_colon: bool = stripped.endswith(':')
+        self.indent: int | None = None if self.empty else count_indentation(text)
 
     def __repr__(self) -> str:
         return f'LineRecord(line_number={self.line_number}, indent={self.indent}, empty={self.empty}, ends_with_colon={self.ends_with_colon}, text={self.text!r})'
 
 
 def is_comment_line(text: str) -> bool:
-    for char in text:
-        if char.isspace():
-            continue
-        return char == '#'
-    return False
+    return text.lstrip().startswith('#')
+
+
+# The line boundaries of str.splitlines, in text and in UTF-8 encoded text.
+LINE_END = re.compile('\r\n|[\n\x0b\x0c\r\x1c\x1d\x1e\x85\u2028\u2029]')
+LINE_END_BYTES = re.compile(b'\r\n|[\n\x0b\x0c\r\x1c\x1d\x1e]|\xc2\x85|\xe2\x80[\xa8\xa9]')
+# Characters which str.strip strips unlike bytes.strip.
+NON_ASCII_SPACE_BYTES = re.compile(b'[\x1c-\x1f\x80-\xff]')
+ENDS_WITH_COLON = 1
+
+
+def classify_line(line: str | bytes) -> tuple[int, int] | None:
+    """Returns the indentation of a line (-1 if it is empty) and its flags, or None for a comment line."""
+    if isinstance(line, bytes):
+        if NON_ASCII_SPACE_BYTES.search(line):
+            return classify_line(line.decode())
+        content = line.strip()
+        if not content:
+            return -1, 0
+        if content.startswith(b'#'):
+            return None
+        return len(line) - len(line.lstrip(b' ')), ENDS_WITH_COLON if content.endswith(b':') else 0
+    stripped = line.strip()
+    if not stripped:
+        return -1, 0
+    if stripped.startswith('#'):
+        return None
+    return count_indentation(line), ENDS_WITH_COLON if stripped.endswith(':') else 0
+
+
+class LineStore(Sequence[LineRecord]):
+    """Lines of a text without its comment lines, stored as columns instead of LineRecord objects.
+
+    The columns hold the line number, the indentation (-1 for empty lines), flags, and the start and end offsets of
+    each line in the text, so a line takes a few dozen bytes. The LineRecord of a line is created when it is read.
+    The text can also be UTF-8 encoded, e.g. a memory mapped file, in which case the offsets are byte offsets and
+    only the lines which are read are decoded.
+    """
+
+    def __init__(self, text: str | bytes | mmap.mmap) -> None:
+        self.text = text
+        self.line_numbers = array.array('l')
+        self.indents = array.array('l')
+        self.flags = array.array('B')
+        self.starts = array.array('q')
+        self.ends = array.array('q')
+        if isinstance(text, str):
+            ends = (match.end() for match in LINE_END.finditer(text))
+        else:
+            ends = (match.end() for match in LINE_END_BYTES.finditer(text))
+        start = 0
+        for line_number, end in enumerate(itertools.chain(ends, [len(text)]), 1):
+            if start == len(text):
+                break
+            classified = classify_line(text[start:end])
+            if classified is not None:
+                self.append(line_number, *classified, start, end)
+            start = end
+
+    def append(self, line_number: int, indent: int, flags: int, start: int, end: int) -> None:
+        self.line_numbers.append(line_number)
+        self.indents.append(indent)
+        self.flags.append(flags)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self.line_numbers)
+
+    @overload
+    def __getitem__(self, index: int) -> LineRecord: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[LineRecord]: ...
+
+    def __getitem__(self, index: int | slice) -> LineRecord | list[LineRecord]:
+        if isinstance(index, slice):
+            return [self.record(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('LineStore index out of range')
+        return self.record(index)
+
+    def record(self, index: int) -> LineRecord:
+        record = LineRecord.__new__(LineRecord)
+        record.line_number = self.line_numbers[index]
+        text = self.text[self.starts[index] : self.ends[index]]
+        record.text = text if isinstance(text, str) else text.decode()
+        indent = self.indents[index]
+        record.empty = indent < 0
+        record.indent = None if record.empty else indent
+        record.ends_with_colon = bool(self.flags[index] & ENDS_WITH_COLON)
+        return record
 
 
 def split_text_to_lines(text: str) -> list[LineRecord]:
-    text_lines = text.splitlines(keepends=True)
-    return [LineRecord(i + 1, text_lines[i]) for i in range(len(text_lines)) if not is_comment_line(text_lines[i])]
+    """Returns the records of all the lines of the text, creating one object per line.
+
+    A chunk is parsed from a list of its records. To read the lines of a large text lazily, chunk a LineStore instead.
+    """
+    store = LineStore(text)
+    return store[:]
+
+
+class LineTable:
+    """Maps flat offsets into the concatenated text of line records back to rows, line numbers and columns."""
+
+    def __init__(self, line_records: list[LineRecord]) -> None:
+        self.line_numbers = [line.line_number for line in line_records]
+        # Offset of the first character of each row, followed by the total length of the text.
+        self.line_starts = list(itertools.accumulate((len(line.text) for line in line_records), initial=0))
+
+    def row_col(self, offset: int) -> tuple[int, int]:
+        """Returns the row index and column of the offset. The end of the text is reported as (row_count, 0)."""
+        row = bisect.bisect_right(self.line_starts, offset) - 1
+        if row >= len(self.line_numbers):
+            return len(self.line_numbers), 0
+        return row, offset - self.line_starts[row]
+
+    def line_column(self, offset: int) -> tuple[int, int]:
+        """Returns the line number and column of the offset. The end of the text is reported on the last line."""
+        row = min(bisect.bisect_right(self.line_starts, offset) - 1, len(self.line_numbers) - 1)
+        return self.line_numbers[row], offset - self.line_starts[row]
@@ -4,13 +4,27 @@
 
 from __future__ import annotations
 
+import array
 import dataclasses
 import enum
+import functools
 import io
 import itertools
+import json
 import logging
-from collections.abc import Callable, Iterable
-from typing import Union
+import re
+import sys
+import time
+from collections.abc import Callable, Collection, Generator, Iterable, Iterator
+from types import (
+    BuiltinFunctionType,
+    CodeType,
+    FunctionType,
+    GeneratorType,
+    MethodType,
+    ModuleType,
+)
+from typing import Union, cast
 
 from tapl_lang.core import line_record, syntax, tapl_error
 from tapl_lang.lib import terms
@@ -23,7 +37,9 @@ logger = logging.getLogger(__name__)
 # Error Detection taken from - https://arxiv.org/abs/1806.11150
 
 
-ParseFunction = Callable[['Cursor'], syntax.Term]
+# A parse function returns its term, or is a generator which yields the rules it applies (see RuleRequest).
+ParseGenerator = Generator['RuleRequest', syntax.Term, syntax.Term]
+ParseFunction = Callable[['Cursor'], Union[syntax.Term, ParseGenerator]]
 OrderedParseFunctions = Iterable[Union[ParseFunction, str]]
 GrammarRuleMap = dict[str, OrderedParseFunctions]
 
@@ -32,9 +48,22 @@ GrammarRuleMap = dict[str, OrderedParseFunctions]
 class Grammar:
     rule_map: GrammarRuleMap
     start_rule: str
+    # When set, each chunk is lexed once ahead of parsing by applying this rule from the start to the end of the text.
+    # Custom token kinds are registered with the lexer by adding alternatives to this rule.
+    token_rule: str | None = None
+    # Classifies a lexed token into the kind used by FIRST sets (see starts_with), or None if it is unknown.
+    token_kind: Callable[[syntax.Term], str | None] | None = None
+    # Rules whose result does not depend on the Config, so they are memoized once for all configs.
+    # The token rule is always config independent.
+    config_independent_rules: frozenset[str] = frozenset()
 
     def clone(self) -> Grammar:
-        return Grammar(self.rule_map.copy(), self.start_rule)
+        return Grammar(
+            self.rule_map.copy(), self.start_rule, self.token_rule, self.token_kind, self.config_independent_rules
+        )
+
+    def compile(self) -> CompiledGrammar:
+        return compile_grammar(self)
 
 
 def parse_function_name(function: ParseFunction | str) -> str:
@@ -43,81 +72,530 @@ def parse_function_name(function: ParseFunction | str) -> str:
     return f'@{function.__name__}'
 
 
+def starts_with(*token_kinds: str) -> Callable[[ParseFunction], ParseFunction]:
+    """Declares the FIRST set of a parse function, i.e. the kinds of token it can start with.
+
+    The engine skips the function when the upcoming token is of another kind, so the function must return
+    ParseFailed whenever its first token is not one of the given kinds.
+    """
+    first = frozenset(token_kinds)
+
+    def decorate(function: ParseFunction) -> ParseFunction:
+        function.first_token_kinds = first  # type: ignore[attr-defined]
+        return function
+
+    return decorate
+
+
+def references(*parsers: Parser) -> Callable[[ParseFunction], ParseFunction]:
+    """Declares the rules and functions a parse function may apply, for the grammar analysis (see find_references).
+
+    Only needed when the analysis cannot find them in the code of the function, e.g. when rule names are computed.
+    """
+
+    def decorate(function: ParseFunction) -> ParseFunction:
+        function.referenced_parsers = parsers  # type: ignore[attr-defined]
+        return function
+
+    return decorate
+
+
+# A compiled alternative is either a parse function or the id of the rule it is aliased to.
+CompiledParseFunction = Union[ParseFunction, int]
+# FIRST set of an alternative, or None when it is unknown and the alternative can never be skipped.
+FirstSet = Union[frozenset[str], None]
+
+
+@dataclasses.dataclass(frozen=True)
+class CompiledGrammar:
+    """Immutable form of a Grammar which the PegEngine runs on.
+
+    Rule names are interned to small integer ids, string aliases are resolved to the ids of their target rules,
+    and the ordered alternatives of each rule are stored as tuples indexed by rule id.
+    """
+
+    source: Grammar
+    rule_names: tuple[str, ...]
+    rule_ids: dict[str, int]
+    rules: tuple[tuple[CompiledParseFunction, ...], ...]
+    first_sets: tuple[tuple[FirstSet, ...], ...]
+    config_independent: tuple[bool, ...]
+    start_rule_id: int
+    token_rule_id: int | None
+    analysis: GrammarAnalysis
+    # Whether each rule may be left recursive, see GrammarAnalysis.left_recursive_rules.
+    left_recursive: tuple[bool, ...]
+
+    @property
+    def rule_map(self) -> GrammarRuleMap:
+        return self.source.rule_map.copy()
+
+    @property
+    def start_rule(self) -> str:
+        return self.source.start_rule
+
+    @property
+    def token_rule(self) -> str | None:
+        return self.source.token_rule
+
+    @property
+    def token_kind(self) -> Callable[[syntax.Term], str | None] | None:
+        return self.source.token_kind
+
+    def clone(self) -> Grammar:
+        return self.source.clone()
+
+    def rule_id(self, rule: str) -> int:
+        rule_id = self.rule_ids.get(rule)
+        if rule_id is None:
+            raise tapl_error.TaplError(f'Rule "{rule}" is not defined in the Grammar.')
+        return rule_id
+
+    def parse_function_name(self, function: CompiledParseFunction) -> str:
+        if isinstance(function, int):
+            return f'|>{self.rule_names[function]}'
+        return parse_function_name(function)
+
+
+def compile_grammar(grammar: Grammar) -> CompiledGrammar:
+    source = grammar.clone()
+    rule_ids: dict[str, int] = {}
+
+    def intern(rule: str) -> int:
+        if rule not in rule_ids:
+            rule_ids[rule] = len(rule_ids)
+        return rule_ids[rule]
+
+    for rule in source.rule_map:
+        intern(rule)
+    start_rule_id = intern(source.start_rule)
+    token_rule_id = intern(source.token_rule) if source.token_rule is not None else None
+    alternatives: dict[int, tuple[CompiledParseFunction, ...]] = {}
+    for rule, functions in source.rule_map.items():
+        alternatives[rule_ids[rule]] = tuple(intern(fn) if isinstance(fn, str) else fn for fn in functions)
+    # Aliases to undefined rules are interned with no alternatives, and fail when they are applied.
+    rules = tuple(alternatives.get(i, ()) for i in range(len(rule_ids)))
+    empty = find_empty_rules(rules, {rule_ids[rule] for rule in source.rule_map})
+    # Aliases to empty rules can never match, so they are dropped from the dispatch.
+    pruned = tuple(tuple(fn for fn in functions if not (isinstance(fn, int) and fn in empty)) for functions in rules)
+    dropped_aliases = sum(len(functions) for functions in rules) - sum(len(functions) for functions in pruned)
+    rules = pruned
+    roots = [start_rule_id] if token_rule_id is None else [start_rule_id, token_rule_id]
+    analysis = analyze_grammar(tuple(rule_ids), rules, empty, roots, dropped_aliases)
+    return CompiledGrammar(
+        source=source,
+        rule_names=tuple(rule_ids),
+        rule_ids=rule_ids,
+        rules=rules,
+        first_sets=compute_first_sets(rules),
+        config_independent=tuple(
+            name in source.config_independent_rules or i == token_rule_id for i, name in enumerate(rule_ids)
+        ),
+        start_rule_id=start_rule_id,
+        token_rule_id=token_rule_id,
+        analysis=analysis,
+        left_recursive=tuple(name in analysis.left_recursive_rules for name in rule_ids),
+    )
+
+
+def compute_first_sets(rules: tuple[tuple[CompiledParseFunction, ...], ...]) -> tuple[tuple[FirstSet, ...], ...]:
+    """Computes the FIRST set of each alternative, either declared with starts_with or inferred through aliases."""
+    rule_first: dict[int, FirstSet] = {}
+
+    def first_of_rule(rule: int, visiting: set[int]) -> FirstSet:
+        if rule in rule_first:
+            return rule_first[rule]
+        # Applying an undefined rule raises an error, and cycles through aliases are not analyzed.
+        if rule in visiting or not rules[rule]:
+            return None
+        visiting.add(rule)
+        result: FirstSet = frozenset()
+        for function in rules[rule]:
+            first = first_of_alternative(function, visiting)
+            if first is None or result is None:
+                result = None
+                break
+            result |= first
+        visiting.discard(rule)
+        rule_first[rule] = result
+        return result
+
+    def first_of_alternative(function: CompiledParseFunction, visiting: set[int]) -> FirstSet:
+        if isinstance(function, int):
+            return first_of_rule(function, visiting)
+        return getattr(function, 'first_token_kinds', None)
+
+    return tuple(tuple(first_of_alternative(fn, set()) for fn in functions) for functions in rules)
+
+
+@dataclasses.dataclass(frozen=True)
+class GrammarAnalysis:
+    """Static properties of the rules of a grammar, computed once when it is compiled.
+
+    The references of a parse function to rules are found in its code (see find_references), so the rule sets are
+    conservative: a rule is only reported unreachable, or known not to be left recursive, when no parse function
+    could apply it otherwise.
+    """
+
+    # Rules defined without alternatives, or whose alternatives are all aliases to empty rules. They never match, and
+    # the aliases to them are dropped from the dispatch of the other rules.
+    empty_rules: frozenset[str]
+    # Rules applied through an alias but not defined in the grammar. Applying them is an error.
+    undefined_rules: frozenset[str]
+    # Rules which are applied neither from the start rule nor from the token rule.
+    unreachable_rules: frozenset[str]
+    # Rules which may match without consuming text. Only the alternatives declared with starts_with are known not to.
+    nullable_rules: frozenset[str]
+    # Rules which may be applied again at the same offset while they are evaluated. The engine skips the bookkeeping
+    # of left recursion for the other rules.
+    left_recursive_rules: frozenset[str]
+    # Parse functions whose references could not be found. Every rule is assumed to be referenced by them.
+    opaque_functions: tuple[str, ...]
+    dropped_aliases: int
+
+
+def find_empty_rules(rules: tuple[tuple[CompiledParseFunction, ...], ...], defined: set[int]) -> set[int]:
+    empty: set[int] = set()
+    changed = True
+    while changed:
+        changed = False
+        for rule in defined - empty:
+            if all(isinstance(fn, int) and fn in empty for fn in rules[rule]):
+                empty.add(rule)
+                changed = True
+    return empty
+
+
+def code_names(code: CodeType) -> Iterator[str]:
+    """Yields the global and attribute names read by the code and by the functions nested in it."""
+    yield from code.co_names
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            yield from code_names(const)
+
+
+def find_references(function: Callable, rule_names: Collection[str]) -> frozenset[str] | None:
+    """Finds the rules a parse function may apply, or None when they cannot be found.
+
+    The rules are the rule names in the constants, closures and default arguments of the function, the global and
+    module attributes it reads, and recursively the functions it calls. The attributes a bound method reads from its
+    instance, the arguments of a partial and the function wrapped by a decorator are followed too. The other
+    attributes of the instance are not, as it may hold unrelated objects such as an engine. References declared
+    with the references decorator are used instead of the code. A callable whose code cannot be read, e.g. one
+    implemented in C other than a builtin function, may apply any rule, so the references are not found.
+    """
+    found: set[str] = set()
+    seen: set[int] = set()
+    pending: list[object] = [function]
+    while pending:
+        value = pending.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        if isinstance(value, str):
+            if value in rule_names:
+                found.add(value)
+            continue
+        declared = getattr(value, 'referenced_parsers', None)
+        if declared is not None:
+            pending.extend(declared)
+            continue
+        if isinstance(value, MethodType):
+            pending.append(value.__func__)
+            if isinstance(value.__func__, FunctionType):
+                attributes = getattr(value.__self__, '__dict__', {})
+                pending.extend(attributes[name] for name in code_names(value.__func__.__code__) if name in attributes)
+            continue
+        if isinstance(value, functools.partial):
+            pending.extend([value.func, *value.args, *value.keywords.values()])
+            continue
+        wrapped = getattr(value, '__wrapped__', None)
+        if wrapped is not None:
+            pending.append(wrapped)
+            continue
+        if not isinstance(value, FunctionType):
+            if value is function and isinstance(value, (type, BuiltinFunctionType)):
+                return None
+            # Classes, builtin functions and other values read by a parse function do not apply rules.
+            if not callable(value) or isinstance(value, (type, BuiltinFunctionType)):
+                continue
+            call = type(value).__call__
+            if not isinstance(call, FunctionType):
+                return None
+            pending.append(MethodType(call, value))
+            continue
+        pending.extend(cell.cell_contents for cell in value.__closure__ or () if cell.cell_contents is not None)
+        pending.extend(value.__defaults__ or ())
+        pending.extend((value.__kwdefaults__ or {}).values())
+        codes = [value.__code__]
+        while codes:
+            code = codes.pop()
+            for const in code.co_consts:
+                if isinstance(const, CodeType):
+                    codes.append(const)
+                elif isinstance(const, str):
+                    pending.append(const)
+            pending.extend(value.__globals__[name] for name in code.co_names if name in value.__globals__)
+            # Attributes of the modules read by the function, e.g. rule_names.START.
+            for module in (value.__globals__.get(name) for name in code.co_names):
+                if isinstance(module, ModuleType):
+                    pending.extend(getattr(module, name) for name in code.co_names if hasattr(module, name))
+    return frozenset(found)
+
+
+def analyze_grammar(
+    rule_names: tuple[str, ...],
+    rules: tuple[tuple[CompiledParseFunction, ...], ...],
+    empty: set[int],
+    roots: Iterable[int],
+    dropped_aliases: int,
+) -> GrammarAnalysis:
+    rule_ids = {name: i for i, name in enumerate(rule_names)}
+    everything = frozenset(range(len(rule_names)))
+    opaque: list[str] = []
+    references: list[frozenset[int]] = []
+    for functions in rules:
+        referenced: set[int] = set()
+        for fn in functions:
+            if isinstance(fn, int):
+                referenced.add(fn)
+                continue
+            found = find_references(fn, rule_ids)
+            if found is None:
+                opaque.append(parse_function_name(fn))
+                referenced.update(everything)
+            else:
+                referenced.update(rule_ids[name] for name in found)
+        references.append(frozenset(referenced))
+
+    def reachable_from(rules: Iterable[int]) -> set[int]:
+        reached: set[int] = set()
+        pending = list(rules)
+        while pending:
+            rule = pending.pop()
+            if rule not in reached:
+                reached.add(rule)
+                pending.extend(references[rule])
+        return reached
+
+    reachable = reachable_from(roots)
+    nullable: set[int] = set()
+    changed = True
+    while changed:
+        changed = False
+        for rule, functions in enumerate(rules):
+            if rule not in nullable and any(
+                fn in nullable if isinstance(fn, int) else getattr(fn, 'first_token_kinds', None) is None
+                for fn in functions
+            ):
+                nullable.add(rule)
+                changed = True
+    left_recursive = {rule for rule in everything if rule in reachable_from(references[rule])}
+
+    def names(rules: Iterable[int]) -> frozenset[str]:
+        return frozenset(rule_names[rule] for rule in rules)
+
+    return GrammarAnalysis(
+        empty_rules=names(empty),
+        undefined_rules=names(rule for rule, functions in enumerate(rules) if not functions and rule not in empty),
+        unreachable_rules=names(everything - reachable),
+        nullable_rules=names(nullable),
+        left_recursive_rules=names(left_recursive),
+        opaque_functions=tuple(opaque),
+        dropped_aliases=dropped_aliases,
+    )
+
+
+def as_compiled_grammar(grammar: Grammar | CompiledGrammar) -> CompiledGrammar:
+    if isinstance(grammar, CompiledGrammar):
+        return grammar
+    return grammar.compile()
+
+
 @dataclasses.dataclass
 class Config:
+    # The engines tell configs apart by their mode, see PegEngine.config_id.
     mode: syntax.Term
 
 
+@dataclasses.dataclass(frozen=True)
+class ParseBudget:
+    """Bounds the work of a parse, so a pathological input fails with an error instead of using unbounded CPU."""
+
+    # Maximum number of rule applications, excluding the tokens served from the token array.
+    max_steps: int | None = None
+    max_seconds: float | None = None
+
+
+# Number of rule applications between two checks of the parse budget. The rule applied at each check is sampled to
+# find the hottest rule when the budget is exceeded.
+BUDGET_CHECK_INTERVAL = 64
+
+
+_WHITESPACE = re.compile(r'\s*')
+
+
 class Cursor:
-    def __init__(self, row: int, col: int, config: Config, engine: PegEngine) -> None:
-        self.row = row
-        self.col = col
+    def __init__(self, offset: int, config: Config, engine: PegEngine) -> None:
+        self.offset = offset
         self.config = config
         self.engine = engine
 
     def clone(self) -> Cursor:
-        return Cursor(self.row, self.col, self.config, self.engine)
+        return Cursor(self.offset, self.config, self.engine)
 
     def copy_position_from(self, other: Cursor) -> None:
         if self.engine is not other.engine:
             raise tapl_error.TaplError('Both cursors do not have a same engine instance.')
-        self.row = other.row
-        self.col = other.col
+        self.offset = other.offset
 
     def assert_position(self) -> None:
-        if not (0 <= self.row < len(self.engine.line_records)):
-            raise tapl_error.TaplError('Cursor row is out of range.')
-        if not (0 <= self.col < len(self.engine.line_records[self.row].text)):
-            raise tapl_error.TaplError('Cursor col is out of range.')
+        if not (0 <= self.offset < self.engine.text_length):
+            raise tapl_error.TaplError('Cursor offset is out of range.')
 
     def current_char(self) -> str:
-        self.assert_position()
-        return self.engine.line_records[self.row].text[self.col]
+        if self.offset < self.engine.text_length:
+            return self.engine.text[self.offset]
+        raise tapl_error.TaplError('Cursor offset is out of range.')
 
     def is_end(self) -> bool:
-        if self.row == len(self.engine.line_records):
-            if self.col != 0:
-                raise tapl_error.TaplError('When cursor ends, col must be 0.')
-            return True
-        self.assert_position()
-        return False
+        return self.offset >= self.engine.text_length
 
     def move_to_next(self) -> bool:
-        if self.is_end():
+        if self.offset >= self.engine.text_length:
             return False
-        self.col += 1
-        if self.col == len(self.engine.line_records[self.row].text):
-            self.row += 1
-            self.col = 0
+        self.offset += 1
         return True
 
     def current_position(self) -> syntax.Position:
-        if self.is_end():
-            line_record = self.engine.line_records[self.row - 1]
-            return syntax.Position(line_record.line_number, len(line_record.text))
-        self.assert_position()
-        return syntax.Position(self.engine.line_records[self.row].line_number, self.col)
+        return self.engine.position(self.offset)
 
     def consume_rule(self, rule: str, config: Config | None = None) -> syntax.Term:
-        term, self.row, self.col = self.engine.apply_rule(self.row, self.col, rule, config or self.config)
+        rule_id = self.engine.grammar.rule_id(rule)
+        term, self.offset = self.engine.apply_rule(self.offset, rule_id, config or self.config)
         return term
 
+    def request_rule(self, rule: str, config: Config | None = None) -> RuleRequest:
+        """Returns the application of a rule for a generator parse function to yield, see RuleRequest."""
+        return RuleRequest(self, self.engine.grammar.rule_id(rule), config or self.config)
+
+    def build(self, factory: Callable[..., syntax.Term], *args: object, **fields: object) -> syntax.Term:
+        """Returns factory(*args, **fields), or a Match which builds it once the chunk has parsed when the engine
+        defers terms. The term of a match is not available while parsing, so it must not be inspected.
+        """
+        if self.engine.deferred_terms:
+            return Match(factory, args, fields)
+        return factory(*args, **fields)
+
+    def commit(self) -> None:
+        """Declares that the parse does not backtrack before the cursor, so the memo cells of the text before it can
+        be evicted. Backtracking anyway stays correct, as the evicted cells are evaluated again.
+        """
+        self.engine.cell_memo.commit(self.offset)
+
     def start_tracker(self) -> Tracker:
         return Tracker(self)
 
     def skip_whitespace(self) -> None:
-        while not self.is_end() and self.current_char().isspace():
-            self.move_to_next()
+        self.offset = _WHITESPACE.match(self.engine.text, self.offset).end()  # type: ignore[union-attr]
+
+    def consume_pattern(self, pattern: re.Pattern[str]) -> re.Match[str] | None:
+        """Matches the pattern at the cursor and moves the cursor past the match."""
+        match = pattern.match(self.engine.text, self.offset)
+        if match is not None:
+            self.offset = match.end()
+        return match
 
     def consume_text(self, text: str) -> bool:
-        for char in text:
-            if self.is_end() or self.current_char() != char:
-                return False
-            self.move_to_next()
-        return True
+        if self.engine.text.startswith(text, self.offset):
+            self.offset += len(text)
+            return True
+        return False
+
+
+class RuleRequest:
+    """A rule application yielded by a generator parse function: `term = yield c.request_rule(rule)`.
+
+    The engine applies the rule at the cursor, moves the cursor past the result and sends the term back, like
+    consume_rule does. The StackPegEngine suspends the generator meanwhile, so nested rules do not nest Python calls.
+    """
+
+    __slots__ = ('config', 'cursor', 'rule')
+
+    def __init__(self, cursor: Cursor, rule: int, config: Config) -> None:
+        self.cursor = cursor
+        self.rule = rule
+        self.config = config
 
 
-ParseFailed = syntax.ErrorTerm(message='Parsing failed: Unable to match any rule.')
+class Match(syntax.Term):
+    """A term whose construction is deferred to the successful parse of the chunk, see Cursor.build.
+
+    Matches of abandoned alternatives are never built. The arguments may hold other matches, directly, in lists or in
+    eagerly built terms, which are built first.
+    """
+
+    __slots__ = ('args', 'factory', 'fields', 'term')
+
+    def __init__(
+        self, factory: Callable[..., syntax.Term], args: tuple[object, ...], fields: dict[str, object]
+    ) -> None:
+        self.factory = factory
+        self.args = args
+        self.fields = fields
+        self.term: syntax.Term | None = None
+
+    def children(self) -> Generator[syntax.Term, None, None]:
+        for value in itertools.chain(self.args, self.fields.values()):
+            if isinstance(value, syntax.Term):
+                yield value
+
+    def __repr__(self) -> str:
+        return f'Match({getattr(self.factory, "__qualname__", self.factory)})'
+
+
+def build_matches(root: syntax.Term) -> syntax.Term:
+    """Builds the matches in the term tree, children first, and returns the root with the matches replaced by their
+    terms. Lists and eagerly built terms holding matches are updated in place. An explicit stack is used, as the
+    tree may be nested beyond the interpreter recursion limit.
+    """
+    stack: list[tuple[object, bool]] = [(root, False)]
+    while stack:
+        node, visited = stack.pop()
+        if node.__class__ is Match:
+            match = cast('Match', node)
+            if match.term is not None:
+                continue
+            if visited:
+                args = [_built(value) for value in match.args]
+                fields = {name: _built(value) for name, value in match.fields.items()}
+                match.term = match.factory(*args, **fields)
+                continue
+            stack.append((node, True))
+            stack.extend((value, False) for value in itertools.chain(match.args, match.fields.values()))
+        elif node.__class__ is list:
+            items = cast('list[object]', node)
+            if visited:
+                items[:] = [_built(item) for item in items]
+                continue
+            stack.append((node, True))
+            stack.extend((item, False) for item in items)
+        elif isinstance(node, syntax.Term) and (attributes := getattr(node, '__dict__', None)):
+            if visited:
+                for name, value in attributes.items():
+                    if value.__class__ is Match:
+                        attributes[name] = _built(value)
+                continue
+            stack.append((node, True))
+            stack.extend((value, False) for value in attributes.values() if isinstance(value, (syntax.Term, list)))
+    return cast('syntax.Term', _built(root))
+
+
+def _built(value: object) -> object:
+    return cast('Match', value).term if value.__class__ is Match else value
+
+
+ParseFailed = syntax.FailureTerm(message='Parsing failed: Unable to match any rule.')
 
 
 # Tracker is designed for use within its originating function only and should not be passed between functions.
@@ -125,12 +603,12 @@ ParseFailed = syntax.ErrorTerm(message='Parsing failed: Unable to match any rule
 class Tracker:
     def __init__(self, cursor: Cursor) -> None:
         self.cursor = cursor
-        self.start_position = cursor.current_position()
+        self.start_offset = cursor.offset
         self.captured_error: syntax.ErrorTerm | None = None
 
     @property
     def location(self):
-        return syntax.Location(start=self.start_position, end=self.cursor.current_position())
+        return self.cursor.engine.create_location(self.start_offset, self.cursor.offset)
 
     def fail(self):
         return self.captured_error or ParseFailed
@@ -146,140 +624,985 @@ class Tracker:
         return term is not None
 
 
+# The combinators below parse at the cursor, and restore its offset where a parser fails, without cloning it. They
+# are generators, so a parse function using them does `term = yield from sep_by(c, ...)`. A parser is the name of a
+# rule, applied through the packrat memo, or a function parsing at the cursor like a parse function.
+Parser = Union[str, ParseFunction]
+
+
+def apply_parser(c: Cursor, parser: Parser) -> ParseGenerator:
+    if parser.__class__ is str:
+        return (yield c.request_rule(cast('str', parser)))
+    result = cast('ParseFunction', parser)(c)
+    if isinstance(result, GeneratorType):
+        return (yield from result)
+    return cast('syntax.Term', result)
+
+
+def expected_error(c: Cursor, parser: Parser, name: str | None = None) -> syntax.ErrorTerm:
+    """Returns the error of a missing parser, named by name, the rule name or the function name."""
+    if name is None:
+        name = parser if isinstance(parser, str) else parser.__name__
+    return syntax.ErrorTerm(
+        message='Expected rule "{}"', location=c.engine.create_location(c.offset, c.offset), message_args=(name,)
+    )
+
+
+def expect(c: Cursor, parser: Parser, name: str | None = None) -> ParseGenerator:
+    """Parses the parser, reporting an error instead of failing. The error names the expected parser by name, if set,
+    e.g. the rule a parse function applies.
+    """
+    term = yield from apply_parser(c, parser)
+    if term is ParseFailed:
+        return expected_error(c, parser, name)
+    return term
+
+
+def optional(c: Cursor, parser: Parser, default: syntax.Term = syntax.Empty) -> ParseGenerator:
+    """Parses the parser, or returns the default without moving the cursor if it fails."""
+    offset = c.offset
+    term = yield from apply_parser(c, parser)
+    if term is ParseFailed:
+        c.offset = offset
+        return default
+    return term
+
+
+def sequence(c: Cursor, *parsers: Parser) -> ParseGenerator:
+    """Parses the parsers one after another into a TermList, or fails without moving the cursor."""
+    offset = c.offset
+    items: list[syntax.Term] = []
+    for parser in parsers:
+        term = yield from apply_parser(c, parser)
+        if isinstance(term, syntax.ErrorTerm):
+            if term is ParseFailed:
+                c.offset = offset
+            return term
+        items.append(term)
+    return syntax.TermList(terms=items)
+
+
+def many(c: Cursor, parser: Parser, min_count: int = 0) -> ParseGenerator:
+    """Parses the parser as many times as it matches into a TermList, failing below min_count matches.
+
+    A match which does not move the cursor is the last one, as the parser would match again forever.
+    """
+    start = c.offset
+    items: list[syntax.Term] = []
+    while True:
+        offset = c.offset
+        term = yield from apply_parser(c, parser)
+        if isinstance(term, syntax.ErrorTerm):
+            if term is not ParseFailed:
+                return term
+            c.offset = offset
+            break
+        items.append(term)
+        if c.offset == offset:
+            break
+    if len(items) < min_count:
+        c.offset = start
+        return ParseFailed
+    return syntax.TermList(terms=items)
+
+
+def sep_by(
+    c: Cursor,
+    element: Parser,
+    separator: Parser,
+    *,
+    min_count: int = 0,
+    trailing: bool = False,
+    required: bool = False,
+    commit: bool = False,
+) -> ParseGenerator:
+    """Parses elements separated by separators into a TermList, failing below min_count elements.
+
+    An element missing after a separator is an error if required is set. Otherwise the separator is left unconsumed,
+    unless trailing allows a separator after the last element. With commit, the cursor is committed after each
+    element, see Cursor.commit. The memo cells are looked up once per element, so the cost is linear in the length.
+    An element or a separator which does not move the cursor ends the list, as it would match again forever.
+    """
+    start = c.offset
+    rule = c.engine.grammar.rule_id(element) if isinstance(element, str) else None
+    items: list[syntax.Term] = []
+    offset = start
+    while True:
+        if rule is not None:
+            term = yield RuleRequest(c, rule, c.config)
+        else:
+            term = yield from apply_parser(c, element)
+        if isinstance(term, syntax.ErrorTerm):
+            if term is not ParseFailed:
+                return term
+            if items and required:
+                return expected_error(c, element)
+            if not (items and trailing):
+                c.offset = offset
+            break
+        items.append(term)
+        if commit:
+            c.commit()
+        if c.offset == offset:
+            break
+        offset = c.offset
+        term = yield from apply_parser(c, separator)
+        if isinstance(term, syntax.ErrorTerm):
+            if term is not ParseFailed:
+                return term
+            c.offset = offset
+            break
+        if c.offset == offset:
+            break
+    if len(items) < min_count:
+        c.offset = start
+        return ParseFailed
+    return syntax.TermList(terms=items)
+
+
+def lookahead(c: Cursor, parser: Parser) -> ParseGenerator:
+    """Parses the parser without moving the cursor."""
+    offset = c.offset
+    term = yield from apply_parser(c, parser)
+    c.offset = offset
+    return term
+
+
+def not_followed_by(c: Cursor, parser: Parser) -> ParseGenerator:
+    """Fails if the parser matches at the cursor, without moving the cursor. Errors of the parser count as no match."""
+    offset = c.offset
+    term = yield from apply_parser(c, parser)
+    c.offset = offset
+    return syntax.Empty if isinstance(term, syntax.ErrorTerm) else ParseFailed
+
+
+class OperatorKind(enum.Enum):
+    LEFT = 'left'  # a + b + c parses as (a + b) + c
+    RIGHT = 'right'  # a ** b ** c parses as a ** (b ** c)
+    CHAIN = 'chain'  # a < b < c parses as a single term with all operators and operands
+    PREFIX = 'prefix'  # - a
+
+
+# Creates the term of an operator level from its operators, operands and location.
+OperatorFactory = Callable[[Cursor, list[str], list[syntax.Term], syntax.Location], syntax.Term]
+
+
+@dataclasses.dataclass(frozen=True)
+class OperatorLevel:
+    rule: str
+    kind: OperatorKind
+    operators: tuple[str, ...]
+    factory: OperatorFactory
+    # Level whose rule parses the operand following an operator. Defaults to the next tighter level for LEFT and
+    # CHAIN operators, and to this level for RIGHT and PREFIX operators.
+    operand_rule: str | None = None
+    # When False, an operator without an operand is left unconsumed instead of reporting an error.
+    operand_required: bool = True
+
+
+class OperatorTower:
+    """Parses a tower of operator precedence levels with precedence climbing.
+
+    Levels are ordered from the loosest to the tightest binding. Each level is registered as a rule whose parse
+    function handles its own and all tighter operators in one loop, so only the operand rule is applied through the
+    packrat memo. scan_operator consumes the tokens of an operator and returns its text, or None.
+    """
+
+    def __init__(
+        self, levels: Iterable[OperatorLevel], operand_rule: str, scan_operator: Callable[[Cursor], str | None]
+    ) -> None:
+        self.levels = tuple(levels)
+        self.operand_rule = operand_rule
+        self.scan_operator = scan_operator
+        self.level_ids = {level.rule: i for i, level in enumerate(self.levels)}
+        self.infix_levels: dict[str, int] = {}
+        self.prefix_levels: dict[str, int] = {}
+        operand_levels = []
+        for i, level in enumerate(self.levels):
+            operators = self.prefix_levels if level.kind is OperatorKind.PREFIX else self.infix_levels
+            for operator in level.operators:
+                operators[operator] = i
+            if level.operand_rule is not None:
+                operand_levels.append(self.level_ids[level.operand_rule])
+            elif level.kind in (OperatorKind.PREFIX, OperatorKind.RIGHT):
+                operand_levels.append(i)
+            else:
+                operand_levels.append(i + 1)
+        self.operand_levels = tuple(operand_levels)
+
+    def parse_function(self, rule: str) -> ParseFunction:
+        level = self.level_ids[rule]
+
+        def parse(c: Cursor) -> ParseGenerator:
+            return (yield from self.parse_level(c, level, error_start=None))
+
+        parse.__name__ = f'parse_{rule}'
+        # The levels are parsed within the function, and only the operand rule is applied.
+        parse.referenced_parsers = (  # type: ignore[attr-defined]
+            self.operand_rule,
+            self.scan_operator,
+            *(level.factory for level in self.levels),
+        )
+        return parse
+
+    def parse_level(self, c: Cursor, min_level: int, error_start: int | None) -> ParseGenerator:
+        start = c.offset
+        left = yield from self.parse_prefix(c, min_level, error_start)
+        if isinstance(left, syntax.ErrorTerm):
+            return left
+        k = c.clone()
+        while (operator := self.scan_operator(k)) is not None:
+            level = self.infix_levels.get(operator)
+            if level is None or level < min_level:
+                break
+            spec = self.levels[level]
+            operand_level = self.operand_levels[level]
+            operators = [operator]
+            operands = [left]
+            while True:
+                right = yield from self.parse_level(k, operand_level, error_start=start)
+                if right is ParseFailed and not spec.operand_required:
+                    operators.pop()
+                    break
+                if isinstance(right, syntax.ErrorTerm):
+                    return self.expected_operand(k, operand_level, right)
+                c.copy_position_from(k)
+                operands.append(right)
+                if spec.kind is not OperatorKind.CHAIN:
+                    break
+                operator = self.scan_operator(k)
+                if operator is None or self.infix_levels.get(operator) != level:
+                    break
+                operators.append(operator)
+            if not operators:
+                break
+            left = self.build(c, level, operators, operands, start)
+            k.copy_position_from(c)
+        return left
+
+    def parse_prefix(self, c: Cursor, min_level: int, error_start: int | None) -> ParseGenerator:
+        start = c.offset
+        k = c.clone()
+        operator = self.scan_operator(k)
+        if operator is None or (level := self.prefix_levels.get(operator)) is None:
+            return (yield c.request_rule(self.operand_rule))
+        if level < min_level:
+            if error_start is None:
+                return (yield c.request_rule(self.operand_rule))
+            # A looser prefix operator right after another operator, e.g. 'a + not b'.
+            operand = yield from self.parse_level(k, level, error_start=None)
+            if operand is not ParseFailed and isinstance(operand, syntax.ErrorTerm):
+                return operand
+            if operand is not ParseFailed:
+                c.copy_position_from(k)
+            return syntax.ErrorTerm(
+                message=f"'{operator}' after an operator must be parenthesized",
+                location=c.engine.create_location(error_start, c.offset),
+            )
+        operand_level = self.operand_levels[level]
+        operand = yield from self.parse_level(k, operand_level, error_start=start)
+        if isinstance(operand, syntax.ErrorTerm):
+            return self.expected_operand(k, operand_level, operand)
+        c.copy_position_from(k)
+        return self.build(c, level, [operator], [operand], start)
+
+    def build(
+        self, c: Cursor, level: int, operators: list[str], operands: list[syntax.Term], start: int
+    ) -> syntax.Term:
+        location = c.engine.create_location(start, c.offset)
+        # A deferred factory gets a cursor of its own, as the cursor of the parse function is reused.
+        cursor = c.clone() if c.engine.deferred_terms else c
+        return c.build(self.levels[level].factory, cursor, operators, operands, location)
+
+    def expected_operand(self, c: Cursor, level: int, error: syntax.ErrorTerm) -> syntax.ErrorTerm:
+        if error is not ParseFailed:
+            return error
+        return syntax.ErrorTerm(
+            message='Expected rule "{}"',
+            location=c.engine.create_location(c.offset, c.offset),
+            message_args=(self.levels[level].rule,),
+        )
+
+
 class CellState(enum.IntEnum):
-    BLANK = 1
     START = 2
     DONE = 3
 
 
-@dataclasses.dataclass(frozen=True)
-class CellKey:
-    row: int
-    col: int
-    rule: str
+class Head:
+    """A left recursion grown at an offset: the rule it is grown at, and the rules involved in the recursion."""
+
+    __slots__ = ('eval_set', 'growing', 'involved', 'rule')
+
+    def __init__(self, rule: int) -> None:
+        self.rule = rule
+        self.involved: set[int] = set()
+        # Involved rules which are not yet re-evaluated in the current growing iteration.
+        self.eval_set: set[int] = set()
+        # The cells of a growing recursion must stay in the memo, the seed is lost otherwise.
+        self.growing = False
 
 
-@dataclasses.dataclass
 class Cell:
-    next_row: int
-    next_col: int
-    growable: bool
-    state: CellState
-    term: syntax.Term
+    __slots__ = ('alternative', 'cost', 'growable', 'head', 'next_offset', 'recursive_alternatives', 'state', 'term')
+
+    def __init__(self, next_offset: int, growable: bool, state: CellState, term: syntax.Term) -> None:
+        self.next_offset = next_offset
+        self.growable = growable
+        self.state = state
+        self.term = term
+        self.head: Head | None = None
+        # Index of the alternative being evaluated, and a bit mask of the alternatives which reached a left recursion.
+        self.alternative = 0
+        self.recursive_alternatives = 0
+        # Number of rule evaluations it took to compute the cell, i.e. the cost of evicting it.
+        self.cost = 0
+
+
+# Number of cells from which the memo table is shrunk when it has no budget.
+MEMO_SHRINK_SIZE = 4096
+
+
+class CellMemo:
+    """Packrat memo table keyed by (config id, flat offset, rule id), packed into a single integer key."""
+
+    def __init__(self, rule_count: int, offset_count: int) -> None:
+        self.rule_count = rule_count
+        self.offset_count = offset_count
+        self.cells: dict[int, Cell] = {}
+        # The cells before the committed offset are not needed anymore, see Cursor.commit.
+        self.committed_offset = 0
+        # Maximum number of cells to retain, if any.
+        self.budget: int | None = None
+        # Number of cells above which the table is shrunk.
+        self.limit = MEMO_SHRINK_SIZE
+        self.peak = 0
+        self.evicted = 0
+
+    def key(self, offset: int, rule: int, config_id: int) -> int:
+        return (config_id * self.offset_count + offset) * self.rule_count + rule
+
+    def get(self, offset: int, rule: int, config_id: int) -> Cell | None:
+        return self.cells.get(self.key(offset, rule, config_id))
+
+    def put(self, offset: int, rule: int, config_id: int, cell: Cell) -> None:
+        self.cells[self.key(offset, rule, config_id)] = cell
+        if len(self.cells) > self.limit:
+            self.shrink()
+
+    def commit(self, offset: int) -> None:
+        self.committed_offset = max(self.committed_offset, offset)
+
+    def set_budget(self, budget: int | None) -> None:
+        self.budget = budget
+        self.limit = MEMO_SHRINK_SIZE if budget is None else budget
+        if len(self.cells) > self.limit:
+            self.shrink()
+
+    @property
+    def high_water(self) -> int:
+        """Returns the highest number of cells retained at once."""
+        return max(self.peak, len(self.cells))
+
+    def shrink(self) -> None:
+        """Evicts the cells before the committed offset, then the cheapest cells until the table fits its budget.
+
+        Cells being evaluated or part of a growing left recursion are kept, the others are evaluated again when needed.
+        """
+        self.peak = max(self.peak, len(self.cells))
+        evictable: list[tuple[int, int]] = []
+        for key, cell in list(self.cells.items()):
+            if cell.state is not CellState.DONE or (cell.head is not None and cell.head.growing):
+                continue
+            if (key // self.rule_count) % self.offset_count < self.committed_offset:
+                del self.cells[key]
+                self.evicted += 1
+            else:
+                evictable.append((cell.cost, key))
+        if self.budget is not None and len(self.cells) > self.budget:
+            evictable.sort()
+            # Leave some room, so the table is not shrunk again on the next put.
+            excess = len(self.cells) - self.budget * 3 // 4
+            for _, key in evictable[:excess]:
+                del self.cells[key]
+            self.evicted += min(excess, len(evictable))
+        if self.budget is None:
+            self.limit = max(MEMO_SHRINK_SIZE, 2 * len(self.cells))
+        else:
+            self.limit = max(self.budget, len(self.cells) + max(1, self.budget // 4))
 
+    def __len__(self) -> int:
+        return len(self.cells)
 
-CellMemo = dict[CellKey, Cell]
+    def items(self) -> Iterator[tuple[int, int, int, Cell]]:
+        for key, cell in self.cells.items():
+            position, rule = divmod(key, self.rule_count)
+            config_id, offset = divmod(position, self.offset_count)
+            yield offset, rule, config_id, cell
+
+    def footprint(self) -> int:
+        """Returns the approximate number of bytes held by the table, excluding the memoized terms."""
+        return sys.getsizeof(self.cells) + sum(sys.getsizeof(k) + sys.getsizeof(c) for k, c in self.cells.items())
+
+
+class TokenArray:
+    """Tokens of a chunk, produced once by applying the grammar's token rule from the start to the end of the text."""
+
+    def __init__(self) -> None:
+        self.terms: list[syntax.Term] = []
+        self.kinds: list[str | None] = []
+        # Offset where scanning of each token started (the end of the previous token), and where the token ended.
+        self.starts = array.array('l')
+        self.ends = array.array('l')
+        self.index_by_start: dict[int, int] = {}
+
+    def append(self, term: syntax.Term, kind: str | None, start: int, end: int) -> None:
+        self.index_by_start[start] = len(self.terms)
+        self.terms.append(term)
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self.terms)
 
 
 class PegEngine:
-    def __init__(self, line_records: list[line_record.LineRecord], grammar_rule_map: GrammarRuleMap):
+    def __init__(self, line_records: list[line_record.LineRecord], grammar: CompiledGrammar):
         self.line_records = line_records
-        self.grammar_rule_map = grammar_rule_map
-        self.cell_memo: CellMemo = {}
+        self.grammar = grammar
+        # The engine works on the concatenated text of the chunk, addressed by a single character offset.
+        # Line and column are only derived from the line table when a position is actually needed.
+        self.text = ''.join(line.text for line in line_records)
+        self.text_length = len(self.text)
+        self.line_table = line_record.LineTable(line_records)
+        self.cell_memo = CellMemo(len(grammar.rules), self.text_length + 1)
+        # Configs interned to ids from 1, as id 0 is shared by the config independent rules.
+        self.configs: list[Config] = []
+        # Ids of the configs by the id of their mode. The entries keep their mode alive, so its id is not reused.
+        self.config_ids: dict[int, tuple[syntax.Term, int]] = {}
+        self.tokens: TokenArray | None = None
+        # Number of alternative attempts avoided by FIRST set prediction, per rule id.
+        self.skipped_alternatives = [0] * len(grammar.rules)
         # Set a call stack limit to prevent infinite recursion in rule applications
         self.rule_call_stack_limit = 1000
+        # Rules being evaluated for the first time at an offset, innermost last.
+        self.rule_calls: list[tuple[int, Cell]] = []
+        # The innermost rule evaluation which raised and its offset, as the rule calls are popped when it propagates.
+        self.raised_call: tuple[int, int] | None = None
+        # Left recursions being grown, by (offset, config id).
+        self.heads: dict[tuple[int, int], Head] = {}
+        # Number of rule evaluations, which measures the cost of the memo cells.
+        self.evaluations = 0
+        # Set once the parse budget is exceeded, and returned by every rule application from then on.
+        self.exhausted: syntax.ErrorTerm | None = None
+        self.set_parse_budget(None)
+        # Whether Cursor.build returns matches, which are built once the chunk has parsed.
+        self.deferred_terms = False
+
+    def set_parse_budget(self, budget: ParseBudget | None) -> None:
+        self.budget = budget
+        self.budget_steps = 0
+        self.budget_start = time.perf_counter()
+        # Rule applications left until the budget is checked, out of the number of applications between checks.
+        self.budget_countdown = self.budget_period = sys.maxsize
+        self.rule_samples: list[int] = []
+        if budget is not None:
+            self.rule_samples = [0] * len(self.grammar.rules)
+            self.schedule_budget_check()
+
+    def schedule_budget_check(self) -> None:
+        budget = cast('ParseBudget', self.budget)
+        period = BUDGET_CHECK_INTERVAL
+        if budget.max_steps is not None:
+            period = max(1, min(period, budget.max_steps - self.budget_steps))
+        self.budget_countdown = self.budget_period = period
+
+    def check_budget(self, offset: int, rule: int) -> syntax.ErrorTerm | None:
+        """Called when the budget countdown runs out, returns the error to parse with once the budget is exceeded."""
+        if self.exhausted is not None or self.budget is None:
+            return self.exhausted
+        self.budget_steps += self.budget_period
+        self.rule_samples[rule] += 1
+        elapsed = time.perf_counter() - self.budget_start
+        max_steps, max_seconds = self.budget.max_steps, self.budget.max_seconds
+        if (max_steps is None or self.budget_steps < max_steps) and (max_seconds is None or elapsed < max_seconds):
+            self.schedule_budget_check()
+            return None
+        hottest = max(range(len(self.rule_samples)), key=self.rule_samples.__getitem__)
+        self.exhausted = syntax.ErrorTerm(
+            message=f'Parse budget exceeded after {self.budget_steps} rule applications in {elapsed:.3f}s, '
+            f'the hottest rule is "{self.grammar.rule_names[hottest]}".',
+            location=self.create_location(offset, offset),
+        )
+        return self.exhausted
 
-    def call_parse_function(
-        self, key: CellKey, function: ParseFunction | str, config: Config
-    ) -> tuple[syntax.Term, int, int]:
-        cursor = Cursor(key.row, key.col, config=config, engine=self)
-
-        def create_location() -> syntax.Location:
-            start_cursor = Cursor(key.row, key.col, config=config, engine=self)
-            return syntax.Location(start=start_cursor.current_position(), end=cursor.current_position())
-
-        def route(rule: str) -> ParseFunction:
-            def parse(c: Cursor) -> syntax.Term:
-                return c.consume_rule(rule)
+    def position(self, offset: int) -> syntax.Position:
+        line, column = self.line_table.line_column(offset)
+        return syntax.Position(line, column)
 
-            return parse
+    def create_location(self, start_offset: int, end_offset: int) -> syntax.Location:
+        return syntax.Location.from_span(self.line_table, start_offset, end_offset)
 
+    def call_parse_function(
+        self, offset: int, rule: int, function: CompiledParseFunction, config: Config
+    ) -> tuple[syntax.Term, int]:
+        next_offset = offset
+        cursor: Cursor | None = None
         try:
-            if isinstance(function, str):
-                term = route(function)(cursor)
+            if isinstance(function, int):
+                # Aliases were resolved when the grammar was compiled, so they are applied directly.
+                term, next_offset = self.apply_rule(offset, function, config)
             else:
-                term = function(cursor)
+                cursor = Cursor(offset, config=config, engine=self)
+                result = function(cursor)
+                if isinstance(result, GeneratorType):
+                    term = self.run_parse_generator(result)
+                else:
+                    term = cast('syntax.Term', result)
+                next_offset = cursor.offset
             if term is None:
-                term = syntax.ErrorTerm(
-                    message=f'PegEngine: rule={key.rule}:{parse_function_name(function)} returned None.',
-                    location=create_location(),
-                )
-        except Exception as e:  # noqa: BLE001  The user provided function may raise any exception.
-            term = syntax.ErrorTerm(
-                message=f'PegEngine: rule={key.rule}:{parse_function_name(function)} error={e}',
-                location=create_location(),
-            )
-        return term, cursor.row, cursor.col
+                term = self.parse_function_error(rule, function, 'returned None.', offset, next_offset)
+        except Exception as e:
+            # The user provided function may raise any exception, which is reported as an error term.
+            logger.debug('Parse function of rule %s raised.', self.grammar.rule_names[rule], exc_info=True)
+            if cursor is not None:
+                next_offset = cursor.offset
+            term = self.parse_function_error(rule, function, f'error={e}', offset, next_offset)
+        return term, next_offset
+
+    def parse_function_error(
+        self, rule: int, function: CompiledParseFunction, detail: str, offset: int, next_offset: int
+    ) -> syntax.ErrorTerm:
+        return syntax.ErrorTerm(
+            message=f'PegEngine: rule={self.grammar.rule_names[rule]}:{self.grammar.parse_function_name(function)} {detail}',
+            location=self.create_location(offset, next_offset),
+        )
 
-    def call_ordered_parse_functions(self, key: CellKey, config: Config) -> tuple[syntax.Term, int, int]:
-        functions = self.grammar_rule_map.get(key.rule)
+    def run_parse_generator(self, parse: ParseGenerator) -> syntax.Term:
+        """Runs a generator parse function, applying the rules it requests with nested calls."""
+        term: syntax.Term | None = None
+        try:
+            while True:
+                request = parse.send(cast('syntax.Term', term))
+                term, request.cursor.offset = self.apply_rule(request.cursor.offset, request.rule, request.config)
+        except StopIteration as stop:
+            return stop.value
+
+    def upcoming_token_kind(self, offset: int) -> str | None:
+        if self.tokens is None:
+            return None
+        index = self.tokens.index_by_start.get(offset)
+        if index is None:
+            return None
+        return self.tokens.kinds[index]
+
+    def call_ordered_parse_functions(
+        self, offset: int, rule: int, config: Config, cell: Cell | None = None, *, recursive_only: bool = False
+    ) -> tuple[syntax.Term, int]:
+        functions = self.grammar.rules[rule]
         if not functions:
-            raise tapl_error.TaplError(f'Rule "{key.rule}" is not defined in the Grammar.')
-        for fn in functions:
-            term, row, col = self.call_parse_function(key, fn, config=config)
+            raise tapl_error.TaplError(f'Rule "{self.grammar.rule_names[rule]}" is not defined in the Grammar.')
+        kind = self.upcoming_token_kind(offset)
+        first_sets = self.grammar.first_sets[rule]
+        for index, fn in enumerate(functions):
+            if cell is not None:
+                # Only the alternatives which reached the left recursion can grow its seed.
+                if recursive_only and not (cell.recursive_alternatives >> index) & 1:
+                    continue
+                cell.alternative = index
+            # The alternative cannot start with the upcoming token, so it would fail anyway.
+            if kind is not None and (first := first_sets[index]) is not None and kind not in first:
+                self.skipped_alternatives[rule] += 1
+                continue
+            term, next_offset = self.call_parse_function(offset, rule, fn, config=config)
             if term is not ParseFailed:
-                return term, row, col
-        return ParseFailed, key.row, key.col
-
-    def grow_seed(self, key: CellKey, cell: Cell, config: Config) -> None:
-        seed_next_row, seed_next_col = cell.next_row, cell.next_col
-        iteration_count = 10  # Prevent infinite loop by limiting iterations
-        while iteration_count > 0:
-            iteration_count -= 1
-            term, next_row, next_col = self.call_ordered_parse_functions(key, config)
-            if term is ParseFailed:
-                cell.term = syntax.ErrorTerm(
-                    message='PegEngine: Once ordered_parse_functions was successful, but it failed afterward. This indicates an inconsistency between ordered parse functions.'
-                )
-                return
-            if isinstance(term, syntax.ErrorTerm):
-                cell.term = term
-                return
-            # Stop growing when the new next position mathches seed's next position, as this indicates a cycle.
-            if next_row == seed_next_row and next_col == seed_next_col:
-                return
-            cell.term, cell.next_row, cell.next_col = term, next_row, next_col
-        cell.term = syntax.ErrorTerm(message='PegEngine: Growing failed due to too many iterations.')
-
-    def apply_rule(self, row: int, col: int, rule: str, config: Config) -> tuple[syntax.Term, int, int]:
-        self.rule_call_stack_limit -= 1
-        if self.rule_call_stack_limit < 0:
-            error = syntax.ErrorTerm(message='PEG Parser: Rule application limit exceeded.')
-            return (error, row, col)
-        cell_key = CellKey(row, col, rule)
-        cell = self.cell_memo.get(cell_key)
-        if not cell:
-            cell = Cell(
-                next_row=cell_key.row, next_col=cell_key.col, growable=False, state=CellState.BLANK, term=ParseFailed
-            )
-            self.cell_memo[cell_key] = cell
-        if cell.state == CellState.BLANK:
-            cell.state = CellState.START
-            cell.term, cell.next_row, cell.next_col = self.call_ordered_parse_functions(cell_key, config)
-            cell.state = CellState.DONE
-            if cell.growable and not isinstance(cell.term, syntax.ErrorTerm):
-                self.grow_seed(cell_key, cell, config)
-        elif cell.state == CellState.START:
-            # Left recursion detected. Delaying expansion of this rule.
+                return term, next_offset
+        return ParseFailed, offset
+
+    def prediction_stats(self) -> dict[str, int]:
+        """Returns the number of alternative attempts avoided by FIRST set prediction, per rule name."""
+        return {self.grammar.rule_names[rule]: count for rule, count in enumerate(self.skipped_alternatives) if count}
+
+    def setup_left_recursion(self, rule: int, cell: Cell) -> None:
+        if cell.head is None:
+            cell.head = Head(rule)
             cell.growable = True
-        elif cell.state == CellState.DONE:
-            # Rule already parsed at this position, so no further action is required.
-            pass
+        head = cell.head
+        # Every rule called between the head and the recursive application is involved in the recursion.
+        for call_rule, call_cell in reversed(self.rule_calls):
+            if call_cell is cell:
+                if not self.grammar.left_recursive[rule]:
+                    # The alternative reaching the recursion was not tracked, so the seed cannot be grown.
+                    raise tapl_error.TaplError(
+                        f'Rule "{self.grammar.rule_names[rule]}" is left recursive, but its parse functions do not '
+                        'show it. Declare the rules they apply with the references decorator.'
+                    )
+                cell.recursive_alternatives |= 1 << cell.alternative
+                break
+            if call_cell.head is head:
+                break
+            call_cell.head = head
+            head.involved.add(call_rule)
+
+    def config_id(self, rule: int, config: Config) -> int:
+        if self.grammar.config_independent[rule]:
+            return 0
+        entry = self.config_ids.get(id(config.mode))
+        if entry is not None and entry[0] is config.mode:
+            return entry[1]
+        return self.intern_config(config)
+
+    def intern_config(self, config: Config) -> int:
+        """Returns the id of the config, comparing it to the known configs once per mode object."""
+        config_id = next((i + 1 for i, known in enumerate(self.configs) if known == config), 0)
+        if not config_id:
+            self.configs.append(config)
+            config_id = len(self.configs)
+        self.config_ids[id(config.mode)] = (config.mode, config_id)
+        return config_id
+
+    def recall(self, offset: int, rule: int, config: Config, config_id: int) -> Cell | None:
+        cell = self.cell_memo.get(offset, rule, config_id)
+        head = self.heads.get((offset, config_id)) if self.heads else None
+        if head is None:
+            return cell
+        if cell is None:
+            if rule != head.rule and rule not in head.involved:
+                # Rules which are not involved are not memoized while the head is growing.
+                return Cell(next_offset=offset, growable=False, state=CellState.DONE, term=ParseFailed)
+            return None
+        if rule in head.eval_set:
+            head.eval_set.discard(rule)
+            cell.term, cell.next_offset = self.call_ordered_parse_functions(offset, rule, config)
+        return cell
+
+    def grow_seed(self, offset: int, rule: int, cell: Cell, config: Config, config_id: int) -> None:
+        """Grows the seed of a left recursion until it stops consuming more text (Warth et al.)."""
+        head = cast('Head', cell.head)
+        outer_head = self.heads.get((offset, config_id))
+        self.heads[offset, config_id] = head
+        head.growing = True
+        while True:
+            head.eval_set = set(head.involved)
+            term, next_offset = self.call_ordered_parse_functions(offset, rule, config, cell, recursive_only=True)
+            if term is not ParseFailed and isinstance(term, syntax.ErrorTerm):
+                cell.term = term
+                break
+            if term is ParseFailed or next_offset <= cell.next_offset:
+                break
+            cell.term, cell.next_offset = term, next_offset
+        head.growing = False
+        if outer_head is None:
+            del self.heads[offset, config_id]
         else:
-            cell.term = syntax.ErrorTerm(f'PEG Parser Engine: Unknown cell state [{cell.state}] at {cell_key}.')
-        self.rule_call_stack_limit += 1
-        return cell.term, cell.next_row, cell.next_col
+            self.heads[offset, config_id] = outer_head
+
+    def lex(self, config: Config) -> TokenArray:
+        """Tokenizes the whole text once, so the token rule is served from the token array instead of the memo."""
+        token_rule = self.grammar.token_rule_id
+        if token_rule is None:
+            raise tapl_error.TaplError('The grammar does not define a token rule.')
+        tokens = TokenArray()
+        token_kind = self.grammar.token_kind
+        offset = 0
+        while True:
+            term, next_offset = self.call_ordered_parse_functions(offset, token_rule, config)
+            # Stop at the first error. Applying the token rule at that offset while parsing reports it in context.
+            if isinstance(term, syntax.ErrorTerm):
+                break
+            tokens.append(term, token_kind(term) if token_kind else None, offset, next_offset)
+            # A token which consumes nothing marks the end of the text.
+            if next_offset == offset:
+                break
+            offset = next_offset
+        self.tokens = tokens
+        return tokens
+
+    def apply_rule(self, offset: int, rule: int, config: Config) -> tuple[syntax.Term, int]:
+        if rule == self.grammar.token_rule_id and self.tokens is not None:
+            index = self.tokens.index_by_start.get(offset)
+            if index is not None:
+                return self.tokens.terms[index], self.tokens.ends[index]
+        self.budget_countdown -= 1
+        if self.budget_countdown <= 0 and (exhausted := self.check_budget(offset, rule)) is not None:
+            return exhausted, offset
+        # The limit and the rule calls are restored when a parse function raises, so the engine can parse again.
+        self.rule_call_stack_limit -= 1
+        try:
+            if self.rule_call_stack_limit < 0:
+                error = syntax.ErrorTerm(message='PEG Parser: Rule application limit exceeded.')
+                return (error, offset)
+            config_id = self.config_id(rule, config)
+            cell = self.recall(offset, rule, config, config_id)
+            if cell is None:
+                cell = Cell(next_offset=offset, growable=False, state=CellState.START, term=ParseFailed)
+                self.cell_memo.put(offset, rule, config_id, cell)
+                self.rule_calls.append((rule, cell))
+                try:
+                    evaluations = self.evaluations
+                    self.evaluations += 1
+                    # A rule which is never left recursive does not track the alternative reaching the recursion.
+                    tracked = cell if self.grammar.left_recursive[rule] else None
+                    cell.term, cell.next_offset = self.call_ordered_parse_functions(offset, rule, config, tracked)
+                    cell.cost = self.evaluations - evaluations
+                except Exception:
+                    if self.raised_call is None:
+                        self.raised_call = (rule, offset)
+                    raise
+                finally:
+                    self.rule_calls.pop()
+                cell.state = CellState.DONE
+                if cell.head is not None and cell.head.rule == rule and not isinstance(cell.term, syntax.ErrorTerm):
+                    self.grow_seed(offset, rule, cell, config, config_id)
+            elif cell.state is CellState.START:
+                # Left recursion detected. The current seed is returned, and grown once the head rule has parsed it.
+                self.setup_left_recursion(rule, cell)
+            return cell.term, cell.next_offset
+        finally:
+            self.rule_call_stack_limit += 1
+
+    def parse(self, config: Config) -> tuple[syntax.Term, int]:
+        """Lexes the text if the grammar has a token rule, and applies the start rule from the start of the text."""
+        if self.grammar.token_rule_id is not None:
+            self.lex(config)
+        return self.apply_rule(0, self.grammar.start_rule_id, config=config)
 
     def dump(self) -> str:
         return 'Use PegEngineDebug to get the engine dump.'
 
 
+class StrictPegEngine(PegEngine):
+    """Fast variant of the engine, which calls the parse functions without turning their exceptions into errors.
+
+    An exception raised by a parse function propagates to parse, which turns it into an error of the whole chunk.
+    Cursors are pooled and reused, so a parse function must not keep its cursor once it returns, but a clone of it.
+    The tolerant PegEngine reports the failing parse function instead, which is more useful to debug a grammar.
+    """
+
+    def __init__(self, line_records: list[line_record.LineRecord], grammar: CompiledGrammar) -> None:
+        super().__init__(line_records, grammar)
+        self.free_cursors: list[Cursor] = []
+
+    def call_parse_function(
+        self, offset: int, rule: int, function: CompiledParseFunction, config: Config
+    ) -> tuple[syntax.Term, int]:
+        del rule
+        if isinstance(function, int):
+            return self.apply_rule(offset, function, config)
+        cursors = self.free_cursors
+        if cursors:
+            cursor = cursors.pop()
+            cursor.offset = offset
+            cursor.config = config
+        else:
+            cursor = Cursor(offset, config, self)
+        result = function(cursor)
+        term = self.run_parse_generator(result) if isinstance(result, GeneratorType) else result
+        cursors.append(cursor)
+        if term is None:
+            raise tapl_error.TaplError(f'{self.grammar.parse_function_name(function)} returned None.')
+        return cast('syntax.Term', term), cursor.offset
+
+    def parse(self, config: Config) -> tuple[syntax.Term, int]:
+        try:
+            return super().parse(config)
+        except Exception as e:
+            # The user provided functions may raise any exception. The innermost rule being evaluated is the one which
+            # failed.
+            rule, offset = self.raised_call or (self.grammar.start_rule_id, 0)
+            self.raised_call = None
+            logger.debug('Parse function of rule %s raised.', self.grammar.rule_names[rule], exc_info=True)
+            error = syntax.ErrorTerm(
+                message=f'PegEngine: rule={self.grammar.rule_names[rule]} error={e}',
+                location=self.create_location(offset, offset),
+            )
+            return error, offset
+
+
+# A rule application in progress on the stack of the StackPegEngine. It yields the (offset, rule id, config) of the
+# rules it applies, receives their (term, next offset), and returns its own.
+RuleFrame = Generator[tuple[int, int, Config], tuple[syntax.Term, int], tuple[syntax.Term, int]]
+
+# Number of nested rule applications the StackPegEngine allows by default.
+DEFAULT_MAX_NESTING = 1_000_000
+
+
+class StackPegEngine(PegEngine):
+    """Runs the rule applications on an explicit stack of frames instead of the Python call stack.
+
+    Generator parse functions are suspended while the rules they request are applied, so the nesting depth of the
+    text is bounded by the max_nesting budget instead of the interpreter recursion limit. Plain parse functions still
+    apply their rules with nested calls. The memo and left recursion handling are the same as in PegEngine.
+    """
+
+    def __init__(
+        self,
+        line_records: list[line_record.LineRecord],
+        grammar: CompiledGrammar,
+        max_nesting: int = DEFAULT_MAX_NESTING,
+    ) -> None:
+        super().__init__(line_records, grammar)
+        self.rule_call_stack_limit = max_nesting
+
+    def apply_rule(self, offset: int, rule: int, config: Config) -> tuple[syntax.Term, int]:
+        if rule == self.grammar.token_rule_id and self.tokens is not None:
+            index = self.tokens.index_by_start.get(offset)
+            if index is not None:
+                return self.tokens.terms[index], self.tokens.ends[index]
+        return self.run(self.rule_frame(offset, rule, config))
+
+    def run(self, frame: RuleFrame) -> tuple[syntax.Term, int]:
+        stack = [frame]
+        result: tuple[syntax.Term, int] | None = None
+        error: Exception | None = None
+        while True:
+            try:
+                if error is None:
+                    request = stack[-1].send(cast('tuple[syntax.Term, int]', result))
+                else:
+                    request, error = stack[-1].throw(error), None
+            except StopIteration as stop:
+                stack.pop()
+                if not stack:
+                    return stop.value
+                result, error = stop.value, None
+                continue
+            except Exception as e:
+                # Raised into the parent frame, as from a nested call.
+                stack.pop()
+                if not stack:
+                    raise
+                error = e
+                continue
+            stack.append(self.rule_frame(*request))
+            result = None
+
+    def rule_frame(self, offset: int, rule: int, config: Config) -> RuleFrame:
+        """Applies the rule like PegEngine.apply_rule does."""
+        if rule == self.grammar.token_rule_id and self.tokens is not None:
+            index = self.tokens.index_by_start.get(offset)
+            if index is not None:
+                return self.tokens.terms[index], self.tokens.ends[index]
+        self.budget_countdown -= 1
+        if self.budget_countdown <= 0 and (exhausted := self.check_budget(offset, rule)) is not None:
+            return exhausted, offset
+        if self.rule_call_stack_limit <= 0:
+            return syntax.ErrorTerm(message='PEG Parser: Rule nesting limit exceeded.'), offset
+        self.rule_call_stack_limit -= 1
+        try:
+            config_id = self.config_id(rule, config)
+            cell = self.cell_memo.get(offset, rule, config_id)
+            head = self.heads.get((offset, config_id)) if self.heads else None
+            if head is not None:
+                if cell is None and rule != head.rule and rule not in head.involved:
+                    # Rules which are not involved are not memoized while the head is growing.
+                    cell = Cell(next_offset=offset, growable=False, state=CellState.DONE, term=ParseFailed)
+                elif cell is not None and rule in head.eval_set:
+                    head.eval_set.discard(rule)
+                    cell.term, cell.next_offset = yield from self.alternatives_frame(offset, rule, config)
+            if cell is None:
+                cell = Cell(next_offset=offset, growable=False, state=CellState.START, term=ParseFailed)
+                self.cell_memo.put(offset, rule, config_id, cell)
+                self.rule_calls.append((rule, cell))
+                try:
+                    evaluations = self.evaluations
+                    self.evaluations += 1
+                    tracked = cell if self.grammar.left_recursive[rule] else None
+                    cell.term, cell.next_offset = yield from self.alternatives_frame(offset, rule, config, tracked)
+                    cell.cost = self.evaluations - evaluations
+                finally:
+                    self.rule_calls.pop()
+                cell.state = CellState.DONE
+                if cell.head is not None and cell.head.rule == rule and not isinstance(cell.term, syntax.ErrorTerm):
+                    yield from self.grow_seed_frame(offset, rule, cell, config, config_id)
+            elif cell.state is CellState.START:
+                self.setup_left_recursion(rule, cell)
+            return cell.term, cell.next_offset
+        finally:
+            self.rule_call_stack_limit += 1
+
+    def grow_seed_frame(self, offset: int, rule: int, cell: Cell, config: Config, config_id: int) -> RuleFrame:
+        """Grows the seed of a left recursion like PegEngine.grow_seed does."""
+        head = cast('Head', cell.head)
+        outer_head = self.heads.get((offset, config_id))
+        self.heads[offset, config_id] = head
+        head.growing = True
+        while True:
+            head.eval_set = set(head.involved)
+            term, next_offset = yield from self.alternatives_frame(offset, rule, config, cell, recursive_only=True)
+            if term is not ParseFailed and isinstance(term, syntax.ErrorTerm):
+                cell.term = term
+                break
+            if term is ParseFailed or next_offset <= cell.next_offset:
+                break
+            cell.term, cell.next_offset = term, next_offset
+        head.growing = False
+        if outer_head is None:
+            del self.heads[offset, config_id]
+        else:
+            self.heads[offset, config_id] = outer_head
+        return cell.term, cell.next_offset
+
+    def alternatives_frame(
+        self, offset: int, rule: int, config: Config, cell: Cell | None = None, *, recursive_only: bool = False
+    ) -> RuleFrame:
+        """Tries the alternatives of the rule like PegEngine.call_ordered_parse_functions does."""
+        functions = self.grammar.rules[rule]
+        if not functions:
+            raise tapl_error.TaplError(f'Rule "{self.grammar.rule_names[rule]}" is not defined in the Grammar.')
+        kind = self.upcoming_token_kind(offset)
+        first_sets = self.grammar.first_sets[rule]
+        for index, fn in enumerate(functions):
+            if cell is not None:
+                if recursive_only and not (cell.recursive_alternatives >> index) & 1:
+                    continue
+                cell.alternative = index
+            if kind is not None and (first := first_sets[index]) is not None and kind not in first:
+                self.skipped_alternatives[rule] += 1
+                continue
+            term, next_offset = yield from self.function_frame(offset, rule, fn, config)
+            if term is not ParseFailed:
+                return term, next_offset
+        return ParseFailed, offset
+
+    def function_frame(self, offset: int, rule: int, function: CompiledParseFunction, config: Config) -> RuleFrame:
+        """Calls the parse function like PegEngine.call_parse_function does, suspending it on the rules it requests."""
+        next_offset = offset
+        cursor: Cursor | None = None
+        try:
+            if isinstance(function, int):
+                term, next_offset = yield offset, function, config
+            else:
+                cursor = Cursor(offset, config=config, engine=self)
+                result = function(cursor)
+                if isinstance(result, GeneratorType):
+                    value: syntax.Term | None = None
+                    while True:
+                        try:
+                            request = result.send(value)
+                        except StopIteration as stop:
+                            term = stop.value
+                            break
+                        value, request.cursor.offset = yield request.cursor.offset, request.rule, request.config
+                else:
+                    term = cast('syntax.Term', result)
+                next_offset = cursor.offset
+            if term is None:
+                term = self.parse_function_error(rule, function, 'returned None.', offset, next_offset)
+        except Exception as e:
+            # The user provided function may raise any exception, which is reported as an error term.
+            logger.debug('Parse function of rule %s raised.', self.grammar.rule_names[rule], exc_info=True)
+            if cursor is not None:
+                next_offset = cursor.offset
+            term = self.parse_function_error(rule, function, f'error={e}', offset, next_offset)
+        return term, next_offset
+
+
 @dataclasses.dataclass
 class ParseTrace:
-    start_row: int
-    start_col: int
-    end_row: int
-    end_col: int
+    start_offset: int
+    end_offset: int
     rule: str
     function_name: str
     term: syntax.Term
@@ -290,8 +1613,8 @@ class ParseTrace:
 
 
 class PegEngineDebug(PegEngine):
-    def __init__(self, line_records: list[line_record.LineRecord], grammar_rule_map: GrammarRuleMap):
-        super().__init__(line_records, grammar_rule_map)
+    def __init__(self, line_records: list[line_record.LineRecord], grammar: CompiledGrammar):
+        super().__init__(line_records, grammar)
         self.parse_traces: list[ParseTrace] = []
         self._next_call_order = 0
         self.growing_id: int | None = None
@@ -303,20 +1626,18 @@ class PegEngineDebug(PegEngine):
         return self._next_call_order
 
     def call_parse_function(
-        self, key: CellKey, function: ParseFunction | str, config: Config
-    ) -> tuple[syntax.Term, int, int]:
+        self, offset: int, rule: int, function: CompiledParseFunction, config: Config
+    ) -> tuple[syntax.Term, int]:
         old_applied_rules = self.applied_rules
         self.applied_rules = []
         start_call_order = self.next_call_order()
-        term, row, col = super().call_parse_function(key, function, config=config)
+        term, next_offset = super().call_parse_function(offset, rule, function, config=config)
         self.parse_traces.append(
             ParseTrace(
-                start_row=key.row,
-                start_col=key.col,
-                end_row=row,
-                end_col=col,
-                rule=key.rule,
-                function_name=parse_function_name(function),
+                start_offset=offset,
+                end_offset=next_offset,
+                rule=self.grammar.rule_names[rule],
+                function_name=self.grammar.parse_function_name(function),
                 term=term,
                 start_call_order=start_call_order,
                 end_call_order=self.next_call_order(),
@@ -325,21 +1646,26 @@ class PegEngineDebug(PegEngine):
             )
         )
         self.applied_rules = old_applied_rules
-        return term, row, col
+        return term, next_offset
 
-    def grow_seed(self, key: CellKey, cell: Cell, config: Config) -> None:
+    def grow_seed(self, offset: int, rule: int, cell: Cell, config: Config, config_id: int) -> None:
         old_growing_id = self.growing_id
         self.next_growing_id += 1
         self.growing_id = self.next_growing_id
-        super().grow_seed(key, cell, config)
+        super().grow_seed(offset, rule, cell, config, config_id)
         self.growing_id = old_growing_id
 
-    def apply_rule(self, row: int, col: int, rule: str, config: Config) -> tuple[syntax.Term, int, int]:
-        self.applied_rules.append(f'{row}:{col}:{rule}')
-        term, next_row, next_col = super().apply_rule(row, col, rule, config)
-        if self.cell_memo[CellKey(row, col, rule)].state == CellState.START:
+    def apply_rule(self, offset: int, rule: int, config: Config) -> tuple[syntax.Term, int]:
+        self.applied_rules.append(f'{self.format_offset(offset)}:{self.grammar.rule_names[rule]}')
+        term, next_offset = super().apply_rule(offset, rule, config)
+        cell = self.cell_memo.get(offset, rule, self.config_id(rule, config))
+        if cell is not None and cell.state is CellState.START:
             self.applied_rules[-1] += ' (left recursion)'
-        return term, next_row, next_col
+        return term, next_offset
+
+    def format_offset(self, offset: int) -> str:
+        row, col = self.line_table.row_col(offset)
+        return f'{row}:{col}'
 
     def dump_term(self, term: syntax.Term | None) -> tuple[str, str]:
         if term is None:
@@ -357,32 +1683,32 @@ class PegEngineDebug(PegEngine):
 
     def dump_cell_memo(self) -> list[list[str]]:
         table = [['Start/Rule', 'End', 'Status', 'Details']]
-        sorted_cells = sorted(self.cell_memo.items(), key=lambda item: (item[0].row, item[0].col, item[0].rule))
-        for (row, col), group in itertools.groupby(sorted_cells, key=lambda item: (item[0].row, item[0].col)):
-            table.append([f'{row}:{col}', '', '', ''])
+        rule_names = self.grammar.rule_names
+        sorted_cells = sorted(self.cell_memo.items(), key=lambda item: (item[0], rule_names[item[1]], item[2]))
+        for offset, group in itertools.groupby(sorted_cells, key=lambda item: item[0]):
+            table.append([self.format_offset(offset), '', '', ''])
             for item in group:
-                cell = item[1]
+                cell = item[3]
                 if cell.state == CellState.DONE:
                     state, details = self.dump_term(cell.term)
                 else:
                     state = cell.state.name.capitalize()
                     details = ''
                 state += ' Grown' if cell.growable else ''
-                table.append([f'   {item[0].rule}', f'{cell.next_row}:{cell.next_col}', state, details])
+                rule = rule_names[item[1]] + (f' #{item[2]}' if item[2] else '')
+                table.append([f'   {rule}', self.format_offset(cell.next_offset), state, details])
         return table
 
     def tableize_parse_traces(self) -> list[list[str]]:
-        sorted_traces = sorted(self.parse_traces, key=lambda t: (t.start_row, t.start_col, t.rule, t.start_call_order))
+        sorted_traces = sorted(self.parse_traces, key=lambda t: (t.start_offset, t.rule, t.start_call_order))
         table = [['Start/Rule', 'End', 'Order#', 'Status/Grow', 'Applied rules', 'Details']]
         last_pos = None
-        for (row, col, rule), group in itertools.groupby(
-            sorted_traces, key=lambda t: (t.start_row, t.start_col, t.rule)
-        ):
-            pos = f'{row}:{col}'
+        for (offset, rule), group in itertools.groupby(sorted_traces, key=lambda t: (t.start_offset, t.rule)):
+            pos = self.format_offset(offset)
             if last_pos != pos:
                 table.append(['', '', '', '', '', ''])
             last_pos = pos
-            table.append([f'{row}:{col}:{rule}', '', '', '', '', ''])
+            table.append([f'{pos}:{rule}', '', '', '', '', ''])
             for trace in group:
                 rule_key = f'   {trace.function_name}'
                 status, details = self.dump_term(trace.term)
@@ -391,7 +1717,7 @@ class PegEngineDebug(PegEngine):
                 table.append(
                     [
                         rule_key,
-                        f'{trace.end_row}:{trace.end_col}',
+                        self.format_offset(trace.end_offset),
                         f'{trace.start_call_order}..{trace.end_call_order}',
                         status,
                         ', '.join(trace.applyied_rules),
@@ -421,31 +1747,441 @@ class PegEngineDebug(PegEngine):
         return output.getvalue()
 
 
-def find_first_position(line_records: list[line_record.LineRecord]) -> tuple[int, int]:
-    for row in range(len(line_records)):
-        for col in range(len(line_records[row].text)):
-            return row, col
-    return len(line_records), 0
+@dataclasses.dataclass
+class RuleStats:
+    applications: int = 0
+    memo_misses: int = 0
+    growth_iterations: int = 0
+    # Time spent evaluating the rule, with and without the rules it applied.
+    cumulative_ns: int = 0
+    self_ns: int = 0
+
+    @property
+    def memo_hits(self) -> int:
+        return self.applications - self.memo_misses
 
 
-def parse_line_records(
-    line_records: list[line_record.LineRecord], grammar: Grammar, *, debug: bool = False, config: Config | None = None
-) -> syntax.Term:
-    config = config or Config(mode=terms.MODE_SAFE)
-    engine = PegEngineDebug(line_records, grammar.rule_map) if debug else PegEngine(line_records, grammar.rule_map)
-    row, col = find_first_position(line_records)
-    if row == len(line_records) and col == 0:
+@dataclasses.dataclass
+class AlternativeStats:
+    calls: int = 0
+    successes: int = 0
+    failures: int = 0
+    errors: int = 0
+
+
+class ProfileCounters:
+    """Raw counters indexed by rule id, shared by the engines profiling parses with the same grammar."""
+
+    def __init__(self, grammar: CompiledGrammar):
+        self.grammar = grammar
+        rule_count = len(grammar.rules)
+        self.applications = [0] * rule_count
+        self.memo_misses = [0] * rule_count
+        self.growth_iterations = [0] * rule_count
+        self.cumulative_ns = [0] * rule_count
+        self.self_ns = [0] * rule_count
+        # Counters of the alternatives of a rule: successes, failures and errors.
+        self.alternatives: list[dict[CompiledParseFunction, list[int]]] = [{} for _ in range(rule_count)]
+        # Rule stacks are interned as nodes of a tree, node 0 being the empty stack.
+        self.stack_node_children: list[dict[int, int]] = [{}]
+        self.stack_node_keys: list[tuple[int, int]] = [(0, -1)]
+        self.stack_node_ns: list[int] = [0]
+        # Highest number of memo cells retained by a single parse, and the number of cells evicted.
+        self.memo_high_water = 0
+        self.evicted_cells = 0
+
+
+class ParseProfile:
+    """Aggregated per-rule and per-alternative counters of one or more parses, see PegEngineProfiler."""
+
+    def __init__(self) -> None:
+        self.grammar_counters: dict[int, ProfileCounters] = {}
+
+    def counters(self, grammar: CompiledGrammar) -> ProfileCounters:
+        counters = self.grammar_counters.get(id(grammar))
+        if counters is None:
+            counters = self.grammar_counters[id(grammar)] = ProfileCounters(grammar)
+        return counters
+
+    def rules(self) -> dict[str, RuleStats]:
+        result: dict[str, RuleStats] = {}
+        for counters in self.grammar_counters.values():
+            for rule, applications in enumerate(counters.applications):
+                if not applications:
+                    continue
+                stats = result.setdefault(counters.grammar.rule_names[rule], RuleStats())
+                stats.applications += applications
+                stats.memo_misses += counters.memo_misses[rule]
+                stats.growth_iterations += counters.growth_iterations[rule]
+                stats.cumulative_ns += counters.cumulative_ns[rule]
+                stats.self_ns += counters.self_ns[rule]
+        return result
+
+    def alternatives(self) -> dict[tuple[str, str], AlternativeStats]:
+        result: dict[tuple[str, str], AlternativeStats] = {}
+        for counters in self.grammar_counters.values():
+            grammar = counters.grammar
+            for rule, alternatives in enumerate(counters.alternatives):
+                for function, (successes, failures, errors) in alternatives.items():
+                    key = (grammar.rule_names[rule], grammar.parse_function_name(function))
+                    stats = result.setdefault(key, AlternativeStats())
+                    stats.calls += successes + failures + errors
+                    stats.successes += successes
+                    stats.failures += failures
+                    stats.errors += errors
+        return result
+
+    def stacks(self) -> dict[tuple[str, ...], int]:
+        """Returns the self time of each stack of rule evaluations, outermost rule first."""
+        result: dict[tuple[str, ...], int] = {}
+        for counters in self.grammar_counters.values():
+            # A parent node is always interned before its children.
+            stacks: list[tuple[str, ...]] = [()]
+            for (parent, rule), ns in zip(counters.stack_node_keys[1:], counters.stack_node_ns[1:]):
+                stacks.append(stack := (*stacks[parent], counters.grammar.rule_names[rule]))
+                result[stack] = result.get(stack, 0) + ns
+        return result
+
+    def memo_stats(self) -> dict[str, int]:
+        counters = self.grammar_counters.values()
+        return {
+            'retained_cells_high_water': max((c.memo_high_water for c in counters), default=0),
+            'evicted_cells': sum(c.evicted_cells for c in counters),
+        }
+
+    def to_dict(self) -> dict:
+        rules: dict[str, dict] = {}
+        for name, stats in sorted(self.rules().items(), key=lambda item: -item[1].self_ns):
+            rules[name] = {**dataclasses.asdict(stats), 'memo_hits': stats.memo_hits, 'alternatives': {}}
+        for (rule, function_name), alternative in self.alternatives().items():
+            rules[rule]['alternatives'][function_name] = dataclasses.asdict(alternative)
+        return {'memo': self.memo_stats(), 'rules': rules}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_folded_stacks(self) -> str:
+        """Returns the self time in nanoseconds per rule stack, in the folded format read by flamegraph tools."""
+        return ''.join(f'{";".join(stack)} {ns}\n' for stack, ns in sorted(self.stacks().items()) if ns > 0)
+
+
+class PegEngineProfiler(PegEngine):
+    """Keeps aggregate counters per rule and per alternative instead of a trace per call, see PegEngineDebug."""
+
+    def __init__(
+        self,
+        line_records: list[line_record.LineRecord],
+        grammar: CompiledGrammar,
+        profile: ParseProfile | None = None,
+    ):
+        super().__init__(line_records, grammar)
+        self.profile = profile or ParseProfile()
+        self.counters = counters = self.profile.counters(grammar)
+        self.applications = counters.applications
+        self.memo_misses = counters.memo_misses
+        self.growth_iterations = counters.growth_iterations
+        self.cumulative_ns = counters.cumulative_ns
+        self.self_ns = counters.self_ns
+        self.alternative_stats = counters.alternatives
+        self.stack_node_children = counters.stack_node_children
+        self.stack_node_keys = counters.stack_node_keys
+        self.stack_node_ns = counters.stack_node_ns
+        # Number of evaluations of each rule in progress, so recursive rules are timed once.
+        self.active = [0] * len(grammar.rules)
+        self.stack_node = 0
+        # Time spent in the rule evaluations nested in the current evaluation.
+        self.child_ns = 0
+
+    def recall(self, offset: int, rule: int, config: Config, config_id: int) -> Cell | None:
+        # Token rule applications served from the token array skip the memo, and are not counted.
+        self.applications[rule] += 1
+        cell = super().recall(offset, rule, config, config_id)
+        if cell is None:
+            self.memo_misses[rule] += 1
+        return cell
+
+    def call_ordered_parse_functions(
+        self, offset: int, rule: int, config: Config, cell: Cell | None = None, *, recursive_only: bool = False
+    ) -> tuple[syntax.Term, int]:
+        if recursive_only:
+            self.growth_iterations[rule] += 1
+        parent_node, parent_child_ns = self.stack_node, self.child_ns
+        children = self.stack_node_children[parent_node]
+        node = children.get(rule)
+        if node is None:
+            node = children[rule] = len(self.stack_node_keys)
+            self.stack_node_children.append({})
+            self.stack_node_keys.append((parent_node, rule))
+            self.stack_node_ns.append(0)
+        self.stack_node, self.child_ns = node, 0
+        self.active[rule] += 1
+        start = time.perf_counter_ns()
+        try:
+            return super().call_ordered_parse_functions(offset, rule, config, cell, recursive_only=recursive_only)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            self_ns = elapsed - self.child_ns
+            self.stack_node, self.child_ns = parent_node, parent_child_ns + elapsed
+            self.stack_node_ns[node] += self_ns
+            self.self_ns[rule] += self_ns
+            self.active[rule] -= 1
+            if not self.active[rule]:
+                self.cumulative_ns[rule] += elapsed
+
+    def call_parse_function(
+        self, offset: int, rule: int, function: CompiledParseFunction, config: Config
+    ) -> tuple[syntax.Term, int]:
+        term, next_offset = super().call_parse_function(offset, rule, function, config)
+        alternatives = self.alternative_stats[rule]
+        stats = alternatives.get(function)
+        if stats is None:
+            stats = alternatives[function] = [0, 0, 0]
+        if term is ParseFailed:
+            stats[1] += 1
+        elif isinstance(term, syntax.ErrorTerm):
+            stats[2] += 1
+        else:
+            stats[0] += 1
+        return term, next_offset
+
+    def record_memo(self) -> None:
+        """Adds the memo table statistics of the parse to the profile."""
+        self.counters.memo_high_water = max(self.counters.memo_high_water, self.cell_memo.high_water)
+        self.counters.evicted_cells += self.cell_memo.evicted
+
+
+class IncrementalPegEngine(PegEngine):
+    """Records how far each memo cell looked into the text, so a later parse of an edited text can reuse the cells
+    which did not see the edit.
+
+    Only grammars with a token rule are tracked, as the engine observes the text through the tokens it serves.
+    """
+
+    def __init__(
+        self,
+        line_records: list[line_record.LineRecord],
+        grammar: CompiledGrammar,
+        previous: IncrementalPegEngine | None = None,
+    ):
+        super().__init__(line_records, grammar)
+        self.previous = previous
+        # Offset past the last character examined by each memo cell, by memo key.
+        self.examined_ends: dict[int, int] = {}
+        # Offset past the last character examined by the rule evaluations in progress.
+        self.examined_end = 0
+        self.reused_cells = 0
+
+    def apply_rule(self, offset: int, rule: int, config: Config) -> tuple[syntax.Term, int]:
+        if rule == self.grammar.token_rule_id:
+            term, next_offset = super().apply_rule(offset, rule, config)
+            # A token error may have scanned past where it stopped, e.g. an unterminated string.
+            examined_end = self.text_length if isinstance(term, syntax.ErrorTerm) else next_offset
+            self.examined_end = max(self.examined_end, examined_end)
+            return term, next_offset
+        outer_examined_end = self.examined_end
+        self.examined_end = offset
+        term, next_offset = super().apply_rule(offset, rule, config)
+        key = self.cell_memo.key(offset, rule, self.config_id(rule, config))
+        examined_end = max(self.examined_end, next_offset, self.examined_ends.get(key, 0))
+        self.examined_ends[key] = examined_end
+        self.examined_end = max(outer_examined_end, examined_end)
+        return term, next_offset
+
+    def upcoming_token_kind(self, offset: int) -> str | None:
+        kind = super().upcoming_token_kind(offset)
+        if kind is not None:
+            tokens = cast('TokenArray', self.tokens)
+            self.examined_end = max(self.examined_end, tokens.ends[tokens.index_by_start[offset]])
+        return kind
+
+    def lex(self, config: Config) -> TokenArray:
+        tokens = super().lex(config)
+        if self.previous is not None:
+            self.reuse_memo(self.previous)
+            self.previous = None
+        return tokens
+
+    def shared_suffix_start(self, previous: IncrementalPegEngine, prefix_length: int) -> int:
+        """Returns the offset in the previous text from which the parse of the rest of the text is the same in this
+        text, once shifted by the length difference. It is the length of the previous text if there is none.
+        """
+        old_text, new_text = previous.text, self.text
+        shift = len(new_text) - len(old_text)
+        # The rest of the text must be the same.
+        start = len(old_text)
+        while (
+            start > prefix_length
+            and start + shift > prefix_length
+            and old_text[start - 1] == new_text[start - 1 + shift]
+        ):
+            start -= 1
+        # It must be tokenized the same way.
+        old_tokens, new_tokens = cast('TokenArray', previous.tokens), cast('TokenArray', self.tokens)
+        old_index, new_index = len(old_tokens) - 1, len(new_tokens) - 1
+        token_start = len(old_text)
+        while (
+            old_index >= 0
+            and new_index >= 0
+            and old_tokens.starts[old_index] >= start
+            and old_tokens.starts[old_index] + shift == new_tokens.starts[new_index]
+            and old_tokens.ends[old_index] + shift == new_tokens.ends[new_index]
+            and old_tokens.kinds[old_index] == new_tokens.kinds[new_index]
+        ):
+            token_start = old_tokens.starts[old_index]
+            old_index, new_index = old_index - 1, new_index - 1
+        # And its positions must be the same, i.e. its rows must keep their line numbers and start offsets.
+        old_lines, new_lines = previous.line_records, self.line_records
+        old_starts, new_starts = previous.line_table.line_starts, self.line_table.line_starts
+        old_row, new_row = len(old_lines) - 1, len(new_lines) - 1
+        position_start = len(old_text)
+        while (
+            old_row >= 0
+            and new_row >= 0
+            and old_lines[old_row].line_number == new_lines[new_row].line_number
+            and old_starts[old_row] + shift == new_starts[new_row]
+        ):
+            position_start = old_starts[old_row]
+            old_row, new_row = old_row - 1, new_row - 1
+        return max(start, token_start, position_start)
+
+    def reuse_memo(self, previous: IncrementalPegEngine) -> None:
+        """Copies the memo cells of the previous parse which did not examine the edited text.
+
+        The cells which examined only the text before the edit are kept as is, and the cells of the text after the edit
+        are shifted by the length difference of the texts.
+        """
+        if previous.grammar is not self.grammar or previous.tokens is None or self.tokens is None:
+            return
+        if previous.exhausted is not None:
+            # The cells evaluated after the budget was exceeded hold its error.
+            return
+        # Configs keep their ids, so the cells can be copied without translating the ids.
+        self.configs = list(previous.configs)
+        self.config_ids = dict(previous.config_ids)
+        prefix_length = 0
+        for old_char, new_char in zip(previous.text, self.text):
+            if old_char != new_char:
+                break
+            prefix_length += 1
+        suffix_start = self.shared_suffix_start(previous, prefix_length)
+        suffix_shift = self.text_length - previous.text_length
+        for offset, rule, config_id, cell in previous.cell_memo.items():
+            # Rules involved in a left recursion are grown with the seed of its head, which may have seen the edit.
+            if cell.state is not CellState.DONE or (cell.head is not None and cell.head.rule != rule):
+                continue
+            examined_end = previous.examined_ends.get(previous.cell_memo.key(offset, rule, config_id))
+            if examined_end is None:
+                continue
+            if examined_end < prefix_length:
+                shift = 0
+            elif offset >= suffix_start:
+                shift = suffix_shift
+            else:
+                continue
+            reused = Cell(next_offset=cell.next_offset + shift, growable=False, state=CellState.DONE, term=cell.term)
+            self.cell_memo.put(offset + shift, rule, config_id, reused)
+            self.examined_ends[self.cell_memo.key(offset + shift, rule, config_id)] = examined_end + shift
+            self.reused_cells += 1
+
+
+def parse_with_engine(engine: PegEngine, config: Config) -> syntax.Term:
+    """Lexes the text of the engine, and parses it from the start rule of the grammar."""
+    if engine.text_length == 0:
         return syntax.ErrorTerm(message='Empty text.')
-    term, next_row, next_col = engine.apply_rule(row, col, grammar.start_rule, config=config)
-    if debug:
-        logger.warning(engine.dump())
-    if not isinstance(term, syntax.ErrorTerm) and not (next_row == len(line_records) and next_col == 0):
+    term, next_offset = engine.parse(config)
+    if engine.deferred_terms:
+        term = build_matches(term)
+    if engine.exhausted is not None:
+        # The terms parsed after the budget was exceeded are incomplete.
+        return engine.exhausted
+    if not isinstance(term, syntax.ErrorTerm) and next_offset != engine.text_length:
+        line_records = engine.line_records
         lineno = line_records[0].line_number if line_records else -1
+        next_row, next_col = engine.line_table.row_col(next_offset)
         return syntax.ErrorTerm(
             message=f'chunk[line:{lineno}] Not all text consumed: indices {next_row}:{next_col}/{len(line_records)}:0.',
         )
     return term
 
 
-def parse_text(text: str, grammar: Grammar, *, debug: bool = False, config: Config | None = None) -> syntax.Term:
-    return parse_line_records(line_record.split_text_to_lines(text), grammar, debug=debug, config=config)
+def parse_line_records(
+    line_records: list[line_record.LineRecord],
+    grammar: Grammar | CompiledGrammar,
+    *,
+    debug: bool = False,
+    config: Config | None = None,
+    profile: bool | ParseProfile = False,
+    memo_budget: int | None = None,
+    max_nesting: int | None = None,
+    budget: ParseBudget | None = None,
+    strict: bool = False,
+    deferred_terms: bool = False,
+) -> syntax.Term:
+    """Parses the line records with the grammar.
+
+    With profile=True, the parse profile is logged as JSON. A ParseProfile can be given instead to aggregate the
+    counters of several parses into it. A memo budget bounds the number of memo cells retained during the parse.
+    With max_nesting, the StackPegEngine parses with that budget of nested rule applications. When the parse budget
+    is exceeded, the returned error names the hottest rule. With strict=True, the faster StrictPegEngine parses.
+    With deferred_terms=True, the terms built with Cursor.build are only built for the successful parse. Debug,
+    profile, max_nesting and strict each select an engine, so at most one of them can be given.
+    """
+    engines = {
+        'debug': debug,
+        'profile': profile is not False,
+        'max_nesting': max_nesting is not None,
+        'strict': strict,
+    }
+    if sum(engines.values()) > 1:
+        names = ', '.join(name for name, selected in engines.items() if selected)
+        raise tapl_error.TaplError(f'The parse options {names} select different engines and cannot be combined.')
+    compiled = as_compiled_grammar(grammar)
+    engine: PegEngine
+    if debug:
+        engine = PegEngineDebug(line_records, compiled)
+    elif profile is not False:
+        engine = PegEngineProfiler(line_records, compiled, profile if isinstance(profile, ParseProfile) else None)
+    elif max_nesting is not None:
+        engine = StackPegEngine(line_records, compiled, max_nesting)
+    elif strict:
+        engine = StrictPegEngine(line_records, compiled)
+    else:
+        engine = PegEngine(line_records, compiled)
+    engine.cell_memo.set_budget(memo_budget)
+    engine.set_parse_budget(budget)
+    engine.deferred_terms = deferred_terms
+    term = parse_with_engine(engine, config or Config(mode=terms.MODE_SAFE))
+    if debug:
+        logger.warning(engine.dump())
+    if isinstance(engine, PegEngineProfiler):
+        engine.record_memo()
+        if profile is True:
+            logger.warning(engine.profile.to_json())
+    return term
+
+
+def parse_text(
+    text: str,
+    grammar: Grammar | CompiledGrammar,
+    *,
+    debug: bool = False,
+    config: Config | None = None,
+    profile: bool | ParseProfile = False,
+    memo_budget: int | None = None,
+    max_nesting: int | None = None,
+    budget: ParseBudget | None = None,
+    strict: bool = False,
+    deferred_terms: bool = False,
+) -> syntax.Term:
+    return parse_line_records(
+        line_record.split_text_to_lines(text),
+        grammar,
+        debug=debug,
+        config=config,
+        profile=profile,
+        memo_budget=memo_budget,
+        max_nesting=max_nesting,
+        budget=budget,
+        strict=strict,
+        deferred_terms=deferred_terms,
+    )
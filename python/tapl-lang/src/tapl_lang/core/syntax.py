@@ -13,6 +13,8 @@ from tapl_lang.core import tapl_error
 if TYPE_CHECKING:
     from collections.abc import Callable, Generator
 
+    from tapl_lang.core.line_record import LineTable
+
 
 class Term:
     def children(self) -> Generator[Term, None, None]:
@@ -43,6 +45,10 @@ class _EmptyTerm(Term):
     def __repr__(self) -> str:
         return 'Empty'
 
+    def __reduce__(self) -> str:
+        # Unpickled as the singleton, which is compared by identity.
+        return 'Empty'
+
 
 Empty = _EmptyTerm()
 
@@ -170,10 +176,68 @@ class Position:
         return f'{self.line}:{self.column}'
 
 
-@dataclass
+# A span packs the start and end offsets of a location into one integer, the start in the high bits.
+SPAN_SHIFT = 32
+SPAN_END_MASK = (1 << SPAN_SHIFT) - 1
+
+
 class Location:
-    start: Position
-    end: Position | None = None
+    """Start and end positions of a term in the source.
+
+    Locations created by the parser only keep the span of their text offsets in the chunk, and the line table of the
+    chunk, which converts them to positions when they are first read.
+    """
+
+    __slots__ = ('_end', '_start', 'line_table', 'span')
+
+    def __init__(self, start: Position, end: Position | None = None) -> None:
+        self._start: Position | None = start
+        self._end = end
+        self.line_table: LineTable | None = None
+        self.span = 0
+
+    @classmethod
+    def from_span(cls, line_table: LineTable, start_offset: int, end_offset: int) -> Location:
+        # The positions are not created until they are read.
+        location = cls.__new__(cls)
+        location.set_span(line_table, start_offset, end_offset)
+        return location
+
+    def set_span(self, line_table: LineTable, start_offset: int, end_offset: int) -> None:
+        self._start = self._end = None
+        self.line_table = line_table
+        self.span = start_offset << SPAN_SHIFT | end_offset
+
+    def resolve(self) -> None:
+        line_table = cast('LineTable', self.line_table)
+        self._start = Position(*line_table.line_column(self.span >> SPAN_SHIFT))
+        self._end = Position(*line_table.line_column(self.span & SPAN_END_MASK))
+        self.line_table = None
+
+    def shift_lines(self, delta: int) -> None:
+        """Moves the location by delta lines, e.g. when the term of a chunk is reused after lines were inserted."""
+        start, end = self.start, self.end
+        self._start = Position(start.line + delta, start.column)
+        self._end = None if end is None else Position(end.line + delta, end.column)
+
+    @property
+    def start(self) -> Position:
+        if self.line_table is not None:
+            self.resolve()
+        return cast('Position', self._start)
+
+    @property
+    def end(self) -> Position | None:
+        if self.line_table is not None:
+            self.resolve()
+        return self._end
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Location):
+            return NotImplemented
+        return (self.start, self.end) == (other.start, other.end)
+
+    __hash__ = None  # type: ignore[assignment]
 
     def __repr__(self) -> str:
         start = repr(self.start) if self.start else '-'
@@ -181,16 +245,66 @@ class Location:
         return f'({start},{end})'
 
 
-@dataclass
 class ErrorTerm(Term):
-    message: str
-    recovered: bool = False
-    guess: Term | None = None
-    location: Location | None = None
+    """An error in place of a term.
+
+    With message_args, the message is a str.format template which is rendered when it is first read, so errors which
+    are discarded while backtracking are never formatted.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        recovered: bool = False,
+        guess: Term | None = None,
+        location: Location | None = None,
+        message_args: tuple[object, ...] = (),
+    ) -> None:
+        self._message = message
+        self.recovered = recovered
+        self.guess = guess
+        self.location = location
+        self.message_args = message_args
+
+    @property
+    def message(self) -> str:
+        if self.message_args:
+            self._message = self._message.format(*self.message_args)
+            self.message_args = ()
+        return self._message
 
     def children(self) -> Generator[Term, None, None]:
         yield from ()
 
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        other = cast('ErrorTerm', other)
+        return (self.message, self.recovered, self.guess, self.location) == (
+            other.message,
+            other.recovered,
+            other.guess,
+            other.location,
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}(message={self.message!r}, recovered={self.recovered!r}, '
+            f'guess={self.guess!r}, location={self.location!r})'
+        )
+
+
+class FailureTerm(ErrorTerm):
+    """An immutable ErrorTerm shared by every failure of one kind, so reporting the failure allocates nothing."""
+
+    def __setattr__(self, name: str, value: object) -> None:
+        # message_args is the last attribute set by the constructor.
+        if 'message_args' in self.__dict__:
+            raise tapl_error.TaplError(f'{self.__class__.__name__} is shared and cannot be modified.')
+        super().__setattr__(name, value)
+
 
 @dataclass
 class TermList(Term):
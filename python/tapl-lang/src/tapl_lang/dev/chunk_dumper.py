@@ -19,11 +19,12 @@ class Dumper:
         self.ss.write(f'{prefix}|{escaped_text}\n')
 
     def print_chunk(self, chunk: chunker.Chunk) -> None:
-        indent = chunk.line_records[0].indent
+        line_records = chunk.line_records()
+        indent = line_records[0].indent
         self.ss.write(f'{indent}:'.rjust(6))
         self.ss.write(' ' * (indent or 0))
-        self.ss.write(f'chunk line_records_length={len(chunk.line_records)} children_length={len(chunk.children)}\n')
-        for line in chunk.line_records:
+        self.ss.write(f'chunk line_records_length={len(line_records)} children_length={len(chunk.children)}\n')
+        for line in line_records:
             self.print_line(line)
         self.print_chunks(chunk.children)
 
@@ -2,11 +2,18 @@
 # Exceptions. See /LICENSE for license information.
 # SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
 
+from __future__ import annotations
+
 import ast
+import concurrent.futures
 import importlib
+import mmap
+import os
 import re
+from collections.abc import Iterable
 
-from tapl_lang.core import chunker, syntax, tapl_error
+from tapl_lang.core import chunker, parser, syntax, tapl_error
+from tapl_lang.core.language import ParseSession
 from tapl_lang.lib import python_backend, terms
 
 
@@ -26,11 +33,12 @@ def gather_errors(term: syntax.Term) -> list[syntax.ErrorTerm]:
 def extract_language(chunk: chunker.Chunk) -> str:
     if chunk.children:
         raise tapl_error.TaplError('language clause chunk should not have children.')
-    for i in range(1, len(chunk.line_records)):
-        if not chunk.line_records[i].empty:
+    line_records = chunk.line_records()
+    for i in range(1, len(line_records)):
+        if not line_records[i].empty:
             raise tapl_error.TaplError('language clause chunk should be the first line.')
     pattern = r'^language ([a-zA-Z_][a-zA-Z0-9_]*)$'
-    line = chunk.line_records[0].text
+    line = line_records[0].text
     match = re.findall(pattern, line)
     if not match:
         raise tapl_error.TaplError(f'Could not parse language clause[{line}]')
@@ -49,14 +57,46 @@ def make_safe_term(term: syntax.Term) -> syntax.Term:
     )
 
 
-def compile_tapl(text: str) -> list[ast.AST]:
-    chunks = chunker.chunk_text(text)
-    language_name = extract_language(chunks[0])
+def compile_tapl(
+    text: str | bytes | mmap.mmap | os.PathLike | Iterable[str],
+    *,
+    profile: parser.ParseProfile | None = None,
+    session: ParseSession | None = None,
+    budget: parser.ParseBudget | None = None,
+    executor: concurrent.futures.Executor | None = None,
+) -> list[ast.AST]:
+    """Compiles the text to Python ASTs, one per layer.
+
+    The text is either a string, UTF-8 encoded bytes, or its lines, e.g. an open file, which are chunked while they are
+    read. The file at a path is memory mapped, and only the lines of the chunks being parsed are decoded.
+    A session can be passed when compiling successive versions of a source, so the unchanged parts are not parsed again.
+    The budget bounds the parse of each chunk, for untrusted sources. With an executor, e.g. a ProcessPoolExecutor,
+    the top-level chunks are parsed in parallel by its workers.
+    """
+    if isinstance(text, os.PathLike):
+        with open(text, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return compile_tapl(b'', profile=profile, session=session, budget=budget, executor=executor)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                return compile_tapl(mapping, profile=profile, session=session, budget=budget, executor=executor)
+    if isinstance(text, (str, bytes, mmap.mmap)):
+        chunks = iter(chunker.chunk_text(text))
+    else:
+        chunks = chunker.chunk_stream(text)
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        raise tapl_error.TaplError('The source should start with a language clause.')
+    language_name = extract_language(first_chunk)
     language = importlib.import_module(f'tapl_language.{language_name}').get_language()
     predef_headers = language.get_predef_headers()
     predef_layers = syntax.Layers(predef_headers)
     module = terms.Module(body=[predef_layers, syntax.TermList(terms=[], is_placeholder=True)])
-    language.parse_chunks(chunks[1:], [module])
+    if session is not None:
+        if executor is not None:
+            raise tapl_error.TaplError('Parallel parsing does not support profiles and sessions.')
+        session.parse_chunks(language, chunks, [module], budget=budget)
+    else:
+        language.parse_chunks(chunks, [module], profile=profile, budget=budget, executor=executor)
     error_bucket: list[syntax.ErrorTerm] = gather_errors(module)
     if error_bucket:
         messages = [repr(e) for e in error_bucket]
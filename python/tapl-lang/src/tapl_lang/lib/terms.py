@@ -831,11 +831,21 @@ class ModeTerm(syntax.Term):
     def separate(self, ls: syntax.LayerSeparator) -> list[syntax.Term]:
         return ls.build(lambda _: self)
 
+    def __reduce__(self) -> str:
+        # Unpickled as the mode constant, as modes are compared by identity.
+        return MODE_NAMES[self.typecheck, self.use_scope]
+
 
 MODE_EVALUATE = ModeTerm(typecheck=False, use_scope=False)
 MODE_EVALUATE_WITH_SCOPE = ModeTerm(typecheck=False, use_scope=True)
 MODE_TYPECHECK = ModeTerm(typecheck=True, use_scope=True)
 MODE_TYPECHECK_NO_SCOPE = ModeTerm(typecheck=True, use_scope=False)
+MODE_NAMES = {
+    (False, False): 'MODE_EVALUATE',
+    (False, True): 'MODE_EVALUATE_WITH_SCOPE',
+    (True, True): 'MODE_TYPECHECK',
+    (True, False): 'MODE_TYPECHECK_NO_SCOPE',
+}
 MODE_SAFE = syntax.Layers(layers=[MODE_EVALUATE, MODE_TYPECHECK])
 MODE_LIFT = syntax.Layers(layers=[MODE_EVALUATE, MODE_EVALUATE_WITH_SCOPE])
 SAFE_LAYER_COUNT = len(MODE_SAFE.layers)
@@ -5,6 +5,8 @@
 from __future__ import annotations
 
 import dataclasses
+import functools
+import re
 from collections.abc import Iterable
 from typing import TYPE_CHECKING, cast
 
@@ -280,7 +282,7 @@ class ImmutableIterable(Iterable):
         return repr(self._data)
 
 
-def get_grammar() -> parser.Grammar:
+def get_grammar() -> parser.CompiledGrammar:
     rules: parser.GrammarRuleMap = {}
 
     def add(name: str, ordered_parse_functions: Iterable[parser.ParseFunction | str]) -> None:
@@ -485,13 +487,14 @@ def get_grammar() -> parser.Grammar:
     add(rn.STAR_NAMED_EXPRESSION, [rn.NAMED_EXPRESSION])
     add(rn.ASSIGNMENT_EXPRESSION, [_parse_assignment_expression])
     add(rn.NAMED_EXPRESSION, [rn.ASSIGNMENT_EXPRESSION, _parse_expression_no_walrus])
-    add(rn.DISJUNCTION, [_parse_disjunction__or, rn.CONJUNCTION])
-    add(rn.CONJUNCTION, [_parse_conjunction__and, rn.INVERSION])
-    add(rn.INVERSION, [_parse_inversion__not, rn.COMPARISON])
+    add(rn.DISJUNCTION, [_OPERATOR_TOWER.parse_function(rn.DISJUNCTION)])
+    add(rn.CONJUNCTION, [_OPERATOR_TOWER.parse_function(rn.CONJUNCTION)])
+    add(rn.INVERSION, [_OPERATOR_TOWER.parse_function(rn.INVERSION)])
 
-    # Comparison operators
-    # --------------------
-    add(rn.COMPARISON, [_parse_comparison, rn.BITWISE_OR])
+    # Operator precedence levels
+    # --------------------------
+    # Each level parses its own and all tighter operators, see _OPERATOR_TOWER.
+    add(rn.COMPARISON, [_OPERATOR_TOWER.parse_function(rn.COMPARISON)])
     # add(rn.COMPARE_OP_BITWISE_OR_PAIR, [])
     # add(rn.EQ_BITWISE_OR, [])
     # add(rn.NOTEQ_BITWISE_OR, [])
@@ -506,17 +509,17 @@ def get_grammar() -> parser.Grammar:
 
     # Bitwise operators
     # -----------------
-    add(rn.BITWISE_OR, [_parse_bitwise_or__binary, rn.BITWISE_XOR])
-    add(rn.BITWISE_XOR, [_parse_bitwise_xor__binary, rn.BITWISE_AND])
-    add(rn.BITWISE_AND, [_parse_bitwise_and__binary, rn.SHIFT_EXPR])
-    add(rn.SHIFT_EXPR, [_parse_shift_expr__binary, rn.SUM])
+    add(rn.BITWISE_OR, [_OPERATOR_TOWER.parse_function(rn.BITWISE_OR)])
+    add(rn.BITWISE_XOR, [_OPERATOR_TOWER.parse_function(rn.BITWISE_XOR)])
+    add(rn.BITWISE_AND, [_OPERATOR_TOWER.parse_function(rn.BITWISE_AND)])
+    add(rn.SHIFT_EXPR, [_OPERATOR_TOWER.parse_function(rn.SHIFT_EXPR)])
 
     # Arithmetic operators
     # --------------------
-    add(rn.SUM, [_parse_invalid_arithmetic, _parse_sum__binary, rn.TERM])
-    add(rn.TERM, [_parse_term__binary, rn.FACTOR])
-    add(rn.FACTOR, [_parse_invalid_factor, _parse_factor__unary, rn.POWER])
-    add(rn.POWER, [_parse_power__binary, rn.PRIMARY])
+    add(rn.SUM, [_OPERATOR_TOWER.parse_function(rn.SUM)])
+    add(rn.TERM, [_OPERATOR_TOWER.parse_function(rn.TERM)])
+    add(rn.FACTOR, [_OPERATOR_TOWER.parse_function(rn.FACTOR)])
+    add(rn.POWER, [_OPERATOR_TOWER.parse_function(rn.POWER)])
 
     # Primary elements
     # ----------------
@@ -703,7 +706,13 @@ def get_grammar() -> parser.Grammar:
     add(rn.INVALID_FACTOR, [])
     add(rn.INVALID_TYPE_PARAMS, [])
 
-    return parser.Grammar(rule_map=rules, start_rule=rn.START)
+    return parser.Grammar(
+        rule_map=rules,
+        start_rule=rn.START,
+        token_rule=rn.TOKEN,
+        token_kind=_token_kind,
+        config_independent_rules=frozenset([rn.T_LOOKAHEAD]),
+    ).compile()
 
 
 @dataclasses.dataclass
@@ -851,92 +860,74 @@ _KEYWORDS = {
 }
 
 
+# Token kinds of FIRST sets. Keywords and punctuation are their own kind.
+_NAME = 'NAME'
+_NUMBER = 'NUMBER'
+_STRING = 'STRING'
+_END_OF_TEXT = 'ENDMARKER'
+
+
+def _token_kind(token: syntax.Term) -> str | None:
+    if isinstance(token, (TokenKeyword, TokenPunct)):
+        return token.value
+    if isinstance(token, TokenName):
+        return _NAME
+    if isinstance(token, (TokenInteger, TokenFloat)):
+        return _NUMBER
+    if isinstance(token, TokenString):
+        return _STRING
+    if isinstance(token, TokenEndOfText):
+        return _END_OF_TEXT
+    return None
+
+
+# Longest punctuation must be tried first, so alternatives are ordered by descending length.
+_PUNCT_PATTERN = '|'.join(re.escape(p) for p in sorted(_PUNCT_SET, key=lambda p: (-len(p), p)))
+
+# Master token pattern. Alternatives are ordered so that the first matching named group decides the token kind.
+_TOKEN_PATTERN = re.compile(
+    rf"""
+    (?P<name>[^\W\d]\w*)
+    |(?P<float>\d+\.\d+)
+    |(?P<invalid_float>\d+\.)
+    |(?P<integer>\d+)
+    |(?P<string>'[^']*'|"[^"]*")
+    |(?P<unterminated_string>['"].*)
+    |(?P<punct>{_PUNCT_PATTERN})
+    |(?P<unexpected>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+
 def _parse_token(c: Cursor) -> syntax.Term:
     c.skip_whitespace()
     tracker = c.start_tracker()
     if c.is_end():
         return TokenEndOfText(tracker.location)
-
-    def scan_name(char: str) -> syntax.Term:
-        result = char
-        while not c.is_end() and (char := c.current_char()) and (char.isalnum() or char == '_'):
-            result += char
-            c.move_to_next()
-        if result in _KEYWORDS:
-            return TokenKeyword(tracker.location, value=result)
-        return TokenName(tracker.location, value=result)
-
-    def unterminated_string() -> syntax.Term:
+    match = cast('re.Match[str]', c.consume_pattern(_TOKEN_PATTERN))
+    kind = match.lastgroup
+    value = match.group()
+    if kind == 'name':
+        if value in _KEYWORDS:
+            return TokenKeyword(tracker.location, value=value)
+        return TokenName(tracker.location, value=value)
+    if kind == 'punct':
+        return TokenPunct(tracker.location, value=value)
+    if kind == 'integer':
+        return TokenInteger(tracker.location, value=int(value))
+    if kind == 'float':
+        return TokenFloat(tracker.location, value=float(value))
+    if kind == 'string':
+        return TokenString(tracker.location, value[1:-1])
+    if kind == 'unterminated_string':
         return syntax.ErrorTerm(
             message=f'unterminated string literal (detected at line {tracker.location.end.line}); perhaps you escaped the end quote?',
             location=tracker.location,
         )
-
-    def scan_string(quote: str) -> syntax.Term:
-        result = ''
-        if c.is_end():
-            return unterminated_string()
-        while (char := c.current_char()) != quote:
-            result += char
-            c.move_to_next()
-            if c.is_end():
-                return unterminated_string()
-        c.move_to_next()  # consume quote
-        return TokenString(tracker.location, result)
-
-    def scan_number(char: str) -> syntax.Term:
-        number_str = char
-        while not c.is_end() and (char := c.current_char()).isdigit():
-            number_str += char
-            c.move_to_next()
-        if not c.is_end() and c.current_char() == '.':
-            number_str += '.'
-            c.move_to_next()
-            if c.is_end() or not c.current_char().isdigit():
-                return syntax.ErrorTerm(
-                    message='Invalid float literal',
-                    location=tracker.location,
-                )
-            while not c.is_end() and (char := c.current_char()).isdigit():
-                number_str += char
-                c.move_to_next()
-            return TokenFloat(tracker.location, value=float(number_str))
-        return TokenInteger(tracker.location, value=int(number_str))
-
-    def scan_punct(char: str) -> syntax.Term:
-        k = c.clone()
-        char2: str | None = None
-        char3: str | None = None
-        if not k.is_end():
-            char2 = k.current_char()
-            k.move_to_next()
-        if not k.is_end():
-            char3 = k.current_char()
-            k.move_to_next()
-        if char2 is not None:
-            if char3 is not None and (temp := char + char2 + char3) in _PUNCT_SET:
-                c.copy_position_from(k)
-                return TokenPunct(tracker.location, value=temp)
-            if (temp := char + char2) in _PUNCT_SET:
-                c.move_to_next()
-                return TokenPunct(tracker.location, value=temp)
-        # single-character punctuation
-        return TokenPunct(tracker.location, value=char)
-
-    char = c.current_char()
-    c.move_to_next()
-    if char.isalpha() or char == '_':
-        return scan_name(char)
-    if char in ("'", '"'):
-        return scan_string(char)
-    if char.isdigit():
-        return scan_number(char)
-    if char in _PUNCT_SET:
-        return scan_punct(char)
-    # Error
-    return tracker.captured_error or syntax.ErrorTerm(
-        message=f'Token Parsing: Unexpected character "{char}"', location=tracker.location
-    )
+    if kind == 'invalid_float':
+        return syntax.ErrorTerm(message='Invalid float literal', location=tracker.location)
+    return syntax.ErrorTerm(message=f'Token Parsing: Unexpected character "{value}"', location=tracker.location)
 
 
 def _consume_keyword(c: Cursor, keyword: str) -> syntax.Term:
@@ -950,7 +941,9 @@ def _expect_keyword(c: Cursor, keyword: str) -> syntax.Term:
     t = c.start_tracker()
     if t.validate(term := c.consume_rule(rn.TOKEN)) and isinstance(term, TokenKeyword) and term.value == keyword:
         return term
-    return t.captured_error or syntax.ErrorTerm(message=f'Expected "{keyword}", but found {term}', location=t.location)
+    return t.captured_error or syntax.ErrorTerm(
+        message='Expected "{}", but found {}', location=t.location, message_args=(keyword, term)
+    )
 
 
 def _consume_name(c: Cursor) -> syntax.Term:
@@ -964,7 +957,9 @@ def _expect_name(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
     if t.validate(term := c.consume_rule(rn.TOKEN)) and isinstance(term, TokenName):
         return term
-    return t.captured_error or syntax.ErrorTerm(message=f'Expected a name, but found {term}', location=t.location)
+    return t.captured_error or syntax.ErrorTerm(
+        message='Expected a name, but found {}', location=t.location, message_args=(term,)
+    )
 
 
 def _consume_punct(c: Cursor, *puncts: str) -> syntax.Term:
@@ -974,256 +969,298 @@ def _consume_punct(c: Cursor, *puncts: str) -> syntax.Term:
     return t.fail()
 
 
+class _PunctList:
+    """Quoted, comma separated punctuations, joined only when an error message is rendered."""
+
+    def __init__(self, puncts: tuple[str, ...]) -> None:
+        self.puncts = puncts
+
+    def __str__(self) -> str:
+        return ', '.join(f'"{p}"' for p in self.puncts)
+
+
 def _expect_punct(c: Cursor, *puncts: str) -> syntax.Term:
     t = c.start_tracker()
     if t.validate(term := c.consume_rule(rn.TOKEN)) and isinstance(term, TokenPunct) and term.value in puncts:
         return term
-    puncts_text = ', '.join(f'"{p}"' for p in puncts)
     return t.captured_error or syntax.ErrorTerm(
-        message=f'Expected {puncts_text}, but found {term}', location=t.location
+        message='Expected {}, but found {}', location=t.location, message_args=(_PunctList(puncts), term)
     )
 
 
+def _consume_closing_bracket(c: Cursor, bracket: str) -> syntax.Term:
+    """Consumes a closing bracket, then commits the cursor, see Cursor.commit."""
+    term = _consume_punct(c, bracket)
+    if not isinstance(term, syntax.ErrorTerm):
+        c.commit()
+    return term
+
+
+def _expect_closing_bracket(c: Cursor, bracket: str) -> syntax.Term:
+    """Same as _consume_closing_bracket, reporting an error if the bracket is missing."""
+    term = _expect_punct(c, bracket)
+    if not isinstance(term, syntax.ErrorTerm):
+        c.commit()
+    return term
+
+
+def _consume_statement_keyword(c: Cursor, keyword: str) -> syntax.Term:
+    """Consumes the keyword starting a statement, then commits the cursor, see Cursor.commit."""
+    term = _consume_keyword(c, keyword)
+    if not isinstance(term, syntax.ErrorTerm):
+        c.commit()
+    return term
+
+
 def _expect_rule(c: Cursor, rule: str) -> syntax.Term:
     t = c.start_tracker()
     if t.validate(term := c.consume_rule(rule)):
         return term
-    return t.captured_error or syntax.ErrorTerm(message=f'Expected rule "{rule}"', location=t.location)
+    return t.captured_error or syntax.ErrorTerm(message='Expected rule "{}"', location=t.location, message_args=(rule,))
 
 
-def _scan_arguments(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    args = []
-    if t.validate(first_arg := c.consume_rule(rn.EXPRESSION)):
-        args.append(first_arg)
-        k = c.clone()
-        while t.validate(_consume_punct(k, ',')) and t.validate(arg := _expect_rule(k, rn.EXPRESSION)):
-            c.copy_position_from(k)
-            args.append(arg)
-    return t.captured_error or syntax.TermList(terms=args)
+@functools.cache
+def _punct(*puncts: str) -> parser.ParseFunction:
+    """Returns a parser consuming one of the punctuations, for the combinators of the parser module."""
 
+    def consume(c: Cursor) -> syntax.Term:
+        return _consume_punct(c, *puncts)
 
-def _parse_primary__attribute(c: Cursor) -> syntax.Term:
+    consume.__name__ = f'punct_{"_".join(puncts)}'
+    return consume
+
+
+@functools.cache
+def _keyword(keyword: str) -> parser.ParseFunction:
+    """Returns a parser consuming the keyword, for the combinators of the parser module."""
+
+    def consume(c: Cursor) -> syntax.Term:
+        return _consume_keyword(c, keyword)
+
+    consume.__name__ = f'keyword_{keyword}'
+    return consume
+
+
+def _scan_arguments(c: Cursor) -> parser.ParseGenerator:
+    return (yield from parser.sep_by(c, rn.EXPRESSION, _punct(','), required=True))
+
+
+def _parse_primary__attribute(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
-        t.validate(value := c.consume_rule(rn.PRIMARY))
+        t.validate(value := (yield c.request_rule(rn.PRIMARY)))
         and t.validate(_consume_punct(c, '.'))
         and t.validate(attr := _expect_name(c))
     ):
-        return terms.Attribute(value=value, attr=cast('TokenName', attr).value, ctx='load', location=t.location)
+        return c.build(
+            terms.Attribute, value=value, attr=cast('TokenName', attr).value, ctx='load', location=t.location
+        )
     return t.fail()
 
 
-def _parse_primary__call(c: Cursor) -> syntax.Term:
+def _parse_primary__call(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
-        t.validate(func := c.consume_rule(rn.PRIMARY))
+        t.validate(func := (yield c.request_rule(rn.PRIMARY)))
         and t.validate(_consume_punct(c, '('))
-        and t.validate(args := _scan_arguments(c))
-        and t.validate(_expect_punct(c, ')'))
+        and t.validate(args := (yield from _scan_arguments(c)))
+        and t.validate(_expect_closing_bracket(c, ')'))
     ):
-        return terms.Call(func, cast('syntax.TermList', args).terms, keywords=[], location=t.location)
+        return c.build(terms.Call, func, cast('syntax.TermList', args).terms, keywords=[], location=t.location)
     return t.fail()
 
 
-def _parse_primary__slices(c: Cursor) -> syntax.Term:
+def _parse_primary__slices(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
-        t.validate(value := c.consume_rule(rn.PRIMARY))
+        t.validate(value := (yield c.request_rule(rn.PRIMARY)))
         and t.validate(_consume_punct(c, '['))
-        and t.validate(slices := _expect_rule(c, rn.SLICES))
-        and t.validate(_expect_punct(c, ']'))
+        and t.validate(slices := (yield from parser.expect(c, rn.SLICES)))
+        and t.validate(_expect_closing_bracket(c, ']'))
     ):
-        return terms.Subscript(value=value, slice=slices, ctx='load', location=t.location)
+        return c.build(terms.Subscript, value=value, slice=slices, ctx='load', location=t.location)
     return t.fail()
 
 
-def _parse_primary__bang(c: Cursor) -> syntax.Term:
+def _parse_primary__bang(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    if t.validate(value := c.consume_rule(rn.PRIMARY)) and t.validate(_consume_punct(c, '!')):
-        return terms.Attribute(value=value, attr='result__sa', ctx='load', location=t.location)
+    if t.validate(value := (yield c.request_rule(rn.PRIMARY))) and t.validate(_consume_punct(c, '!')):
+        return c.build(terms.Attribute, value=value, attr='result__sa', ctx='load', location=t.location)
     return t.fail()
 
 
-def _parse_slices__single(c: Cursor) -> syntax.Term:
+def _parse_slices__single(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    if t.validate(term := c.consume_rule(rn.SLICE)) and not t.validate(_consume_punct(c.clone(), ',')):
+    if t.validate(term := (yield c.request_rule(rn.SLICE))) and t.validate(
+        (yield from parser.not_followed_by(c, _punct(',')))
+    ):
         return term
     return t.fail()
 
 
-def _parse_slices__multi(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    slices = []
-    if t.validate(first_slice := c.consume_rule(rn.SLICE)):
-        slices.append(first_slice)
-        k = c.clone()
-        while t.validate(_consume_punct(k, ',')) and t.validate(next_slice := k.consume_rule(rn.SLICE)):
-            c.copy_position_from(k)
-            slices.append(next_slice)
-    k = c.clone()
-    if t.validate(_consume_punct(k, ',')):
-        # Allow trailing comma
-        c.copy_position_from(k)
-    return t.captured_error or syntax.TermList(terms=slices)
+def _parse_slices__multi(c: Cursor) -> parser.ParseGenerator:
+    return (yield from parser.sep_by(c, rn.SLICE, _punct(','), trailing=True))
 
 
-def _parse_slice__range(c: Cursor) -> syntax.Term:
+def _parse_slice__range(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
+    if (
+        t.validate(lower := (yield from parser.optional(c, rn.EXPRESSION)))
+        and t.validate(_consume_punct(c, ':'))
+        and t.validate(upper := (yield from parser.optional(c, rn.EXPRESSION)))
+        and t.validate(step := (yield from parser.optional(c, _scan_slice_step)))
+    ):
+        return c.build(terms.Slice, location=t.location, lower=lower, upper=upper, step=step)
+    return t.fail()
 
-    k = c.clone()
-    if t.validate(lower := k.consume_rule(rn.EXPRESSION)):
-        c.copy_position_from(k)
-    else:
-        lower = syntax.Empty
-
-    if not t.validate(_consume_punct(c, ':')):
-        return t.fail()
-
-    k = c.clone()
-    if t.validate(upper := k.consume_rule(rn.EXPRESSION)):
-        c.copy_position_from(k)
-    else:
-        upper = syntax.Empty
 
-    k = c.clone()
-    if t.validate(_consume_punct(k, ':')):
-        c.copy_position_from(k)
-        if t.validate(step := k.consume_rule(rn.EXPRESSION)):
-            c.copy_position_from(k)
-        else:
-            step = syntax.Empty
-    else:
-        step = syntax.Empty
-
-    return terms.Slice(location=t.location, lower=lower, upper=upper, step=step)
+def _scan_slice_step(c: Cursor) -> parser.ParseGenerator:
+    t = c.start_tracker()
+    if t.validate(_consume_punct(c, ':')):
+        return (yield from parser.optional(c, rn.EXPRESSION))
+    return t.fail()
 
 
+@parser.starts_with(_NAME)
 def _parse_atom__name_load(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
     if t.validate(token := c.consume_rule(rn.TOKEN)) and isinstance(token, TokenName):
-        return terms.TypedName(location=token.location, id=token.value, ctx='load', mode=c.config.mode)
+        return c.build(terms.TypedName, location=token.location, id=token.value, ctx='load', mode=c.config.mode)
     return t.fail()
 
 
+@parser.starts_with('True', 'False', 'None')
 def _parse_atom__bool(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
     if t.validate(token := c.consume_rule(rn.TOKEN)) and isinstance(token, TokenKeyword):
         location = token.location
         if token.value in ('True', 'False'):
             value = token.value == 'True'
-            return terms.BooleanLiteral(value=value, mode=c.config.mode, location=location)
+            return c.build(terms.BooleanLiteral, value=value, mode=c.config.mode, location=location)
         if token.value == 'None':
-            return terms.NoneLiteral(mode=c.config.mode, location=location)
+            return c.build(terms.NoneLiteral, mode=c.config.mode, location=location)
     return t.fail()
 
 
+@parser.starts_with(_STRING)
 def _parse_atom__string(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
     if t.validate(token := c.consume_rule(rn.TOKEN)) and isinstance(token, TokenString):
-        return terms.StringLiteral(value=token.value, mode=c.config.mode, location=token.location)
+        return c.build(terms.StringLiteral, value=token.value, mode=c.config.mode, location=token.location)
     return t.fail()
 
 
+@parser.starts_with(_NUMBER)
 def _parse_atom__number(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
     if t.validate(token := c.consume_rule(rn.TOKEN)):
         if isinstance(token, TokenInteger):
-            return terms.IntegerLiteral(value=token.value, mode=c.config.mode, location=token.location)
+            return c.build(terms.IntegerLiteral, value=token.value, mode=c.config.mode, location=token.location)
         if isinstance(token, TokenFloat):
-            return terms.FloatLiteral(value=token.value, mode=c.config.mode, location=token.location)
+            return c.build(terms.FloatLiteral, value=token.value, mode=c.config.mode, location=token.location)
     return t.fail()
 
 
-def _parse_group__named_expression(c: Cursor) -> syntax.Term:
+@parser.starts_with('(')
+def _parse_group__named_expression(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
         t.validate(_consume_punct(c, '('))
-        and t.validate(expr := c.consume_rule(rn.NAMED_EXPRESSION))
-        and t.validate(_consume_punct(c, ')'))
+        and t.validate(expr := (yield c.request_rule(rn.NAMED_EXPRESSION)))
+        and t.validate(_consume_closing_bracket(c, ')'))
     ):
         return expr
     return t.fail()
 
 
+@parser.starts_with('(')
 def _parse_tuple__empty(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
-    if t.validate(_consume_punct(c, '(')) and t.validate(_consume_punct(c, ')')):
-        return terms.Tuple(location=t.location, elements=[], ctx='load')
+    if t.validate(_consume_punct(c, '(')) and t.validate(_consume_closing_bracket(c, ')')):
+        return c.build(terms.Tuple, location=t.location, elements=[], ctx='load')
     return t.fail()
 
 
-def _parse_tuple__single(c: Cursor) -> syntax.Term:
+@parser.starts_with('(')
+def _parse_tuple__single(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
         t.validate(_consume_punct(c, '('))
-        and t.validate(element := c.consume_rule(rn.STAR_NAMED_EXPRESSION))
+        and t.validate(element := (yield c.request_rule(rn.STAR_NAMED_EXPRESSION)))
         and t.validate(_consume_punct(c, ','))
-        and t.validate(_consume_punct(c, ')'))
+        and t.validate(_consume_closing_bracket(c, ')'))
     ):
-        return terms.Tuple(location=t.location, elements=[element], ctx='load')
+        return c.build(terms.Tuple, location=t.location, elements=[element], ctx='load')
     return t.fail()
 
 
-def _parse_tuple__multi(c: Cursor) -> syntax.Term:
+@parser.starts_with('(')
+def _parse_tuple__multi(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
         t.validate(_consume_punct(c, '('))
-        and t.validate(element := c.consume_rule(rn.STAR_NAMED_EXPRESSION))
+        and t.validate(element := (yield c.request_rule(rn.STAR_NAMED_EXPRESSION)))
         and t.validate(_consume_punct(c, ','))
-        and t.validate(elements := _expect_rule(c, rn.STAR_NAMED_EXPRESSIONS))
-        and t.validate(_expect_punct(c, ')'))
+        and t.validate(elements := (yield from parser.expect(c, rn.STAR_NAMED_EXPRESSIONS)))
+        and t.validate(_expect_closing_bracket(c, ')'))
     ):
-        return terms.Tuple(
-            location=t.location, elements=[element, *cast('syntax.TermList', elements).terms], ctx='load'
+        return c.build(
+            terms.Tuple, location=t.location, elements=[element, *cast('syntax.TermList', elements).terms], ctx='load'
         )
     return t.fail()
 
 
+@parser.starts_with('[')
 def _parse_list__empty(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
-    if t.validate(_consume_punct(c, '[')) and t.validate(_consume_punct(c, ']')):
-        return terms.TypedList(location=t.location, elements=[], mode=c.config.mode)
+    if t.validate(_consume_punct(c, '[')) and t.validate(_consume_closing_bracket(c, ']')):
+        return c.build(terms.TypedList, location=t.location, elements=[], mode=c.config.mode)
     return t.fail()
 
 
-def _parse_list__non_empty(c: Cursor) -> syntax.Term:
+@parser.starts_with('[')
+def _parse_list__non_empty(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
         t.validate(_consume_punct(c, '['))
-        and t.validate(elements := c.consume_rule(rn.STAR_NAMED_EXPRESSIONS))
-        and t.validate(_consume_punct(c, ']'))
+        and t.validate(elements := (yield c.request_rule(rn.STAR_NAMED_EXPRESSIONS)))
+        and t.validate(_consume_closing_bracket(c, ']'))
     ):
-        return terms.TypedList(
-            location=t.location, elements=cast('syntax.TermList', elements).terms, mode=c.config.mode
+        return c.build(
+            terms.TypedList, location=t.location, elements=cast('syntax.TermList', elements).terms, mode=c.config.mode
         )
     return t.fail()
 
 
-def _parse_set(c: Cursor) -> syntax.Term:
+@parser.starts_with('{')
+def _parse_set(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
         t.validate(_consume_punct(c, '{'))
-        and t.validate(elements := c.consume_rule(rn.STAR_NAMED_EXPRESSIONS))
-        and t.validate(_consume_punct(c, '}'))
+        and t.validate(elements := (yield c.request_rule(rn.STAR_NAMED_EXPRESSIONS)))
+        and t.validate(_consume_closing_bracket(c, '}'))
     ):
-        return terms.TypedSet(location=t.location, elements=cast('syntax.TermList', elements).terms, mode=c.config.mode)
+        return c.build(
+            terms.TypedSet, location=t.location, elements=cast('syntax.TermList', elements).terms, mode=c.config.mode
+        )
     return t.fail()
 
 
+@parser.starts_with('{')
 def _parse_dict__empty(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
-    if t.validate(_consume_punct(c, '{')) and t.validate(_consume_punct(c, '}')):
-        return terms.TypedDict(location=t.location, keys=[], values=[], mode=c.config.mode)
+    if t.validate(_consume_punct(c, '{')) and t.validate(_consume_closing_bracket(c, '}')):
+        return c.build(terms.TypedDict, location=t.location, keys=[], values=[], mode=c.config.mode)
     return t.fail()
 
 
-def _parse_dict__non_empty(c: Cursor) -> syntax.Term:
+@parser.starts_with('{')
+def _parse_dict__non_empty(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
         t.validate(_consume_punct(c, '{'))
-        and t.validate(kvpairs := c.consume_rule(rn.DOUBLE_STARRED_KVPAIRS))
-        and t.validate(_consume_punct(c, '}'))
+        and t.validate(kvpairs := (yield c.request_rule(rn.DOUBLE_STARRED_KVPAIRS)))
+        and t.validate(_consume_closing_bracket(c, '}'))
     ):
         keys = []
         values = []
@@ -1233,11 +1270,12 @@ def _parse_dict__non_empty(c: Cursor) -> syntax.Term:
                 values.append(kvpair.value)
             else:
                 return syntax.ErrorTerm(message='Expected key-value pair in dict literal', location=t.location)
-        return terms.TypedDict(location=t.location, keys=keys, values=values, mode=c.config.mode)
+        return c.build(terms.TypedDict, location=t.location, keys=keys, values=values, mode=c.config.mode)
     return t.fail()
 
 
-def _parse_atom__literal_lifting(c: Cursor) -> syntax.Term:
+@parser.starts_with('^')
+def _parse_atom__literal_lifting(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     mode = c.config.mode
     if mode is terms.MODE_SAFE:
@@ -1249,270 +1287,122 @@ def _parse_atom__literal_lifting(c: Cursor) -> syntax.Term:
         t.validate(_consume_punct(c, '^'))
         and not c.is_end()
         and not c.current_char().isspace()  # no space allowed to distinguish from bitwise xor
-        and t.validate(atom := c.consume_rule(rn.ATOM, config=config))
+        and t.validate(atom := (yield c.request_rule(rn.ATOM, config=config)))
     ):
         return atom
     return t.fail()
 
 
-def _parse_double_starred_kvpairs(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    kvpairs = []
-    if t.validate(first_kvpair := c.consume_rule(rn.DOUBLE_STARRED_KVPAIR)):
-        kvpairs.append(first_kvpair)
-        k = c.clone()
-        while t.validate(_consume_punct(k, ',')) and t.validate(kvpair := k.consume_rule(rn.DOUBLE_STARRED_KVPAIR)):
-            c.copy_position_from(k)
-            kvpairs.append(kvpair)
-    k = c.clone()
-    if t.validate(_consume_punct(k, ',')):
-        # Allow trailing comma
-        c.copy_position_from(k)
-    return t.captured_error or syntax.TermList(terms=kvpairs)
+def _parse_double_starred_kvpairs(c: Cursor) -> parser.ParseGenerator:
+    return (yield from parser.sep_by(c, rn.DOUBLE_STARRED_KVPAIR, _punct(','), trailing=True))
 
 
-def _parse_kvpair(c: Cursor) -> syntax.Term:
+def _parse_kvpair(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
-        t.validate(key := c.consume_rule(rn.EXPRESSION))
+        t.validate(key := (yield c.request_rule(rn.EXPRESSION)))
         and t.validate(_consume_punct(c, ':'))
-        and t.validate(value := _expect_rule(c, rn.EXPRESSION))
+        and t.validate(value := (yield from parser.expect(c, rn.EXPRESSION)))
     ):
         return KeyValuePair(key=key, value=value)
     return t.fail()
 
 
-def _parse_factor__unary(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    if t.validate(op := _consume_punct(c, '+', '-', '~')) and t.validate(factor := _expect_rule(c, rn.FACTOR)):
-        return terms.UnaryOp(cast('TokenPunct', op).value, factor, location=t.location)
-    return t.fail()
+def _scan_operator(c: Cursor) -> str | None:
+    token = c.consume_rule(rn.TOKEN)
+    if isinstance(token, TokenPunct):
+        if token.value == '^' and (c.is_end() or not c.current_char().isspace()):
+            return None  # space required to distinguish bitwise xor from literal lifting syntax `^atom`
+        return token.value
+    if isinstance(token, TokenKeyword):
+        if token.value in ('not', 'is'):
+            offset = c.offset
+            second = c.consume_rule(rn.TOKEN)
+            if isinstance(second, TokenKeyword) and second.value == ('in' if token.value == 'not' else 'not'):
+                return f'{token.value} {second.value}'
+            c.offset = offset
+        return token.value
+    return None
 
 
-def _parse_power__binary(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    if (
-        t.validate(left := c.consume_rule(rn.PRIMARY))
-        and t.validate(_consume_punct(c, '**'))
-        and t.validate(right := _expect_rule(c, rn.FACTOR))
-    ):
-        return terms.BinOp(left, '**', right, location=t.location)
-    return t.fail()
+def _create_bool_op(c: Cursor, operators: list[str], operands: list[syntax.Term], location: syntax.Location):
+    return terms.TypedBoolOp(location=location, operator=operators[0], values=operands, mode=c.config.mode)
 
 
-def _parse_invalid_factor(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    if (
-        t.validate(_consume_punct(c, '+', '-', '~'))
-        and t.validate(_consume_keyword(c, 'not'))
-        and t.validate(c.consume_rule(rn.FACTOR))
-    ):
-        return syntax.ErrorTerm(message="'not' after an operator must be parenthesized", location=t.location)
-    return t.fail()
+def _create_bool_not(c: Cursor, operators: list[str], operands: list[syntax.Term], location: syntax.Location):
+    del operators
+    return terms.BoolNot(operand=operands[0], mode=c.config.mode, location=location)
 
 
-def _parse_term__binary(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    if (
-        t.validate(left := c.consume_rule(rn.TERM))
-        and t.validate(op := _consume_punct(c, '*', '/', '//', '%', '@'))
-        and t.validate(right := _expect_rule(c, rn.FACTOR))
-    ):
-        return terms.BinOp(left, cast('TokenPunct', op).value, right, location=t.location)
-    return t.fail()
+def _create_compare(c: Cursor, operators: list[str], operands: list[syntax.Term], location: syntax.Location):
+    del c
+    return terms.Compare(left=operands[0], operators=operators, comparators=operands[1:], location=location)
 
 
-def _parse_bitwise_or__binary(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    if (
-        t.validate(left := c.consume_rule(rn.BITWISE_OR))
-        and t.validate(op := _consume_punct(c, '|'))
-        and t.validate(right := _expect_rule(c, rn.BITWISE_XOR))
-    ):
-        return terms.BinOp(left, cast('TokenPunct', op).value, right, location=t.location)
-    return t.fail()
+def _create_bin_op(c: Cursor, operators: list[str], operands: list[syntax.Term], location: syntax.Location):
+    del c
+    return terms.BinOp(operands[0], operators[0], operands[1], location=location)
 
 
-def _parse_bitwise_xor__binary(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    if (
-        t.validate(left := c.consume_rule(rn.BITWISE_XOR))
-        and t.validate(op := _consume_punct(c, '^'))
-        and not c.is_end()
-        and c.current_char().isspace()  # space required to distinguish from literal lifting syntax `^atom`
-        and t.validate(right := _expect_rule(c, rn.BITWISE_AND))
-    ):
-        return terms.BinOp(left, cast('TokenPunct', op).value, right, location=t.location)
-    return t.fail()
+def _create_unary_op(c: Cursor, operators: list[str], operands: list[syntax.Term], location: syntax.Location):
+    del c
+    return terms.UnaryOp(operators[0], operands[0], location=location)
 
 
-def _parse_bitwise_and__binary(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    if (
-        t.validate(left := c.consume_rule(rn.BITWISE_AND))
-        and t.validate(op := _consume_punct(c, '&'))
-        and t.validate(right := _expect_rule(c, rn.SHIFT_EXPR))
-    ):
-        return terms.BinOp(left, cast('TokenPunct', op).value, right, location=t.location)
-    return t.fail()
-
-
-def _parse_shift_expr__binary(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    if (
-        t.validate(left := c.consume_rule(rn.SHIFT_EXPR))
-        and t.validate(op := _consume_punct(c, '<<', '>>'))
-        and t.validate(right := _expect_rule(c, rn.SUM))
-    ):
-        return terms.BinOp(left, cast('TokenPunct', op).value, right, location=t.location)
-    return t.fail()
-
-
-def _parse_invalid_arithmetic(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    if (
-        t.validate(c.consume_rule(rn.SUM))
-        and t.validate(_consume_punct(c, '+', '-', '*', '/', '%', '//', '@'))
-        and t.validate(_consume_keyword(c, 'not'))
-        and t.validate(c.consume_rule(rn.INVERSION))
-    ):
-        return syntax.ErrorTerm(message="'not' after an operator must be parenthesized", location=t.location)
-    return t.fail()
+# Operator precedence levels from DISJUNCTION down to POWER, parsed by a single precedence climbing loop over PRIMARY.
+_OPERATOR_TOWER = parser.OperatorTower(
+    [
+        parser.OperatorLevel(rn.DISJUNCTION, parser.OperatorKind.CHAIN, ('or',), _create_bool_op),
+        parser.OperatorLevel(rn.CONJUNCTION, parser.OperatorKind.CHAIN, ('and',), _create_bool_op),
+        parser.OperatorLevel(rn.INVERSION, parser.OperatorKind.PREFIX, ('not',), _create_bool_not),
+        parser.OperatorLevel(
+            rn.COMPARISON,
+            parser.OperatorKind.CHAIN,
+            ('==', '!=', '<=', '<', '>=', '>', 'not in', 'in', 'is not', 'is'),
+            _create_compare,
+            # A comparison operator without an operand is left to the enclosing rule, e.g. the '>' closing `<a:b>`.
+            operand_required=False,
+        ),
+        parser.OperatorLevel(rn.BITWISE_OR, parser.OperatorKind.LEFT, ('|',), _create_bin_op),
+        parser.OperatorLevel(rn.BITWISE_XOR, parser.OperatorKind.LEFT, ('^',), _create_bin_op),
+        parser.OperatorLevel(rn.BITWISE_AND, parser.OperatorKind.LEFT, ('&',), _create_bin_op),
+        parser.OperatorLevel(rn.SHIFT_EXPR, parser.OperatorKind.LEFT, ('<<', '>>'), _create_bin_op),
+        parser.OperatorLevel(rn.SUM, parser.OperatorKind.LEFT, ('+', '-'), _create_bin_op),
+        parser.OperatorLevel(rn.TERM, parser.OperatorKind.LEFT, ('*', '/', '//', '%', '@'), _create_bin_op),
+        parser.OperatorLevel(rn.FACTOR, parser.OperatorKind.PREFIX, ('+', '-', '~'), _create_unary_op),
+        parser.OperatorLevel(rn.POWER, parser.OperatorKind.RIGHT, ('**',), _create_bin_op, operand_rule=rn.FACTOR),
+    ],
+    operand_rule=rn.PRIMARY,
+    scan_operator=_scan_operator,
+)
 
 
-def _parse_sum__binary(c: Cursor) -> syntax.Term:
+def _parse_star_expressions__multi(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    if (
-        t.validate(left := c.consume_rule(rn.SUM))
-        and t.validate(op := _consume_punct(c, '+', '-'))
-        and t.validate(right := _expect_rule(c, rn.TERM))
+    if t.validate(
+        elements := (yield from parser.sep_by(c, rn.STAR_EXPRESSION, _punct(','), min_count=2, trailing=True))
     ):
-        return terms.BinOp(left, cast('TokenPunct', op).value, right, location=t.location)
-    return t.fail()
-
-
-def _scan_operator(c: Cursor) -> str | None:
-    first = c.consume_rule(rn.TOKEN)
-    if isinstance(first, TokenPunct) and first.value in ('==', '!=', '<=', '<', '>=', '>'):
-        return first.value
-    if isinstance(first, TokenKeyword):
-        if first.value == 'in':
-            return 'in'
-        if first.value == 'not':
-            second = c.consume_rule(rn.TOKEN)
-            if isinstance(second, TokenKeyword) and second.value == 'in':
-                return 'not in'
-            return None
-        if first.value == 'is':
-            k = c.clone()
-            second = k.consume_rule(rn.TOKEN)
-            if isinstance(second, TokenKeyword) and second.value == 'not':
-                c.copy_position_from(k)
-                return 'is not'
-            return 'is'
-    return None
-
-
-def _parse_comparison(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    if t.validate(left := c.consume_rule(rn.SUM)):
-        ops = []
-        comparators = []
-        k = c.clone()
-        while (op := _scan_operator(k)) and t.validate(comparator := k.consume_rule(rn.SUM)):
-            c.copy_position_from(k)
-            ops.append(op)
-            comparators.append(comparator)
-        if ops:
-            return terms.Compare(left=left, operators=ops, comparators=comparators, location=t.location)
-    return t.fail()
-
-
-def _parse_inversion__not(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    if t.validate(_consume_keyword(c, 'not')) and t.validate(operand := _expect_rule(c, rn.COMPARISON)):
-        return terms.BoolNot(
-            operand=operand,
-            mode=c.config.mode,
-            location=t.location,
-        )
-    return t.fail()
-
-
-def _parse_conjunction__and(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    if t.validate(left := c.consume_rule(rn.INVERSION)):
-        values = [left]
-        k = c.clone()
-        while t.validate(_consume_keyword(k, 'and')) and t.validate(right := _expect_rule(k, rn.INVERSION)):
-            c.copy_position_from(k)
-            values.append(right)
-        if len(values) > 1:
-            return terms.TypedBoolOp(location=t.location, operator='and', values=values, mode=c.config.mode)
+        return c.build(terms.Tuple, location=t.location, elements=cast('syntax.TermList', elements).terms, ctx='load')
     return t.fail()
 
 
-def _parse_disjunction__or(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    if t.validate(left := c.consume_rule(rn.CONJUNCTION)):
-        values = [left]
-        k = c.clone()
-        while t.validate(_consume_keyword(k, 'or')) and t.validate(right := _expect_rule(k, rn.CONJUNCTION)):
-            c.copy_position_from(k)
-            values.append(right)
-        if len(values) > 1:
-            return terms.TypedBoolOp(location=t.location, operator='or', values=values, mode=c.config.mode)
-    return t.fail()
+def _parse_star_named_expressions(c: Cursor) -> parser.ParseGenerator:
+    return (yield from parser.sep_by(c, rn.STAR_NAMED_EXPRESSION, _punct(','), trailing=True))
 
 
-def _parse_star_expressions__multi(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    elements = []
-    if (
-        t.validate(first := c.consume_rule(rn.STAR_EXPRESSION))
-        and t.validate(_consume_punct(c, ','))
-        and t.validate(second := c.consume_rule(rn.STAR_EXPRESSION))
-    ):
-        elements.append(first)
-        elements.append(second)
-        k = c.clone()
-        while t.validate(_consume_punct(k, ',')) and t.validate(next_ := k.consume_rule(rn.STAR_EXPRESSION)):
-            c.copy_position_from(k)
-            elements.append(next_)
-        k = c.clone()
-        if t.validate(_consume_punct(k, ',')):
-            # Allow trailing comma
-            c.copy_position_from(k)
-        return t.captured_error or terms.Tuple(location=t.location, elements=elements, ctx='load')
-    return t.fail()
-
-
-def _parse_star_named_expressions(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    elements = []
-    if t.validate(first := c.consume_rule(rn.STAR_NAMED_EXPRESSION)):
-        elements.append(first)
-        k = c.clone()
-        while t.validate(_consume_punct(k, ',')) and t.validate(next_ := k.consume_rule(rn.STAR_NAMED_EXPRESSION)):
-            c.copy_position_from(k)
-            elements.append(next_)
-    k = c.clone()
-    if t.validate(_consume_punct(k, ',')):
-        # Allow trailing comma
-        c.copy_position_from(k)
-    return t.captured_error or syntax.TermList(terms=elements)
-
-
-def _parse_expression__double_layer(c: Cursor) -> syntax.Term:
+@parser.starts_with('<')
+def _parse_expression__double_layer(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
         t.validate(_consume_punct(c, '<'))
         and t.validate(
-            low := c.consume_rule(rn.EXPRESSION, config=dataclasses.replace(c.config, mode=terms.MODE_EVALUATE))
+            low := (yield c.request_rule(rn.EXPRESSION, config=dataclasses.replace(c.config, mode=terms.MODE_EVALUATE)))
         )
         and t.validate(_consume_punct(c, ':'))
         and t.validate(
-            high := c.consume_rule(rn.EXPRESSION, config=dataclasses.replace(c.config, mode=terms.MODE_TYPECHECK))
+            high := (
+                yield c.request_rule(rn.EXPRESSION, config=dataclasses.replace(c.config, mode=terms.MODE_TYPECHECK))
+            )
         )
         and t.validate(_consume_punct(c, '>'))
     ):
@@ -1520,7 +1410,8 @@ def _parse_expression__double_layer(c: Cursor) -> syntax.Term:
     return t.fail()
 
 
-def _parse_assignment_expression(c: Cursor) -> syntax.Term:
+@parser.starts_with(_NAME)
+def _parse_assignment_expression(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
         t.validate(token := c.consume_rule(rn.TOKEN))
@@ -1528,9 +1419,12 @@ def _parse_assignment_expression(c: Cursor) -> syntax.Term:
         and (name_location := token.location)
         and t.validate(_consume_punct(c, ':='))
     ):
-        if t.validate(value := c.consume_rule(rn.EXPRESSION)):
-            return terms.NamedExpr(
-                target=terms.TypedName(id=token.value, ctx='store', mode=c.config.mode, location=name_location),
+        if t.validate(value := (yield c.request_rule(rn.EXPRESSION))):
+            return c.build(
+                terms.NamedExpr,
+                target=c.build(
+                    terms.TypedName, id=token.value, ctx='store', mode=c.config.mode, location=name_location
+                ),
                 value=value,
                 location=t.location,
             )
@@ -1538,63 +1432,73 @@ def _parse_assignment_expression(c: Cursor) -> syntax.Term:
     return t.fail()
 
 
-def _parse_expression_no_walrus(c: Cursor) -> syntax.Term:
+def _parse_expression_no_walrus(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    if t.validate(value := c.consume_rule(rn.EXPRESSION)) and not t.validate(_consume_punct(c.clone(), ':=')):
+    if t.validate(value := (yield c.request_rule(rn.EXPRESSION))) and t.validate(
+        (yield from parser.not_followed_by(c, _punct(':=')))
+    ):
         return value
     return t.fail()
 
 
-def _parse_assignment__annotated(c: Cursor) -> syntax.Term:
+def _parse_assignment__annotated(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    if t.validate(target_name := c.consume_rule(rn.STAR_TARGETS)) and t.validate(_consume_punct(c, ':')):
-        k = c.clone()
-        k.config = parser.Config(mode=terms.MODE_TYPECHECK)
-        if t.validate(target_type := _expect_rule(k, rn.EXPRESSION)):
-            c.copy_position_from(k)
-            if (
-                t.validate(_consume_punct(c, '='))
-                and t.validate(value := _expect_rule(c, rn.ANNOTATED_RHS))
-                and not t.validate(_consume_punct(c.clone(), '='))
-            ):
-                return terms.TypedAssign(
-                    target_name=target_name,
-                    target_type=target_type,
-                    value=value,
-                    mode=c.config.mode,
-                    location=t.location,
-                )
+    if (
+        t.validate(target_name := (yield c.request_rule(rn.STAR_TARGETS)))
+        and t.validate(_consume_punct(c, ':'))
+        and t.validate(target_type := (yield from parser.expect(c, _typecheck_expression, rn.EXPRESSION)))
+        and t.validate(_consume_punct(c, '='))
+        and t.validate(value := (yield from parser.expect(c, rn.ANNOTATED_RHS)))
+        and t.validate((yield from parser.not_followed_by(c, _punct('='))))
+    ):
+        return terms.TypedAssign(
+            target_name=target_name,
+            target_type=target_type,
+            value=value,
+            mode=c.config.mode,
+            location=t.location,
+        )
     return t.fail()
 
 
-def _parse_assignment__multi_targets(c: Cursor) -> syntax.Term:
+def _typecheck_expression(c: Cursor) -> parser.ParseGenerator:
+    return (yield c.request_rule(rn.EXPRESSION, config=parser.Config(mode=terms.MODE_TYPECHECK)))
+
+
+def _parse_assignment__multi_targets(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    targets = []
-    k = c.clone()
-    while t.validate(target := k.consume_rule(rn.STAR_TARGETS)) and t.validate(_consume_punct(k, '=')):
-        c.copy_position_from(k)
-        targets.append(target)
-    if not targets:
-        return t.fail()
-    if t.validate(value := _expect_rule(c, rn.ANNOTATED_RHS)) and not t.validate(_consume_punct(c.clone(), '=')):
-        return terms.Assign(targets=targets, value=value, location=t.location)
+    if (
+        t.validate(targets := (yield from parser.many(c, _scan_assignment_target, min_count=1)))
+        and t.validate(value := (yield from parser.expect(c, rn.ANNOTATED_RHS)))
+        and t.validate((yield from parser.not_followed_by(c, _punct('='))))
+    ):
+        return terms.Assign(targets=cast('syntax.TermList', targets).terms, value=value, location=t.location)
+    return t.fail()
+
+
+def _scan_assignment_target(c: Cursor) -> parser.ParseGenerator:
+    t = c.start_tracker()
+    if t.validate(target := (yield c.request_rule(rn.STAR_TARGETS))) and t.validate(_consume_punct(c, '=')):
+        return target
     return t.fail()
 
 
 def _parse_statement__star_expressions(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
     if t.validate(value := c.consume_rule(rn.STAR_EXPRESSIONS)):
-        if hasattr(value, 'location'):
-            location = value.location
-        else:
-            location = t.location
-        return terms.Expr(location=location, value=value)
+        return c.build(_create_expr, value=value, location=t.location)
     return t.fail()
 
 
+def _create_expr(value: syntax.Term, location: syntax.Location) -> syntax.Term:
+    # The expression is built, when deferred, by the time the statement is.
+    return terms.Expr(location=getattr(value, 'location', location), value=value)
+
+
+@parser.starts_with('return')
 def _parse_return(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
-    if t.validate(_consume_keyword(c, 'return')):
+    if t.validate(_consume_statement_keyword(c, 'return')):
         if t.validate(value := c.consume_rule(rn.EXPRESSION)):
             return terms.TypedReturn(value=value, mode=c.config.mode, location=t.location)
         return t.captured_error or terms.TypedReturn(
@@ -1603,25 +1507,27 @@ def _parse_return(c: Cursor) -> syntax.Term:
     return t.fail()
 
 
-def _rule_parameter_with_type(c: Cursor) -> syntax.Term:
+@parser.starts_with(_NAME)
+def _rule_parameter_with_type(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    if t.validate(name := _consume_name(c)) and t.validate(_consume_punct(c, ':')):
-        k = c.clone()
-        k.config = parser.Config(mode=terms.MODE_TYPECHECK)
-        if t.validate(param_type := _expect_rule(k, rn.EXPRESSION)):
-            c.copy_position_from(k)
-            param_name = cast('TokenName', name).value
-            return terms.Parameter(
-                name=param_name,
-                type_=syntax.Layers([syntax.Empty, param_type]),
-                default=syntax.Empty,
-                mode=c.config.mode,
-                category=terms.ParamCategory.REGULAR,
-                location=t.location,
-            )
+    if (
+        t.validate(name := _consume_name(c))
+        and t.validate(_consume_punct(c, ':'))
+        and t.validate(param_type := (yield from parser.expect(c, _typecheck_expression, rn.EXPRESSION)))
+    ):
+        param_name = cast('TokenName', name).value
+        return terms.Parameter(
+            name=param_name,
+            type_=syntax.Layers([syntax.Empty, param_type]),
+            default=syntax.Empty,
+            mode=c.config.mode,
+            category=terms.ParamCategory.REGULAR,
+            location=t.location,
+        )
     return t.fail()
 
 
+@parser.starts_with(_NAME)
 def _rule_parameter_no_type(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
     if t.validate(name := _consume_name(c)):
@@ -1637,28 +1543,22 @@ def _rule_parameter_no_type(c: Cursor) -> syntax.Term:
     return t.fail()
 
 
-def _scan_parameters(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    params = []
-    if t.validate(first_param := c.consume_rule(rn.PARAM)):
-        params.append(first_param)
-        k = c.clone()
-        while t.validate(_consume_punct(k, ',')) and t.validate(param := _expect_rule(k, rn.PARAM)):
-            c.copy_position_from(k)
-            params.append(param)
-    return t.captured_error or syntax.TermList(terms=params)
+def _scan_parameters(c: Cursor) -> parser.ParseGenerator:
+    return (yield from parser.sep_by(c, rn.PARAM, _punct(','), required=True))
+
+
+def _scan_optional_return_type(c: Cursor) -> parser.ParseGenerator:
+    return (yield from parser.optional(c, _scan_return_type))
 
 
-def _scan_optional_return_type(c: Cursor) -> syntax.Term:
+def _scan_return_type(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    k = c.clone()
-    k.config = parser.Config(mode=terms.MODE_TYPECHECK)
-    if t.validate(_consume_punct(k, '->')) and t.validate(return_type := _expect_rule(k, rn.EXPRESSION)):
-        c.copy_position_from(k)
-        return return_type
-    return t.captured_error or syntax.Empty
+    if t.validate(_consume_punct(c, '->')):
+        return (yield from parser.expect(c, _typecheck_expression, rn.EXPRESSION))
+    return t.fail()
 
 
+@parser.starts_with(_NAME)
 def _parse_compound_stmt__layer_only(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
     if t.validate(layer_name := _consume_name(c)) and t.validate(_consume_punct(c, ':')):
@@ -1673,15 +1573,16 @@ def _parse_compound_stmt__layer_only(c: Cursor) -> syntax.Term:
     return t.fail()
 
 
-def _parse_function_def(c: Cursor) -> syntax.Term:
+@parser.starts_with('def')
+def _parse_function_def(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
-        t.validate(_consume_keyword(c, 'def'))
+        t.validate(_consume_statement_keyword(c, 'def'))
         and t.validate(func_name := _expect_name(c))
         and t.validate(_expect_punct(c, '('))
-        and t.validate(params := _scan_parameters(c))
-        and t.validate(_expect_punct(c, ')'))
-        and t.validate(return_type := _scan_optional_return_type(c))
+        and t.validate(params := (yield from _scan_parameters(c)))
+        and t.validate(_expect_closing_bracket(c, ')'))
+        and t.validate(return_type := (yield from _scan_optional_return_type(c)))
         and t.validate(_expect_punct(c, ':'))
     ):
         name = cast('TokenName', func_name).value
@@ -1696,10 +1597,11 @@ def _parse_function_def(c: Cursor) -> syntax.Term:
     return t.fail()
 
 
+@parser.starts_with('if')
 def _parse_if_stmt(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
     if (
-        t.validate(_consume_keyword(c, 'if'))
+        t.validate(_consume_statement_keyword(c, 'if'))
         and t.validate(test := _expect_rule(c, rn.NAMED_EXPRESSION))
         and t.validate(_expect_punct(c, ':'))
     ):
@@ -1714,10 +1616,11 @@ def _parse_if_stmt(c: Cursor) -> syntax.Term:
     return t.fail()
 
 
+@parser.starts_with('elif')
 def _parse_elif_stmt(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
     if (
-        t.validate(_consume_keyword(c, 'elif'))
+        t.validate(_consume_statement_keyword(c, 'elif'))
         and t.validate(test := _expect_rule(c, rn.NAMED_EXPRESSION))
         and t.validate(_expect_punct(c, ':'))
     ):
@@ -1729,17 +1632,19 @@ def _parse_elif_stmt(c: Cursor) -> syntax.Term:
     return t.fail()
 
 
+@parser.starts_with('else')
 def _parse_else_stmt(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
-    if t.validate(_consume_keyword(c, 'else')) and t.validate(_expect_punct(c, ':')):
+    if t.validate(_consume_statement_keyword(c, 'else')) and t.validate(_expect_punct(c, ':')):
         return terms.ElseSibling(location=t.location, body=syntax.TermList(terms=[], is_placeholder=True))
     return t.fail()
 
 
+@parser.starts_with('while')
 def _parse_while_stmt(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
     if (
-        t.validate(_consume_keyword(c, 'while'))
+        t.validate(_consume_statement_keyword(c, 'while'))
         and t.validate(test := _expect_rule(c, rn.NAMED_EXPRESSION))
         and t.validate(_expect_punct(c, ':'))
     ):
@@ -1753,10 +1658,11 @@ def _parse_while_stmt(c: Cursor) -> syntax.Term:
     return t.fail()
 
 
+@parser.starts_with('for')
 def _parse_for_stmt(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
     if (
-        t.validate(_consume_keyword(c, 'for'))
+        t.validate(_consume_statement_keyword(c, 'for'))
         and t.validate(target := _expect_rule(c, rn.STAR_TARGETS))
         and t.validate(_consume_keyword(c, 'in'))
         and t.validate(iter_ := _expect_rule(c, rn.STAR_EXPRESSIONS))
@@ -1773,23 +1679,16 @@ def _parse_for_stmt(c: Cursor) -> syntax.Term:
     return t.fail()
 
 
-def _scan_with_items(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    if t.validate(first_item := c.consume_rule(rn.WITH_ITEM)):
-        items = [first_item]
-        k = c.clone()
-        while t.validate(_consume_punct(k, ',')) and t.validate(next_item := k.consume_rule(rn.WITH_ITEM)):
-            c.copy_position_from(k)
-            items.append(next_item)
-        return t.captured_error or syntax.TermList(terms=items)
-    return t.fail()
+def _scan_with_items(c: Cursor) -> parser.ParseGenerator:
+    return (yield from parser.sep_by(c, rn.WITH_ITEM, _punct(','), min_count=1))
 
 
-def _parse_with_stmt__normal(c: Cursor) -> syntax.Term:
+@parser.starts_with('with')
+def _parse_with_stmt__normal(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
-        t.validate(_consume_keyword(c, 'with'))
-        and t.validate(items := _scan_with_items(c))
+        t.validate(_consume_statement_keyword(c, 'with'))
+        and t.validate(items := (yield from _scan_with_items(c)))
         and t.validate(_expect_punct(c, ':'))
     ):
         return terms.With(
@@ -1818,9 +1717,10 @@ def _parse_with_item__expression(c: Cursor) -> syntax.Term:
     return t.fail()
 
 
+@parser.starts_with('try')
 def _parse_try_stmt(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
-    if t.validate(_consume_keyword(c, 'try')) and t.validate(_expect_punct(c, ':')):
+    if t.validate(_consume_statement_keyword(c, 'try')) and t.validate(_expect_punct(c, ':')):
         return terms.TypedTry(
             location=t.location,
             body=syntax.TermList(terms=[], is_placeholder=True),
@@ -1831,60 +1731,78 @@ def _parse_try_stmt(c: Cursor) -> syntax.Term:
     return t.fail()
 
 
-def _parse_except_block(c: Cursor) -> syntax.Term:
+@parser.starts_with('except')
+def _parse_except_block(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    if t.validate(_consume_keyword(c, 'except')) and t.validate(exception_type := c.consume_rule(rn.EXPRESSION)):
-        name: str | None = None
-        k = c.clone()
-        if t.validate(_consume_keyword(k, 'as')) and t.validate(name_token := _expect_name(k)):
-            c.copy_position_from(k)
-            name = cast('TokenName', name_token).value
-        if t.validate(_expect_punct(c, ':')):
-            return terms.ExceptSibling(
-                location=t.location,
-                exception_type=exception_type,
-                name=name,
-                body=syntax.TermList(terms=[], is_placeholder=True),
-            )
+    if (
+        t.validate(_consume_statement_keyword(c, 'except'))
+        and t.validate(exception_type := (yield c.request_rule(rn.EXPRESSION)))
+        and t.validate(alias := (yield from parser.optional(c, _scan_alias)))
+        and t.validate(_expect_punct(c, ':'))
+    ):
+        return terms.ExceptSibling(
+            location=t.location,
+            exception_type=exception_type,
+            name=cast('TokenName', alias).value if alias is not syntax.Empty else None,
+            body=syntax.TermList(terms=[], is_placeholder=True),
+        )
     return t.fail()
 
 
+def _scan_alias(c: Cursor) -> parser.ParseGenerator:
+    t = c.start_tracker()
+    if t.validate(alias := (yield from parser.sequence(c, _keyword('as'), _expect_name))):
+        return cast('syntax.TermList', alias).terms[1]
+    return t.fail()
+
+
+@parser.starts_with('finally')
 def _parse_finally_block(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
-    if t.validate(_consume_keyword(c, 'finally')) and t.validate(_expect_punct(c, ':')):
+    if t.validate(_consume_statement_keyword(c, 'finally')) and t.validate(_expect_punct(c, ':')):
         return terms.FinallySibling(location=t.location, body=syntax.TermList(terms=[], is_placeholder=True))
     return t.fail()
 
 
+@parser.starts_with('pass')
 def _parse_pass(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
-    if t.validate(_consume_keyword(c, 'pass')):
+    if t.validate(_consume_statement_keyword(c, 'pass')):
         return terms.Pass(location=t.location)
     return t.fail()
 
 
-def _parse_raise__expression(c: Cursor) -> syntax.Term:
+@parser.starts_with('raise')
+def _parse_raise__expression(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    if t.validate(_consume_keyword(c, 'raise')) and t.validate(expr := c.consume_rule(rn.EXPRESSION)):
-        cause: syntax.Term = syntax.Empty
-        k = c.clone()
-        if t.validate(_consume_keyword(k, 'from')) and t.validate(cause_expr := _expect_rule(k, rn.EXPRESSION)):
-            c.copy_position_from(k)
-            cause = cause_expr
+    if (
+        t.validate(_consume_statement_keyword(c, 'raise'))
+        and t.validate(expr := (yield c.request_rule(rn.EXPRESSION)))
+        and t.validate(cause := (yield from parser.optional(c, _scan_raise_cause)))
+    ):
         return terms.Raise(location=t.location, exception=expr, cause=cause)
     return t.fail()
 
 
+def _scan_raise_cause(c: Cursor) -> parser.ParseGenerator:
+    t = c.start_tracker()
+    if t.validate(_consume_keyword(c, 'from')):
+        return (yield from parser.expect(c, rn.EXPRESSION))
+    return t.fail()
+
+
+@parser.starts_with('raise')
 def _parse_raise__no_expression(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
-    if t.validate(_consume_keyword(c, 'raise')):
+    if t.validate(_consume_statement_keyword(c, 'raise')):
         return terms.Raise(location=t.location, exception=syntax.Empty, cause=syntax.Empty)
     return t.fail()
 
 
+@parser.starts_with('del')
 def _parse_del_statement(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
-    if t.validate(_consume_keyword(c, 'del')) and t.validate(targets := c.consume_rule(rn.DEL_TARGETS)):
+    if t.validate(_consume_statement_keyword(c, 'del')) and t.validate(targets := c.consume_rule(rn.DEL_TARGETS)):
         if isinstance(targets, syntax.TermList) and targets.terms:
             return terms.Delete(location=t.location, targets=targets.terms)
         return t.captured_error or syntax.ErrorTerm(
@@ -1893,10 +1811,11 @@ def _parse_del_statement(c: Cursor) -> syntax.Term:
     return t.fail()
 
 
+@parser.starts_with('import')
 def _parse_import_name(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
     if (
-        t.validate(_consume_keyword(c, 'import'))
+        t.validate(_consume_statement_keyword(c, 'import'))
         and t.validate(aliases := _expect_rule(c, rn.DOTTED_AS_NAMES))
         and isinstance(aliases, syntax.TermList)
     ):
@@ -1905,36 +1824,22 @@ def _parse_import_name(c: Cursor) -> syntax.Term:
     return t.fail()
 
 
-def _count_dots(c: Cursor) -> int:
-    level = 0
-    while True:
-        k = c.clone()
-        if isinstance(_consume_punct(k, '...'), TokenPunct):
-            c.copy_position_from(k)
-            level += 3
-            continue
-        k = c.clone()
-        if isinstance(_consume_punct(k, '.'), TokenPunct):
-            c.copy_position_from(k)
-            level += 1
-            continue
-        break
-    return level
-
-
-def _parse_import_from(c: Cursor) -> syntax.Term:
+@parser.starts_with('from')
+def _parse_import_from(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    if t.validate(_consume_keyword(c, 'from')):
-        level = _count_dots(c)
+    if t.validate(_consume_statement_keyword(c, 'from')) and t.validate(
+        dots := (yield from parser.many(c, _punct('...', '.')))
+    ):
+        level = sum(len(cast('TokenPunct', dot).value) for dot in cast('syntax.TermList', dots).terms)
         module: str | None = None
-        dotted = c.consume_rule(rn.DOTTED_NAME)
+        dotted = yield c.request_rule(rn.DOTTED_NAME)
         if isinstance(dotted, TokenName):
             module = dotted.value
         elif level == 0:
             return t.fail()
         if (
             t.validate(_consume_keyword(c, 'import'))
-            and t.validate(targets := _expect_rule(c, rn.IMPORT_FROM_TARGETS))
+            and t.validate(targets := (yield from parser.expect(c, rn.IMPORT_FROM_TARGETS)))
             and isinstance(targets, syntax.TermList)
         ):
             names = [cast('AliasTerm', term).alias for term in targets.terms]
@@ -1944,89 +1849,66 @@ def _parse_import_from(c: Cursor) -> syntax.Term:
     return t.fail()
 
 
-def _parse_import_from_targets__parens(c: Cursor) -> syntax.Term:
+@parser.starts_with('(')
+def _parse_import_from_targets__parens(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    if t.validate(_consume_punct(c, '(')) and t.validate(names := _expect_rule(c, rn.IMPORT_FROM_AS_NAMES)):
-        k = c.clone()
-        if t.validate(_consume_punct(k, ',')):
-            # Allow trailing comma
-            c.copy_position_from(k)
-        if t.validate(_expect_punct(c, ')')):
-            return names
+    if (
+        t.validate(_consume_punct(c, '('))
+        and t.validate(names := (yield from parser.expect(c, rn.IMPORT_FROM_AS_NAMES)))
+        and t.validate((yield from parser.optional(c, _punct(','))))
+        and t.validate(_expect_punct(c, ')'))
+    ):
+        return names
     return t.fail()
 
 
-def _parse_import_from_targets__plain(c: Cursor) -> syntax.Term:
+def _parse_import_from_targets__plain(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    if t.validate(names := c.consume_rule(rn.IMPORT_FROM_AS_NAMES)):
-        k = c.clone()
-        if t.validate(_consume_punct(k, ',')):
-            # Allow trailing comma
-            c.copy_position_from(k)
+    if t.validate(names := (yield c.request_rule(rn.IMPORT_FROM_AS_NAMES))) and t.validate(
+        (yield from parser.optional(c, _punct(',')))
+    ):
         return names
     return t.fail()
 
 
-def _parse_import_from_as_names(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    names = []
-    if t.validate(first := c.consume_rule(rn.IMPORT_FROM_AS_NAME)):
-        names.append(first)
-        k = c.clone()
-        while t.validate(_consume_punct(k, ',')) and t.validate(next_name := k.consume_rule(rn.IMPORT_FROM_AS_NAME)):
-            c.copy_position_from(k)
-            names.append(next_name)
-        return t.captured_error or syntax.TermList(terms=names)
-    return t.fail()
+def _parse_import_from_as_names(c: Cursor) -> parser.ParseGenerator:
+    return (yield from parser.sep_by(c, rn.IMPORT_FROM_AS_NAME, _punct(','), min_count=1))
 
 
-def _parse_import_from_as_name(c: Cursor) -> syntax.Term:
+@parser.starts_with(_NAME)
+def _parse_import_from_as_name(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    if t.validate(name := _consume_name(c)):
-        k = c.clone()
-        asname = None
-        if t.validate(_consume_keyword(k, 'as')) and t.validate(alias := _expect_name(k)):
-            c.copy_position_from(k)
-            asname = cast('TokenName', alias).value
+    if t.validate(name := _consume_name(c)) and t.validate(alias := (yield from parser.optional(c, _scan_alias))):
         return AliasTerm(
             alias=terms.Alias(
                 name=cast('TokenName', name).value,
-                asname=asname,
+                asname=cast('TokenName', alias).value if alias is not syntax.Empty else None,
             )
         )
     return t.fail()
 
 
-def _parse_dotted_as_names(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    names = []
-    if t.validate(first_name := c.consume_rule(rn.DOTTED_AS_NAME)):
-        names.append(first_name)
-        k = c.clone()
-        while t.validate(_consume_punct(k, ',')) and t.validate(next_name := k.consume_rule(rn.DOTTED_AS_NAME)):
-            c.copy_position_from(k)
-            names.append(next_name)
-        return t.captured_error or syntax.TermList(terms=names)
-    return t.fail()
+def _parse_dotted_as_names(c: Cursor) -> parser.ParseGenerator:
+    return (yield from parser.sep_by(c, rn.DOTTED_AS_NAME, _punct(','), min_count=1))
 
 
-def _parse_dotted_as_name(c: Cursor) -> syntax.Term:
+def _parse_dotted_as_name(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    if t.validate(dotted_name := c.consume_rule(rn.DOTTED_NAME)) and isinstance(dotted_name, TokenName):
-        k = c.clone()
-        asname = None
-        if t.validate(_consume_keyword(k, 'as')) and t.validate(alias := _expect_name(k)):
-            c.copy_position_from(k)
-            asname = cast('TokenName', alias).value
+    if (
+        t.validate(dotted_name := (yield c.request_rule(rn.DOTTED_NAME)))
+        and isinstance(dotted_name, TokenName)
+        and t.validate(alias := (yield from parser.optional(c, _scan_alias)))
+    ):
         return AliasTerm(
             alias=terms.Alias(
                 name=dotted_name.value,
-                asname=asname,
+                asname=cast('TokenName', alias).value if alias is not syntax.Empty else None,
             )
         )
     return t.fail()
 
 
+@parser.starts_with(_NAME)
 def _parse_dotted_name__single(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
     if t.validate(name := _consume_name(c)):
@@ -2034,23 +1916,29 @@ def _parse_dotted_name__single(c: Cursor) -> syntax.Term:
     return t.fail()
 
 
-def _parse_dotted_name__nested(c: Cursor) -> syntax.Term:
+@parser.starts_with(_NAME)
+def _parse_dotted_name__nested(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    names = []
-    if t.validate(first_name := _consume_name(c)):
-        names.append(first_name)
-        k = c.clone()
-        while t.validate(_consume_punct(k, '.')) and t.validate(next_name := _expect_name(k)):
-            c.copy_position_from(k)
-            names.append(next_name)
+    if t.validate(first_name := _consume_name(c)) and t.validate(
+        next_names := (yield from parser.many(c, _scan_dotted_name_part))
+    ):
+        names = [first_name, *cast('syntax.TermList', next_names).terms]
         return TokenName(location=t.location, value='.'.join(cast('TokenName', n).value for n in names))
     return t.fail()
 
 
+def _scan_dotted_name_part(c: Cursor) -> syntax.Term:
+    t = c.start_tracker()
+    if t.validate(_consume_punct(c, '.')) and t.validate(name := _expect_name(c)):
+        return name
+    return t.fail()
+
+
+@parser.starts_with('class')
 def _parse_class_def(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
     if (
-        t.validate(_consume_keyword(c, 'class'))
+        t.validate(_consume_statement_keyword(c, 'class'))
         and t.validate(class_name := _expect_name(c))
         and t.validate(_expect_punct(c, ':'))
     ):
@@ -2073,94 +1961,94 @@ def _parse_start(c: Cursor) -> syntax.Term:
     return t.fail()
 
 
-def _parse_star_targets__single(c: Cursor) -> syntax.Term:
+def _parse_star_targets__single(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    if t.validate(target := c.consume_rule(rn.STAR_TARGET)) and not t.validate(_consume_punct(c.clone(), ',')):
+    if t.validate(target := (yield c.request_rule(rn.STAR_TARGET))) and t.validate(
+        (yield from parser.not_followed_by(c, _punct(',')))
+    ):
         return target
     return t.fail()
 
 
-def _parse_star_targets__multi(c: Cursor) -> syntax.Term:
+def _parse_star_targets__multi(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    targets = []
-    if t.validate(first_target := c.consume_rule(rn.STAR_TARGET)):
-        targets.append(first_target)
-        k = c.clone()
-        while t.validate(_consume_punct(k, ',')) and t.validate(next_target := k.consume_rule(rn.STAR_TARGET)):
-            c.copy_position_from(k)
-            targets.append(next_target)
-        k = c.clone()
-        if t.validate(_consume_punct(k, ',')):
-            # Allow trailing comma
-            c.copy_position_from(k)
-        return t.captured_error or terms.Tuple(location=t.location, elements=targets, ctx='store')
+    if t.validate(targets := (yield from parser.sep_by(c, rn.STAR_TARGET, _punct(','), min_count=1, trailing=True))):
+        return c.build(terms.Tuple, location=t.location, elements=cast('syntax.TermList', targets).terms, ctx='store')
     return t.fail()
 
 
+@parser.starts_with(_NAME)
 def _parse_star_atom__name_store(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
     if t.validate(token := c.consume_rule(rn.TOKEN)) and isinstance(token, TokenName):
-        return terms.TypedName(location=token.location, id=token.value, ctx='store', mode=c.config.mode)
+        return c.build(terms.TypedName, location=token.location, id=token.value, ctx='store', mode=c.config.mode)
     return t.fail()
 
 
-def _parse_target_with_star_atom__attribute(c: Cursor) -> syntax.Term:
+def _parse_target_with_star_atom__attribute(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
-        t.validate(target := c.consume_rule(rn.T_PRIMARY))
+        t.validate(target := (yield c.request_rule(rn.T_PRIMARY)))
         and t.validate(_consume_punct(c, '.'))
         and t.validate(name := _expect_name(c))
-        and not t.validate(c.clone().consume_rule(rn.T_LOOKAHEAD))
+        and t.validate((yield from parser.not_followed_by(c, rn.T_LOOKAHEAD)))
     ):
-        return terms.Attribute(value=target, attr=cast('TokenName', name).value, ctx='store', location=t.location)
+        return c.build(
+            terms.Attribute, value=target, attr=cast('TokenName', name).value, ctx='store', location=t.location
+        )
     return t.fail()
 
 
-def _parse_target_with_star_atom__slices(c: Cursor) -> syntax.Term:
+def _parse_target_with_star_atom__slices(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
-        t.validate(value := c.consume_rule(rn.T_PRIMARY))
+        t.validate(value := (yield c.request_rule(rn.T_PRIMARY)))
         and t.validate(_consume_punct(c, '['))
-        and t.validate(slices := c.consume_rule(rn.SLICES))
+        and t.validate(slices := (yield c.request_rule(rn.SLICES)))
         and t.validate(_expect_punct(c, ']'))
-        and not t.validate(c.clone().consume_rule(rn.T_LOOKAHEAD))
+        and t.validate((yield from parser.not_followed_by(c, rn.T_LOOKAHEAD)))
     ):
-        return terms.Subscript(value=value, slice=slices, ctx='load', location=t.location)
+        return c.build(terms.Subscript, value=value, slice=slices, ctx='load', location=t.location)
     return t.fail()
 
 
-def _parse_t_primary__attribute(c: Cursor) -> syntax.Term:
+def _parse_t_primary__attribute(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
-        t.validate(value := c.consume_rule(rn.T_PRIMARY))
+        t.validate(value := (yield c.request_rule(rn.T_PRIMARY)))
         and t.validate(_consume_punct(c, '.'))
         and t.validate(name := _expect_name(c))
-        and t.validate(c.clone().consume_rule(rn.T_LOOKAHEAD))
+        and t.validate((yield from parser.lookahead(c, rn.T_LOOKAHEAD)))
     ):
-        return terms.Attribute(value=value, attr=cast('TokenName', name).value, ctx='load', location=t.location)
+        return c.build(
+            terms.Attribute, value=value, attr=cast('TokenName', name).value, ctx='load', location=t.location
+        )
     return t.fail()
 
 
-def _parse_t_primary__slices(c: Cursor) -> syntax.Term:
+def _parse_t_primary__slices(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
-        t.validate(value := c.consume_rule(rn.T_PRIMARY))
+        t.validate(value := (yield c.request_rule(rn.T_PRIMARY)))
         and t.validate(_consume_punct(c, '['))
-        and t.validate(slices := c.consume_rule(rn.SLICES))
+        and t.validate(slices := (yield c.request_rule(rn.SLICES)))
         and t.validate(_expect_punct(c, ']'))
-        and t.validate(c.clone().consume_rule(rn.T_LOOKAHEAD))
+        and t.validate((yield from parser.lookahead(c, rn.T_LOOKAHEAD)))
     ):
-        return terms.Subscript(value=value, slice=slices, ctx='load', location=t.location)
+        return c.build(terms.Subscript, value=value, slice=slices, ctx='load', location=t.location)
     return t.fail()
 
 
-def _parse_t_primary__atom(c: Cursor) -> syntax.Term:
+def _parse_t_primary__atom(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
-    if t.validate(atom := c.consume_rule(rn.ATOM)) and t.validate(c.clone().consume_rule(rn.T_LOOKAHEAD)):
+    if t.validate(atom := (yield c.request_rule(rn.ATOM))) and t.validate(
+        (yield from parser.lookahead(c, rn.T_LOOKAHEAD))
+    ):
         return atom
     return t.fail()
 
 
+@parser.starts_with('(', '[', '.')
 def _parse_t_lookahead(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
     if t.validate(term := _consume_punct(c, '(', '[', '.')):
@@ -2168,50 +2056,40 @@ def _parse_t_lookahead(c: Cursor) -> syntax.Term:
     return t.fail()
 
 
-def _parse_del_targets(c: Cursor) -> syntax.Term:
-    t = c.start_tracker()
-    targets = []
-    if t.validate(first_target := c.consume_rule(rn.DEL_TARGET)):
-        targets.append(first_target)
-        k = c.clone()
-        while t.validate(_consume_punct(k, ',')) and t.validate(next_target := k.consume_rule(rn.DEL_TARGET)):
-            c.copy_position_from(k)
-            targets.append(next_target)
-        k = c.clone()
-        if t.validate(_consume_punct(k, ',')):
-            # Allow trailing comma
-            c.copy_position_from(k)
-        return t.captured_error or syntax.TermList(terms=targets)
-    return t.fail()
+def _parse_del_targets(c: Cursor) -> parser.ParseGenerator:
+    return (yield from parser.sep_by(c, rn.DEL_TARGET, _punct(','), min_count=1, trailing=True))
 
 
-def _parse_del_target__attribute(c: Cursor) -> syntax.Term:
+def _parse_del_target__attribute(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
-        t.validate(target := c.consume_rule(rn.T_PRIMARY))
+        t.validate(target := (yield c.request_rule(rn.T_PRIMARY)))
         and t.validate(_consume_punct(c, '.'))
         and t.validate(name := _expect_name(c))
-        and not t.validate(c.clone().consume_rule(rn.T_LOOKAHEAD))
+        and t.validate((yield from parser.not_followed_by(c, rn.T_LOOKAHEAD)))
     ):
-        return terms.Attribute(value=target, attr=cast('TokenName', name).value, ctx='delete', location=t.location)
+        return c.build(
+            terms.Attribute, value=target, attr=cast('TokenName', name).value, ctx='delete', location=t.location
+        )
     return t.fail()
 
 
-def _parse_del_target__slices(c: Cursor) -> syntax.Term:
+def _parse_del_target__slices(c: Cursor) -> parser.ParseGenerator:
     t = c.start_tracker()
     if (
-        t.validate(value := c.consume_rule(rn.T_PRIMARY))
+        t.validate(value := (yield c.request_rule(rn.T_PRIMARY)))
         and t.validate(_consume_punct(c, '['))
-        and t.validate(slices := c.consume_rule(rn.SLICES))
+        and t.validate(slices := (yield c.request_rule(rn.SLICES)))
         and t.validate(_expect_punct(c, ']'))
-        and not t.validate(c.clone().consume_rule(rn.T_LOOKAHEAD))
+        and t.validate((yield from parser.not_followed_by(c, rn.T_LOOKAHEAD)))
     ):
-        return terms.Subscript(value=value, slice=slices, ctx='delete', location=t.location)
+        return c.build(terms.Subscript, value=value, slice=slices, ctx='delete', location=t.location)
     return t.fail()
 
 
+@parser.starts_with(_NAME)
 def _parse_del_t_atom__name_delete(c: Cursor) -> syntax.Term:
     t = c.start_tracker()
     if t.validate(token := c.consume_rule(rn.TOKEN)) and isinstance(token, TokenName):
-        return terms.TypedName(location=token.location, id=token.value, ctx='delete', mode=c.config.mode)
+        return c.build(terms.TypedName, location=token.location, id=token.value, ctx='delete', mode=c.config.mode)
     return t.fail()
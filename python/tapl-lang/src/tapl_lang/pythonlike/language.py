@@ -14,7 +14,9 @@ GRAMMAR = pythonlike_grammar.get_grammar()
 
 
 class PythonlikeLanguage(Language):
-    def get_grammar(self, parent_stack: list[syntax.Term]) -> parser.Grammar:
+    grammar_depends_on_parents = False
+
+    def get_grammar(self, parent_stack: list[syntax.Term]) -> parser.CompiledGrammar:
         del parent_stack
         return GRAMMAR
 
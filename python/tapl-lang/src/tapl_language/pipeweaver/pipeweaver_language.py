@@ -33,9 +33,17 @@ def _parse_pipe_call(c: parser.Cursor) -> syntax.Term:
     return t.fail()
 
 
+def extend_grammar(base: parser.CompiledGrammar) -> parser.CompiledGrammar:
+    grammar = base.clone()
+    grammar.rule_map[rule_names.TOKEN] = [_parse_pipe_token, *grammar.rule_map[rule_names.TOKEN]]
+    grammar.rule_map[rule_names.EXPRESSION] = [_parse_pipe_call, *grammar.rule_map[rule_names.EXPRESSION]]
+    return grammar.compile()
+
+
+GRAMMAR = extend_grammar(language.GRAMMAR)
+
+
 class PipeweaverLanguage(language.PythonlikeLanguage):
-    def get_grammar(self, parent_stack: list[syntax.Term]) -> parser.Grammar:
-        grammar = super().get_grammar(parent_stack).clone()
-        grammar.rule_map[rule_names.TOKEN] = [_parse_pipe_token, *grammar.rule_map[rule_names.TOKEN]]
-        grammar.rule_map[rule_names.EXPRESSION] = [_parse_pipe_call, *grammar.rule_map[rule_names.EXPRESSION]]
-        return grammar
+    def get_grammar(self, parent_stack: list[syntax.Term]) -> parser.CompiledGrammar:
+        del parent_stack
+        return GRAMMAR
@@ -0,0 +1,23 @@
+# Part of the Tapl Language project, under the Apache License v2.0 with LLVM
+# Exceptions. See /LICENSE for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+import pytest
+
+from tapl_lang.cli import tapl
+
+
+def test_grammar_stats(capsys):
+    tapl.main(['grammar-stats', 'pythonlike'])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == 'rules: 253'
+    assert '  pythonlike.match_stmt' in lines[lines.index('empty rules: 178') :]
+    left_recursive = lines[lines.index('left recursive rules: 19') :]
+    assert '  pythonlike.primary' in left_recursive
+    assert '  pythonlike.statement' not in left_recursive
+
+
+def test_profile_with_jobs(capsys):
+    with pytest.raises(SystemExit):
+        tapl.main(['hello.tapl', '--profile', 'profile.json', '--jobs', '2'])
+    assert '--profile cannot be used with --jobs greater than 1' in capsys.readouterr().err
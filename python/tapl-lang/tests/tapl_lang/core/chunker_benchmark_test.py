@@ -0,0 +1,51 @@
+# Part of the Tapl Language project, under the Apache License v2.0 with LLVM
+# Exceptions. See /LICENSE for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+# Benchmarks measure the chunking cost as the number of reads of line indentations, which is deterministic.
+
+from __future__ import annotations
+
+from tapl_lang.core import chunker, line_record
+
+
+class CountingLineRecord(line_record.LineRecord):
+    reads = 0
+
+    @property  # type: ignore[override]
+    def indent(self) -> int | None:
+        CountingLineRecord.reads += 1
+        return self._indent
+
+    @indent.setter
+    def indent(self, value: int | None) -> None:
+        self._indent = value
+
+
+def nested_blocks(depth: int, line_count: int) -> str:
+    lines: list[str] = []
+    while len(lines) < line_count:
+        for level in range(depth):
+            lines.append('    ' * level + f'if x{level}:')
+            lines.append('    ' * (level + 1) + f'y = {level}')
+        lines.extend('    ' * (level + 1) + f'z = {level}' for level in reversed(range(depth)))
+    return '\n'.join(lines) + '\n'
+
+
+def chunk_cost(depth: int, line_count: int) -> tuple[list[chunker.Chunk], float]:
+    text_lines = nested_blocks(depth, line_count).splitlines(keepends=True)
+    line_records: list[line_record.LineRecord] = [CountingLineRecord(i + 1, text) for i, text in enumerate(text_lines)]
+    CountingLineRecord.reads = 0
+    chunks = chunker.Chunker().decode_chunks(line_records)
+    return chunks, CountingLineRecord.reads / len(line_records)
+
+
+def test_deep_nesting_is_linear():
+    chunks, cost = chunk_cost(20, 100_000)
+    depth = 0
+    while chunks:
+        depth += 1
+        chunks = next((chunk.children for chunk in chunks if chunk.children), [])
+    assert depth == 21
+    # The indentation of each line is read once, whatever the nesting depth.
+    assert cost == 1
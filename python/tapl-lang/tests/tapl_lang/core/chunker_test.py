@@ -3,7 +3,11 @@
 # SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
 
 
-from tapl_lang.core import chunker
+import io
+
+import pytest
+
+from tapl_lang.core import chunker, line_record, tapl_error
 from tapl_lang.dev import chunk_dumper
 
 
@@ -106,3 +110,39 @@ def compute_next(n):
 7:4  |    return 3 * n + 1
 """,
     )
+
+
+def test_chunks_are_views_of_the_line_records():
+    line_records = line_record.split_text_to_lines('a:\n  b\n\n  c:\n    d\ne\n')
+    chunks = chunker.Chunker().decode_chunks(line_records)
+    a, e = chunks
+    b, c = a.children
+    (d,) = c.children
+    assert all(chunk.records is line_records for chunk in [a, b, c, d, e])
+    assert [(chunk.start, chunk.end) for chunk in [a, b, c, d, e]] == [(0, 1), (1, 3), (3, 4), (4, 5), (5, 6)]
+    assert [line.text for line in b.line_records()] == ['  b\n', '\n']
+
+
+def test_first_line_indent():
+    for text in ['  a\nb', 'a:\n    b\n  c', 'a:\n  b:\n      c\n    d\n e']:
+        with pytest.raises(tapl_error.TaplError, match=r'First line should have the same indent as the given indent\.'):
+            chunker.chunk_text(text)
+
+
+def test_chunk_stream():
+    text = 'a:\n  b\n\n# comment\n  c:\n    d\ne\nf:\n  g\n'
+    read_lines: list[str] = []
+
+    def lines():
+        for line in io.StringIO(text):
+            read_lines.append(line)
+            yield line
+
+    stream = chunker.chunk_stream(lines())
+    first = next(stream)
+    # The first chunk is closed by the line of the second one.
+    assert read_lines[-1] == 'e\n'
+    chunks = [first, *stream]
+    assert chunk_dumper.get_dump(chunks) == chunk_dumper.get_dump(chunker.chunk_text(text))
+    with pytest.raises(tapl_error.TaplError, match=r'First line should have the same indent as the given indent\.'):
+        list(chunker.chunk_stream(io.StringIO('  a\nb\n')))
@@ -2,7 +2,14 @@
 # Exceptions. See /LICENSE for license information.
 # SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
 
-from tapl_lang.core.line_record import LineRecord, split_text_to_lines
+import pytest
+
+from tapl_lang.core.line_record import (
+    LineRecord,
+    LineStore,
+    LineTable,
+    split_text_to_lines,
+)
 
 
 def test_empty_line1():
@@ -34,3 +41,36 @@ World
     assert len(lines) == 2
     assert lines[0].text == 'Hello\n'
     assert lines[1].text == 'World'
+
+
+def test_line_table():
+    table = LineTable(split_text_to_lines('ab\n# comment\ncd'))
+    assert table.row_col(1) == (0, 1)
+    assert table.row_col(3) == (1, 0)
+    assert table.row_col(5) == (2, 0)
+    assert table.line_column(3) == (3, 0)
+    assert table.line_column(5) == (3, 2)
+
+
+def test_line_store():
+    text = 'a:\r\n  # comment\n\n  b \x0c  c\n'
+    store = LineStore(text)
+    assert len(store) == 4
+    assert list(store.line_numbers) == [1, 3, 4, 5]
+    assert list(store.indents) == [0, -1, 2, 2]
+    # The records are the same as the ones created from the text of each line.
+    expected = [LineRecord(i + 1, line) for i, line in enumerate(text.splitlines(keepends=True)) if i != 1]
+    assert [repr(line) for line in store] == [repr(line) for line in expected]
+    assert repr(store[-1]) == repr(expected[-1])
+    assert [line.text for line in store[1:3]] == ['\n', '  b \x0c']
+    with pytest.raises(IndexError):
+        store[4]
+    assert len(LineStore('')) == 0
+
+
+def test_line_store_of_encoded_text():
+    text = 'é:\n  # comment\u3000\n  b = "ü"\u2028c\x1e'
+    store = LineStore(text.encode())
+    # The offsets are byte offsets, and the lines are decoded when they are read.
+    assert list(store.starts) == [0, 19, 32]
+    assert [repr(line) for line in store] == [repr(line) for line in split_text_to_lines(text)]
@@ -4,11 +4,19 @@
 
 from __future__ import annotations
 
+import functools
+import operator
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, cast
 
-from tapl_lang.core import parser, syntax
+import pytest
+
+from tapl_lang.core import chunker, line_record, parser, syntax
+from tapl_lang.core.language import ParseSession
 from tapl_lang.core.syntax import Location, Position, Term
+from tapl_lang.core.tapl_error import TaplError
+from tapl_lang.lib import terms
+from tapl_lang.pythonlike.language import PythonlikeLanguage
 
 if TYPE_CHECKING:
     from tapl_lang.core.parser import Cursor
@@ -165,8 +173,11 @@ def parse_none(c: Cursor):
 # sum     <- sum '+' product / product
 # expr    <- sum
 
+# The rule which lexes the text into tokens, for the grammars parsing with a token rule.
+TOKEN = 'token'
+
 RULES: parser.GrammarRuleMap = {
-    'token': [parse_token],
+    TOKEN: [parse_token],
     'value': [parse_value__expr, parse_value__number, parse_value__error],
     'product': [parse_product__binop, 'value'],
     'sum': [parse_sum__binop, 'product'],
@@ -184,6 +195,8 @@ def parse(text: str, *, debug: bool = False) -> syntax.Term:
 def dump(term: Term | None) -> str:
     if isinstance(term, Number):
         return f'N{term.value}'
+    if isinstance(term, Punct):
+        return f'P{term.value}'
     if isinstance(term, BinOp):
         left = dump(term.left)
         right = dump(term.right)
@@ -249,6 +262,28 @@ def test_multiline():
     assert dump(parsed_term) == 'B(B(N2+N3)*N4)'
 
 
+def test_location_span():
+    location = parse(' ( 2 \n + 3 ) * \n  4      ').left.location
+    # Only the span of offsets is kept until the positions are read.
+    assert location.line_table is not None
+    assert location.span == (2 << syntax.SPAN_SHIFT) | 10
+    assert repr(location) == '(1:2,2:4)'
+    assert location.line_table is None
+    assert location == Location(start=Position(line=1, column=2), end=Position(line=2, column=4))
+
+
+def test_deferred_error_message():
+    found = Punct(location=Location(start=Position(line=1, column=0)), value='+')
+    error = syntax.ErrorTerm(message='Expected "{}", but found {}', message_args=('(', found))
+    # The message is rendered on the first read only.
+    assert error.message_args
+    assert error.message == 'Expected "(", but found Punct(location=(1:0,-), value=\'+\')'
+    assert not error.message_args
+    assert error == syntax.ErrorTerm(message=error.message)
+    with pytest.raises(TaplError, match=r'FailureTerm is shared and cannot be modified\.'):
+        parser.ParseFailed.recovered = True
+
+
 def test_empty_text():
     parsed_term = parse('')
     assert isinstance(parsed_term, syntax.ErrorTerm)
@@ -280,3 +315,413 @@ def test_error_syntax():
     parsed_term = parse('2 + (3')
     assert isinstance(parsed_term, syntax.ErrorTerm)
     assert parsed_term.message == 'Expected ")", but found EndOfText'
+
+
+def test_compile_grammar():
+    compiled = parser.Grammar(RULES, 'start').compile()
+    assert compiled.rule_names[compiled.start_rule_id] == 'start'
+    assert compiled.rule_names[compiled.rule_ids['expr']] == 'expr'
+    # String aliases are resolved to the ids of their target rules.
+    assert compiled.rules[compiled.rule_ids['expr']] == (compiled.rule_ids['sum'],)
+    assert compiled.rules[compiled.rule_ids['not_found_rule']] == ()
+    assert dump(parser.parse_text('2*3+4', compiled)) == 'B(B(N2*N3)+N4)'
+
+
+def test_cell_memo():
+    memo = parser.CellMemo(rule_count=3, offset_count=10)
+    cell = parser.Cell(next_offset=2, growable=False, state=parser.CellState.DONE, term=parser.ParseFailed)
+    memo.put(5, 2, 1, cell)
+    assert memo.get(5, 2, 1) is cell
+    assert memo.get(5, 1, 1) is None
+    assert memo.get(5, 2, 0) is None
+    assert list(memo.items()) == [(5, 2, 1, cell)]
+    assert memo.footprint() > 0
+
+
+def test_cell_memo_eviction():
+    memo = parser.CellMemo(rule_count=3, offset_count=10)
+    memo.set_budget(4)
+    memo.commit(2)
+    for offset, cost in enumerate([5, 1, 9, 2, 3, 7, 4], start=1):
+        cell = parser.Cell(next_offset=offset, growable=False, state=parser.CellState.DONE, term=parser.ParseFailed)
+        cell.cost = cost
+        memo.put(offset, 0, 0, cell)
+    # The cell before the committed offset goes first, then the cheapest cells down to 3/4 of the budget.
+    assert [offset for offset, _, _, _ in memo.items()] == [3, 6, 7]
+    assert (memo.evicted, memo.high_water) == (4, 6)
+
+
+def test_lexed_tokens():
+    compiled = parser.Grammar(RULES, 'start', token_rule=TOKEN).compile()
+    engine = parser.PegEngine(line_record.split_text_to_lines(' 2 * (3+4)'), compiled)
+    tokens = engine.lex(parser.Config(mode=terms.MODE_SAFE))
+    assert [dump(t) for t in tokens.terms] == ['N2', 'P*', 'P(', 'N3', 'P+', 'N4', 'P)', 'EndOfText']
+    assert list(tokens.starts) == [0, 2, 4, 6, 7, 8, 9, 10]
+    assert list(tokens.ends) == [2, 4, 6, 7, 8, 9, 10, 10]
+    assert dump(parser.parse_text(' 2 * (3+4)', compiled)) == 'B(N2*B(N3+N4))'
+    assert parser.parse_text('(1', compiled).message == 'Expected ")", but found EndOfText'
+
+
+def scan_operator(c: Cursor) -> str | None:
+    term = c.consume_rule('token')
+    return term.value if isinstance(term, Punct) else None
+
+
+def create_binop(c: Cursor, operators: list[str], operands: list[Term], location: Location) -> Term:
+    del c
+    return BinOp(location, operands[0], operators[0], operands[1])
+
+
+def test_operator_tower():
+    tower = parser.OperatorTower(
+        [
+            parser.OperatorLevel('sum', parser.OperatorKind.LEFT, ('+',), create_binop),
+            parser.OperatorLevel('product', parser.OperatorKind.LEFT, ('*',), create_binop),
+        ],
+        operand_rule='value',
+        scan_operator=scan_operator,
+    )
+    rules = {**RULES, 'sum': [tower.parse_function('sum')], 'product': [tower.parse_function('product')]}
+    grammar = parser.Grammar(rules, 'start', token_rule=TOKEN)
+    assert dump(parser.parse_text('1+2*3+4', grammar)) == 'B(B(N1+B(N2*N3))+N4)'
+    assert dump(parser.parse_text('(1+2)*3', grammar)) == 'B(B(N1+N2)*N3)'
+    assert parser.parse_text('1+', grammar).message == 'Expected number'
+
+
+def parse_chain__plus(c: Cursor) -> syntax.Term:
+    t = c.start_tracker()
+    if (
+        t.validate(left := c.consume_rule('chain'))
+        and t.validate(consume_punct(c, '+'))
+        and t.validate(right := expect_rule(c, 'value'))
+    ):
+        return BinOp(t.location, left, '+', right)
+    return t.fail()
+
+
+def test_left_recursion__long_chain():
+    text = '+'.join(str(i) for i in range(1, 21))
+    expected = 'N1'
+    for i in range(2, 21):
+        expected = f'B({expected}+N{i})'
+    assert dump(parse(text)).count('+') == 19
+    # The recursion goes through another rule: chain <- chain_plus / value, chain_plus <- chain '+' value
+    rules = {**RULES, 'chain': ['chain_plus', 'value'], 'chain_plus': [parse_chain__plus], 'expr': ['chain']}
+    assert dump(parser.parse_text(text, parser.Grammar(rules, 'start'))) == expected
+
+
+def test_parse_profile():
+    grammar = parser.Grammar(RULES, 'start').compile()
+    profile = parser.ParseProfile()
+    for text in ['1+2*3', '4*(5+6)']:
+        assert not isinstance(parser.parse_text(text, grammar, profile=profile), syntax.ErrorTerm)
+    rules = profile.rules()
+    assert rules['start'].applications == 2
+    assert rules['sum'].growth_iterations > 0
+    assert rules['product'].memo_hits > 0
+    assert rules['start'].cumulative_ns >= rules['sum'].cumulative_ns > 0
+    number = profile.alternatives()['value', '@parse_value__number']
+    assert (number.calls, number.successes, number.failures, number.errors) == (6, 6, 0, 0)
+    assert set(profile.to_dict()['rules']['value']['alternatives']) == {'@parse_value__expr', '@parse_value__number'}
+    stacks = [line.rsplit(' ', 1)[0] for line in profile.to_folded_stacks().splitlines()]
+    assert 'start' in stacks
+    assert 'start;expr;sum;product;product;value;expr;sum;product;value' in stacks
+
+
+def test_memo_budget():
+    text = '+'.join(f'({i}*{i + 1})' for i in range(50))
+    grammar = parser.Grammar(RULES, 'start').compile()
+    unbounded, bounded = parser.ParseProfile(), parser.ParseProfile()
+    expected = dump(parser.parse_text(text, grammar, profile=unbounded))
+    assert dump(parser.parse_text(text, grammar, profile=bounded, memo_budget=16)) == expected
+    assert unbounded.to_dict()['memo']['evicted_cells'] == 0
+    assert bounded.to_dict()['memo']['evicted_cells'] > 0
+    high_water = bounded.to_dict()['memo']['retained_cells_high_water']
+    assert high_water < unbounded.to_dict()['memo']['retained_cells_high_water']
+
+
+def test_parse_budget():
+    grammar = parser.Grammar(RULES, 'start').compile()
+    text = '+'.join(['((1*2)+3)'] * 50)
+    assert dump(parser.parse_text(text, grammar, budget=parser.ParseBudget(max_steps=10_000))).count('+') == 99
+    error = parser.parse_text(text, grammar, budget=parser.ParseBudget(max_steps=100))
+    assert isinstance(error, syntax.ErrorTerm)
+    assert error.message.startswith('Parse budget exceeded after 100 rule applications in ')
+    assert error.message.endswith('the hottest rule is "value".')
+    assert error.location is not None
+    assert error.location.start.column > 0
+    error = parser.parse_text(text, grammar, budget=parser.ParseBudget(max_seconds=0))
+    assert error.message.startswith(f'Parse budget exceeded after {parser.BUDGET_CHECK_INTERVAL} rule applications')
+
+
+def parse_pythonlike_module(text: str, session: ParseSession | None, budget: parser.ParseBudget | None) -> list[Term]:
+    pythonlike = PythonlikeLanguage()
+    module = terms.Module(body=[syntax.TermList(terms=[], is_placeholder=True)])
+    if session is None:
+        pythonlike.parse_chunks(chunker.chunk_text(text), [module], budget=budget)
+    else:
+        session.parse_chunks(pythonlike, chunker.chunk_text(text), [module], budget=budget)
+    return cast('syntax.TermList', module.body[0]).terms
+
+
+def test_parse_budget__chunks():
+    text = 'a = 1\nb = ' + ' + '.join(f'f{i}(x)[{i}]' for i in range(2000)) + '\nc = 2\n'
+    # The short chunks parse before the wall time is checked.
+    for budget, steps in [
+        (parser.ParseBudget(max_steps=5000), 5000),
+        (parser.ParseBudget(max_seconds=0), parser.BUDGET_CHECK_INTERVAL),
+    ]:
+        for session in [None, ParseSession()]:
+            first, second, third = parse_pythonlike_module(text, session, budget)
+            assert isinstance(first, terms.Assign)
+            assert isinstance(second, syntax.ErrorTerm)
+            assert second.message.startswith(f'Parse budget exceeded after {steps} rule applications')
+            assert isinstance(third, terms.Assign)
+    # The chunk which exceeded the budget is not reused by the session.
+    session = ParseSession()
+    parse_pythonlike_module(text, session, parser.ParseBudget(max_steps=5000))
+    assert isinstance(parse_pythonlike_module(text, session, None)[1], terms.Assign)
+    assert (session.parsed_chunks, session.reused_chunks) == (1, 2)
+
+
+def test_strict_engine():
+    grammar = parser.Grammar(RULES, 'start').compile()
+    for text in ['1+2*3', '4*(5+6)', '2 + (3']:
+        assert dump(parser.parse_text(text, grammar, strict=True)) == dump(parser.parse_text(text, grammar))
+    # Exceptions are reported once for the whole chunk, naming the innermost rule being evaluated.
+    error = parser.parse_text('1', parser.Grammar(RULES, 'none'), strict=True)
+    assert error.message == 'PegEngine: rule=none error=@parse_none returned None.'
+    error = parser.parse_text('1', parser.Grammar(RULES, 'route_error'), strict=True)
+    assert error.message == 'PegEngine: rule=not_found_rule error=Rule "not_found_rule" is not defined in the Grammar.'
+    with pytest.raises(TaplError, match='The parse options profile, strict select different engines'):
+        parser.parse_text('1', grammar, profile=parser.ParseProfile(), strict=True)
+    # The rule calls and the call stack limit are restored once the exception propagated.
+    engine = parser.StrictPegEngine(line_record.split_text_to_lines('1'), parser.Grammar(RULES, 'none').compile())
+    error, _ = engine.parse(parser.Config(mode=terms.MODE_EVALUATE))
+    assert isinstance(error, syntax.ErrorTerm)
+    assert (engine.rule_calls, engine.rule_call_stack_limit, engine.raised_call) == ([], 1000, None)
+
+
+def parse_value__nested(c: Cursor) -> parser.ParseGenerator:
+    t = c.start_tracker()
+    if (
+        t.validate(consume_punct(c, '('))
+        and t.validate(expr := (yield c.request_rule('expr')))
+        and t.validate(expect_punct(c, ')'))
+    ):
+        return expr
+    return t.fail()
+
+
+def consume_plus(c: Cursor) -> Term:
+    return consume_punct(c, '+')
+
+
+def consume_star(c: Cursor) -> Term:
+    return consume_punct(c, '*')
+
+
+def parse_start__combinators(c: Cursor) -> parser.ParseGenerator:
+    # start <- ('*' value)? (number ('+' number)* '+'?)? !('(' expr ')')
+    t = c.start_tracker()
+    if (
+        t.validate(prefix := (yield from parser.optional(c, parse_star_number)))
+        and t.validate(numbers := (yield from parser.sep_by(c, consume_number, consume_plus, trailing=True)))
+        and t.validate((yield from parser.not_followed_by(c, parse_value__expr)))
+    ):
+        skip_whitespaces(c)
+        return syntax.TermList([prefix, *cast('syntax.TermList', numbers).terms])
+    return t.fail()
+
+
+def parse_star_number(c: Cursor) -> parser.ParseGenerator:
+    t = c.start_tracker()
+    if t.validate(items := (yield from parser.sequence(c, consume_star, 'value'))):
+        return cast('syntax.TermList', items).terms[1]
+    return t.fail()
+
+
+def parse_optional_number(c: Cursor) -> parser.ParseGenerator:
+    return (yield from parser.optional(c, consume_number))
+
+
+def parse_optional_plus(c: Cursor) -> parser.ParseGenerator:
+    return (yield from parser.optional(c, consume_plus))
+
+
+def parse_start__nullable_many(c: Cursor) -> parser.ParseGenerator:
+    # start <- number?*
+    return (yield from parser.many(c, parse_optional_number))
+
+
+def parse_start__nullable_sep_by(c: Cursor) -> parser.ParseGenerator:
+    # start <- number? ('+'? number?)*
+    return (yield from parser.sep_by(c, parse_optional_number, parse_optional_plus))
+
+
+def test_combinators():
+    grammar = parser.Grammar({**RULES, 'start': [parse_start__combinators]}, 'start')
+
+    def parse_numbers(text: str) -> str:
+        term = parser.parse_text(text, grammar)
+        if isinstance(term, syntax.TermList):
+            return ' '.join(dump(t) for t in term.terms)
+        assert isinstance(term, syntax.ErrorTerm)
+        return term.message
+
+    assert parse_numbers('1 + 2 + 3') == 'Empty N1 N2 N3'
+    assert parse_numbers('*4 1+2+') == 'N4 N1 N2'
+    assert parse_numbers('*4') == 'N4'
+    assert parse_numbers('* + 1') == 'Expected number'
+    assert parse_numbers('1 + 2 (3)') == 'Parsing failed: Unable to match any rule.'
+    # A match which does not move the cursor ends the repetition.
+    grammar = parser.Grammar({**RULES, 'start': [parse_start__nullable_many]}, 'start')
+    assert parse_numbers('1 2 3') == 'N1 N2 N3 Empty'
+    grammar = parser.Grammar({**RULES, 'start': [parse_start__nullable_sep_by]}, 'start')
+    assert parse_numbers('1 + 2 +') == 'N1 N2 Empty'
+
+
+class ProductFactory:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, location: Location, left: Term, right: Term) -> Term:
+        self.calls += 1
+        return BinOp(location, left, '*', right)
+
+
+create_product = ProductFactory()
+
+
+# start <- value '*' value ')' / value '*' value
+def parse_start__product_paren(c: Cursor) -> syntax.Term:
+    t = c.start_tracker()
+    if (
+        t.validate(left := c.consume_rule('value'))
+        and t.validate(consume_punct(c, '*'))
+        and t.validate(right := c.consume_rule('value'))
+    ):
+        product = c.build(create_product, t.location, left, right)
+        if t.validate(consume_punct(c, ')')):
+            return product
+    return t.fail()
+
+
+def parse_start__product(c: Cursor) -> syntax.Term:
+    t = c.start_tracker()
+    if (
+        t.validate(left := c.consume_rule('value'))
+        and t.validate(consume_punct(c, '*'))
+        and t.validate(right := c.consume_rule('value'))
+    ):
+        # A match holding another match, which is built first.
+        return c.build(create_product, t.location, left, c.build(create_product, t.location, right, left))
+    return t.fail()
+
+
+def test_deferred_terms():
+    rules = {**RULES, 'start': [parse_start__product_paren, parse_start__product]}
+    for deferred_terms, calls in [(False, 3), (True, 2)]:
+        create_product.calls = 0
+        term = parser.parse_text('2 * 3', parser.Grammar(rules, 'start'), deferred_terms=deferred_terms)
+        assert dump(term) == 'B(N2*B(N3*N2))'
+        # The product of the abandoned alternative is only built eagerly.
+        assert create_product.calls == calls
+
+
+def test_stack_engine__deep_nesting():
+    rules = {**RULES, 'value': [parse_value__nested, parse_value__number, parse_value__error]}
+    grammar = parser.Grammar(rules, 'start').compile()
+    # The recursive engine runs generator parse functions too.
+    assert dump(parser.parse_text('((1+2)*3)', grammar)) == 'B(B(N1+N2)*N3)'
+    text = '(' * 5000 + '1+2' + ')' * 5000
+    assert dump(parser.parse_text(text, grammar, max_nesting=100_000)) == 'B(N1+N2)'
+    assert parser.parse_text(text, grammar, max_nesting=1000).message == 'PEG Parser: Rule nesting limit exceeded.'
+
+
+@parser.references('value')
+def parse_start__computed_rule(c: Cursor) -> syntax.Term:
+    prefix = 'val'
+    return c.consume_rule(f'{prefix}ue')
+
+
+def test_config_ids():
+    grammar = parser.Grammar(RULES, 'start').compile()
+    engine = parser.PegEngine(line_record.split_text_to_lines('1'), grammar)
+    rule = grammar.rule_id('value')
+    safe = parser.Config(mode=terms.MODE_SAFE)
+    typecheck_id = engine.config_id(rule, parser.Config(mode=terms.MODE_TYPECHECK))
+    # Configs with the same mode share their id, found by the identity of the mode once it was interned.
+    assert engine.config_id(rule, safe) == engine.config_id(rule, parser.Config(mode=terms.MODE_SAFE)) != typecheck_id
+    equal_mode = syntax.Layers(layers=[terms.MODE_EVALUATE, terms.MODE_TYPECHECK])
+    assert engine.config_id(rule, parser.Config(mode=equal_mode)) == engine.config_id(rule, safe)
+    assert len(engine.configs) == 2
+
+
+def test_grammar_analysis():
+    rules = {**RULES, 'placeholder': [], 'alias_placeholder': ['placeholder'], 'expr': ['alias_placeholder', 'sum']}
+    grammar = parser.Grammar(rules, 'start').compile()
+    analysis = grammar.analysis
+    assert analysis.empty_rules == {'placeholder', 'alias_placeholder'}
+    # The aliases to empty rules are dropped from the dispatch.
+    assert analysis.dropped_aliases == 2
+    assert grammar.rules[grammar.rule_id('expr')] == (grammar.rule_id('sum'),)
+    assert dump(parser.parse_text('(1+2)*3', grammar)) == 'B(B(N1+N2)*N3)'
+    assert analysis.undefined_rules == {'not_found_rule'}
+    assert analysis.unreachable_rules == {'none', 'route_error', 'not_found_rule', 'placeholder', 'alias_placeholder'}
+    assert analysis.left_recursive_rules == {'value', 'product', 'sum', 'expr'}
+    assert grammar.left_recursive[grammar.rule_id('sum')]
+    assert not grammar.left_recursive[grammar.rule_id('start')]
+    assert 'token' in analysis.nullable_rules
+    assert 'placeholder' not in analysis.nullable_rules
+    assert analysis.opaque_functions == ()
+    # References the analysis cannot find in the code are declared.
+    assert parser.find_references(parse_start, rules) == {'expr'}
+    assert parser.find_references(parse_start__computed_rule, rules) == {'value'}
+    assert parser.find_references(len, rules) is None
+
+
+def parse_binop(c: Cursor, rule: str, op: str) -> syntax.Term:
+    t = c.start_tracker()
+    if (
+        t.validate(left := c.consume_rule(rule))
+        and t.validate(consume_punct(c, op))
+        and t.validate(right := expect_rule(c, rule))
+    ):
+        return BinOp(t.location, left, op, right)
+    return t.fail()
+
+
+class BinOpParser:
+    def __init__(self, rule: str, op: str) -> None:
+        self.rule = rule
+        self.op = op
+
+    def __call__(self, c: Cursor) -> syntax.Term:
+        return parse_binop(c, self.rule, self.op)
+
+
+def parse_total__computed_rule(c: Cursor) -> syntax.Term:
+    prefix = 'tot'
+    return parse_binop(c, f'{prefix}al', '+')
+
+
+def test_grammar_analysis__callables():
+    # The rules applied through partials and callable instances are found, so their left recursion is grown.
+    for parse_sum in [functools.partial(parse_binop, rule='sum', op='+'), BinOpParser('sum', '+')]:
+        grammar = parser.Grammar({**RULES, 'sum': [parse_sum, 'product']}, 'start').compile()
+        assert grammar.left_recursive[grammar.rule_id('sum')]
+        assert dump(parser.parse_text('1+2*3+4', grammar)) == dump(parse('1+2*3+4')) == 'B(N1+B(B(N2*N3)+N4))'
+    # Only the attributes which a bound method reads from its instance are followed.
+    parse_sum = BinOpParser('sum', '+')
+    parse_sum.operand = 'product'  # type: ignore[attr-defined]
+    assert parser.find_references(parse_sum, RULES) == {'sum', 'token'}
+    # A callable whose code cannot be read may apply any rule.
+    assert parser.find_references(operator.itemgetter(0), RULES) is None
+    # A left recursion which the analysis cannot find is reported instead of being parsed wrongly.
+    rules = {'token': [parse_token], 'number': [parse_value__number], 'total': [parse_total__computed_rule, 'number']}
+    grammar = parser.Grammar(rules, 'total').compile()
+    assert not grammar.left_recursive[grammar.rule_id('total')]
+    error = parser.parse_text('1+2', grammar)
+    assert isinstance(error, syntax.ErrorTerm)
+    assert 'Rule "total" is left recursive, but its parse functions do not show it.' in error.message
@@ -24,7 +24,9 @@ def check_parsed_term(parsed: syntax.Term) -> None:
 
 
 def parse_expr(text: str, *, debug=False) -> list[ast.expr]:
-    parsed = parse_text(text, Grammar(grammar.get_grammar().rule_map, rule_names.EXPRESSION), debug=debug)
+    parsed = parse_text(
+        text, Grammar(grammar.get_grammar().rule_map, rule_names.EXPRESSION, rule_names.TOKEN), debug=debug
+    )
     check_parsed_term(parsed)
     safe_term = compiler.make_safe_term(parsed)
     separated = syntax.LayerSeparator(2).build(lambda layer: layer(safe_term))
@@ -212,7 +214,7 @@ def test_var1():
 
 
 def test_term_repr():
-    parsed = parse_text('2+x', Grammar(grammar.get_grammar().rule_map, rule_names.EXPRESSION))
+    parsed = parse_text('2+x', Grammar(grammar.get_grammar().rule_map, rule_names.EXPRESSION, rule_names.TOKEN))
     assert (
         str(parsed)
         == "BinOp(left=IntegerLiteral(value=2, mode=Layers(layers=[ModeTerm(typecheck=False, use_scope=False), ModeTerm(typecheck=True, use_scope=True)]), location=(1:0,1:1)), op='+', right=TypedName(id='x', ctx='load', mode=Layers(layers=[ModeTerm(typecheck=False, use_scope=False), ModeTerm(typecheck=True, use_scope=True)]), location=(1:2,1:3)), location=(1:0,1:3))"
@@ -5,6 +5,7 @@
 from __future__ import annotations
 
 import ast
+import concurrent.futures
 import io
 import os
 import pathlib
@@ -70,8 +71,12 @@ def run_python_files(base_directory: str, filenames: list[str], output_file: str
 
 def run_golden_test(test_name: str, *, use_wrap: bool = False) -> None:
     base_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'goldens')
-    source = pathlib.Path(os.path.join(base_directory, f'{test_name}.tapl')).read_text()
-    layers = compile_tapl(source)
+    source_path = pathlib.Path(os.path.join(base_directory, f'{test_name}.tapl'))
+    layers = compile_tapl(source_path.read_text())
+    # Compiling the lines of the file as they are read, or the memory mapped file, gives the same layers.
+    with source_path.open() as f:
+        assert [ast.unparse(layer) for layer in compile_tapl(f)] == [ast.unparse(layer) for layer in layers]
+    assert [ast.unparse(layer) for layer in compile_tapl(source_path)] == [ast.unparse(layer) for layer in layers]
     filenames = []
 
     for i in reversed(range(len(layers))):
@@ -99,3 +104,13 @@ def test_goldens():
     run_golden_test('system_f')
     run_golden_test('matrix')
     run_golden_test('name_collision')
+
+
+def test_goldens_in_parallel():
+    base_directory = pathlib.Path(os.path.dirname(os.path.abspath(__file__))) / 'goldens'
+    with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+        for source_path in sorted(base_directory.glob('*.tapl')):
+            layers = compile_tapl(source_path, executor=executor)
+            assert [ast.unparse(layer) for layer in layers] == [
+                ast.unparse(layer) for layer in compile_tapl(source_path)
+            ], source_path.name
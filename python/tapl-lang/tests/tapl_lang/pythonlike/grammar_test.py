@@ -3,16 +3,19 @@
 # SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
 
 
-from tapl_lang.core import parser, syntax
+from __future__ import annotations
+
+from tapl_lang.core import line_record, parser, syntax
 from tapl_lang.lib import terms
 from tapl_lang.pythonlike import grammar
 from tapl_lang.pythonlike import rule_names as rn
 
 
 def parse_expr(text: str, start_rule: str, *, mode: syntax.Term = terms.MODE_SAFE, debug=False) -> syntax.Term:
+    compiled = grammar.get_grammar()
     return parser.parse_text(
         text,
-        grammar=parser.Grammar(grammar.get_grammar().rule_map, start_rule),
+        grammar=parser.Grammar(compiled.rule_map, start_rule, token_rule=rn.TOKEN, token_kind=compiled.token_kind),
         debug=debug,
         config=parser.Config(mode=mode),
     )
@@ -495,6 +498,93 @@ def test_t_lookahead():
         assert actual == expected
 
 
+def test_token__kinds():
+    assert parse_expr('  lambda', rn.TOKEN) == grammar.TokenKeyword(location=create_loc(1, 2, 1, 8), value='lambda')
+    assert parse_expr('_x1', rn.TOKEN) == grammar.TokenName(location=create_loc(1, 0, 1, 3), value='_x1')
+    assert parse_expr('42', rn.TOKEN) == grammar.TokenInteger(location=create_loc(1, 0, 1, 2), value=42)
+    assert parse_expr('4.25', rn.TOKEN) == grammar.TokenFloat(location=create_loc(1, 0, 1, 4), value=4.25)
+    assert parse_expr("'a b'", rn.TOKEN) == grammar.TokenString(location=create_loc(1, 0, 1, 5), value='a b')
+    assert parse_expr('//=', rn.TOKEN) == grammar.TokenPunct(location=create_loc(1, 0, 1, 3), value='//=')
+
+
+def test_token__errors():
+    actual = parse_expr('1.', rn.TOKEN)
+    assert actual == syntax.ErrorTerm(message='Invalid float literal', location=create_loc(1, 0, 1, 2))
+    actual = parse_expr('"abc', rn.TOKEN)
+    assert actual == syntax.ErrorTerm(
+        message='unterminated string literal (detected at line 1); perhaps you escaped the end quote?',
+        location=create_loc(1, 0, 1, 4),
+    )
+
+
+def test_first_set_prediction():
+    compiled = grammar.get_grammar()
+    compound_stmt = compiled.first_sets[compiled.rule_id(rn.COMPOUND_STMT)]
+    assert frozenset({'def'}) in compound_stmt
+    assert None not in compound_stmt
+    engine = parser.PegEngine(line_record.split_text_to_lines('x = 1'), compiled)
+    config = parser.Config(mode=terms.MODE_SAFE)
+    engine.lex(config)
+    term, _ = engine.apply_rule(0, compiled.rule_id(rn.STATEMENT), config)
+    assert isinstance(term, terms.Assign)
+    # Every keyword-led compound statement is skipped without being tried on a name.
+    assert engine.prediction_stats()[rn.COMPOUND_STMT] == len(compound_stmt) - 1
+
+
+def test_memo_per_config():
+    compiled = grammar.get_grammar()
+    engine = parser.PegEngine(line_record.split_text_to_lines('x'), compiled)
+    engine.lex(parser.Config(mode=terms.MODE_SAFE))
+    atom = compiled.rule_id(rn.ATOM)
+    safe, _ = engine.apply_rule(0, atom, parser.Config(mode=terms.MODE_SAFE))
+    evaluate, _ = engine.apply_rule(0, atom, parser.Config(mode=terms.MODE_EVALUATE))
+    assert isinstance(safe, terms.TypedName)
+    assert safe.mode is terms.MODE_SAFE
+    assert isinstance(evaluate, terms.TypedName)
+    assert evaluate.mode is terms.MODE_EVALUATE
+    # An equal config reuses the memoized result.
+    assert engine.apply_rule(0, atom, parser.Config(mode=terms.MODE_SAFE))[0] is safe
+    assert len(engine.configs) == 2
+
+
+GRAMMAR = grammar.get_grammar()
+
+
+def reparse(text: str, previous: parser.IncrementalPegEngine | None = None):
+    engine = parser.IncrementalPegEngine(line_record.split_text_to_lines(text), GRAMMAR, previous)
+    return parser.parse_with_engine(engine, parser.Config(mode=terms.MODE_SAFE)), engine
+
+
+def test_incremental_reparse():
+    old_text = 'x = f(a + b,\n      c * d,\n      e)\n'
+    _, previous = reparse(old_text)
+    for new_text in [
+        'x = f(a + b,\n      c * dd,\n      e)\n',
+        'x = f(a + b,\n      c *,\n      e)\n',
+        'x = f(a - b,\n      c * d,\n      e)\n',
+        'x = f(a + b,\n      c * d,\n      e)[0]\n',
+    ]:
+        term, engine = reparse(new_text, previous)
+        assert engine.reused_cells > 0
+        assert repr(term) == repr(reparse(new_text)[0])
+    # The cells of the unchanged trailing lines are shifted, the others start before the edit.
+    _, engine = reparse('x = f(a + bb,\n      c * d,\n      e)\n', previous)
+    expression = GRAMMAR.rule_id(rn.EXPRESSION)
+    old_cell = previous.cell_memo.get(len('x = f(a + b,\n      c * d,'), expression, 1)
+    new_cell = engine.cell_memo.get(len('x = f(a + bb,\n      c * d,'), expression, 1)
+    assert old_cell is not None
+    assert new_cell is not None
+    assert isinstance(new_cell.term, terms.TypedName)
+    assert new_cell.term is old_cell.term
+
+
+def test_deferred_terms():
+    for text in ['a.b[c].d = f(x, y)[1:2]\n', 'x = [(a, b.c[i]), {1: -2, 3: not 4}]\n', 'x = (1 +\n']:
+        eager = parser.parse_text(text, GRAMMAR)
+        deferred = parser.parse_text(text, GRAMMAR, deferred_terms=True)
+        assert repr(deferred) == repr(eager)
+
+
 def test_t_primary__atom_failed():
     actual = parse_expr('variable', rn.T_PRIMARY, mode=terms.MODE_EVALUATE)
     expected = parser.ParseFailed
@@ -1129,6 +1219,12 @@ def test_inversion__not():
     assert actual == expected
 
 
+def test_inversion__double_not():
+    actual = parse_expr('not not flag', rn.INVERSION, mode=terms.MODE_EVALUATE)
+    assert isinstance(actual, terms.BoolNot)
+    assert isinstance(actual.operand, terms.BoolNot)
+
+
 def test_inversion__single():
     actual = parse_expr('flag', rn.INVERSION, mode=terms.MODE_EVALUATE)
     expected = terms.TypedName(location=create_loc(1, 0, 1, 4), id='flag', ctx='load', mode=terms.MODE_EVALUATE)
@@ -1188,6 +1284,24 @@ def test_comparison__operators():
         assert actual == expected, f'Failed for operator: {expr}'
 
 
+def test_comparison__bitwise_operand():
+    actual = parse_expr('a < b | c', rn.COMPARISON, mode=terms.MODE_EVALUATE)
+    expected = terms.Compare(
+        location=create_loc(1, 0, 1, 9),
+        left=terms.TypedName(location=create_loc(1, 0, 1, 1), id='a', ctx='load', mode=terms.MODE_EVALUATE),
+        operators=['<'],
+        comparators=[
+            terms.BinOp(
+                location=create_loc(1, 3, 1, 9),
+                left=terms.TypedName(location=create_loc(1, 4, 1, 5), id='b', ctx='load', mode=terms.MODE_EVALUATE),
+                op='|',
+                right=terms.TypedName(location=create_loc(1, 8, 1, 9), id='c', ctx='load', mode=terms.MODE_EVALUATE),
+            ),
+        ],
+    )
+    assert actual == expected
+
+
 def test_bitwise_or__chain():
     actual = parse_expr('a | b | c', rn.BITWISE_OR, mode=terms.MODE_EVALUATE)
     expected = terms.BinOp(
@@ -1399,6 +1513,26 @@ def test_power__binary():
     assert actual == expected
 
 
+def test_power__right_associative():
+    actual = parse_expr('a ** -b ** c', rn.POWER, mode=terms.MODE_EVALUATE)
+    expected = terms.BinOp(
+        location=create_loc(1, 0, 1, 12),
+        left=terms.TypedName(location=create_loc(1, 0, 1, 1), id='a', ctx='load', mode=terms.MODE_EVALUATE),
+        op='**',
+        right=terms.UnaryOp(
+            location=create_loc(1, 4, 1, 12),
+            op='-',
+            operand=terms.BinOp(
+                location=create_loc(1, 6, 1, 12),
+                left=terms.TypedName(location=create_loc(1, 6, 1, 7), id='b', ctx='load', mode=terms.MODE_EVALUATE),
+                op='**',
+                right=terms.TypedName(location=create_loc(1, 11, 1, 12), id='c', ctx='load', mode=terms.MODE_EVALUATE),
+            ),
+        ),
+    )
+    assert actual == expected
+
+
 def test_power__single():
     actual = parse_expr('a', rn.POWER, mode=terms.MODE_EVALUATE)
     expected = terms.TypedName(location=create_loc(1, 0, 1, 1), id='a', ctx='load', mode=terms.MODE_EVALUATE)
@@ -0,0 +1,141 @@
+# Part of the Tapl Language project, under the Apache License v2.0 with LLVM
+# Exceptions. See /LICENSE for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+from __future__ import annotations
+
+import concurrent.futures
+import pathlib
+from collections.abc import Callable, Iterator
+from typing import Any, TypeVar, cast
+
+import pytest
+
+from tapl_lang.core import chunker, language, syntax, tapl_error
+from tapl_lang.core.language import ParseSession
+from tapl_lang.lib import terms
+from tapl_lang.pythonlike.language import PythonlikeLanguage
+
+T = TypeVar('T')
+
+
+def parse_module(
+    text: str,
+    session: ParseSession | None = None,
+    executor: concurrent.futures.Executor | None = None,
+) -> terms.Module:
+    pythonlike = PythonlikeLanguage()
+    module = terms.Module(body=[syntax.TermList(terms=[], is_placeholder=True)])
+    if session is None:
+        pythonlike.parse_chunks(chunker.chunk_text(text), [module], executor=executor)
+    else:
+        session.parse_chunks(pythonlike, chunker.chunk_text(text), [module])
+    return module
+
+
+def test_session_reparse_is_edit_sized():
+    lines = [f'def f{i}(a: Int, b: Int):\n    c = a + b * {i}\n    return c\n' for i in range(100)]
+    session = ParseSession()
+    parse_module(''.join(lines), session)
+    assert session.parsed_chunks == 300
+    lines[50] = lines[50].replace('a + b', 'a - b')
+    module = parse_module(''.join(lines), session)
+    # Only the edited statement is parsed again.
+    assert (session.parsed_chunks, session.reused_chunks) == (1, 299)
+    assert repr(module) == repr(parse_module(''.join(lines)))
+
+
+def test_session_reuses_moved_chunks():
+    lines = [f'def f{i}(a: Int, b: Int):\n    c = a + b * {i}\n    return c\n' for i in range(100)]
+    # Lines inserted or deleted above chunks move them without parsing them again, and their locations follow. The
+    # empty lines extend the last chunk of f49.
+    for edited, counts in [
+        (['x = 1\n', *lines], (1, 300)),
+        (lines[1:], (0, 297)),
+        (['pass\n', *lines[:50], '\n\n', *lines[50:], 'pass\n'], (3, 299)),
+    ]:
+        session = ParseSession()
+        parse_module(''.join(lines), session)
+        module = parse_module(''.join(edited), session)
+        assert (session.parsed_chunks, session.reused_chunks) == counts
+        assert repr(module) == repr(parse_module(''.join(edited)))
+
+
+def test_session_moves_the_locations_of_goldens():
+    goldens = pathlib.Path(__file__).parent / 'goldens'
+    for source_path in sorted(goldens.glob('*.tapl')):
+        # The language clause is parsed by the compiler.
+        text = source_path.read_text().split('\n', 1)[1]
+        session = ParseSession()
+        parse_module(text, session)
+        parse_module(text, session)
+        # Only the terms modified by sibling terms are parsed again.
+        parsed_chunks = session.parsed_chunks
+        module = parse_module('# moved\n\n' + text, session)
+        assert session.parsed_chunks == parsed_chunks, source_path.name
+        assert repr(module) == repr(parse_module('# moved\n\n' + text)), source_path.name
+
+
+def test_parallel_parse(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(language, 'PARALLEL_BATCH_LINES', 10)
+    statements = [
+        f'try:\n    a = f{i}(b)\nexcept E{i}:\n    pass\nfinally:\n    c = {i}\n'
+        + (f'd = (e{i}\n' if i % 7 == 0 else f'if g{i}:\n    h = [{i}]\nelse:\n    h = []\n')
+        for i in range(40)
+    ]
+    text = ''.join(statements)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+        module = parse_module(text, executor=executor)
+        # The clauses split across batches are integrated into their statements, and the errors are in order.
+        assert repr(module) == repr(parse_module(text))
+        body = cast('syntax.TermList', module.body[0]).terms
+        assert len(body) == 80
+        assert [i for i, term in enumerate(body) if isinstance(term, syntax.ErrorTerm)] == list(range(1, 80, 14))
+        with pytest.raises(tapl_error.TaplError, match='does not support profiles and sessions'):
+            PythonlikeLanguage().parse_chunks(
+                chunker.chunk_text(text), [module], session=ParseSession(), executor=executor
+            )
+
+
+class CountingExecutor(concurrent.futures.ThreadPoolExecutor):
+    def __init__(self, read_lines: list[int]) -> None:
+        super().__init__(max_workers=2)
+        # Number of lines read from the source when each batch was submitted.
+        self.read_lines = read_lines
+        self.submitted_at: list[int] = []
+
+    def submit(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> concurrent.futures.Future[T]:
+        self.submitted_at.append(self.read_lines[0])
+        return super().submit(fn, *args, **kwargs)
+
+
+def test_parallel_parse_batches(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(language, 'PARALLEL_BATCH_LINES', 100)
+    # Functions of 8 lines, which are batched by all their lines, not only by their first line.
+    body = ''.join(f'    a{i} = b + {i}\n' for i in range(7))
+    lines = [line for i in range(100) for line in f'def f{i}(b: Int):\n{body}'.splitlines(keepends=True)]
+    read_lines = [0]
+
+    def read() -> Iterator[str]:
+        for line in lines:
+            read_lines[0] += 1
+            yield line
+
+    pythonlike = PythonlikeLanguage()
+    module = terms.Module(body=[syntax.TermList(terms=[], is_placeholder=True)])
+    with CountingExecutor(read_lines) as executor:
+        pythonlike.parse_chunks(chunker.chunk_stream(read()), [module], executor=executor)
+    assert repr(module) == repr(parse_module(''.join(lines)))
+    # 13 functions fill a batch of 100 lines, which is submitted before the next functions are read.
+    assert len(executor.submitted_at) == 8
+    assert executor.submitted_at[0] < 14 * 8
+
+
+def test_parallel_parse_needs_a_grammar_without_parents():
+    class ParentDependentLanguage(PythonlikeLanguage):
+        grammar_depends_on_parents = True
+
+    module = terms.Module(body=[syntax.TermList(terms=[], is_placeholder=True)])
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    with executor, pytest.raises(tapl_error.TaplError, match='depends on the parents of the chunks'):
+        ParentDependentLanguage().parse_chunks(chunker.chunk_text('a = 1\n'), [module], executor=executor)
@@ -0,0 +1,134 @@
+# Part of the Tapl Language project, under the Apache License v2.0 with LLVM
+# Exceptions. See /LICENSE for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+# Benchmarks measure parse cost as the number of parse function calls, which is deterministic unlike wall time. Only
+# the engines are compared by wall time, as they make the same calls at a different cost.
+
+from __future__ import annotations
+
+import time
+
+from tapl_lang.core import line_record, parser, syntax
+from tapl_lang.lib import terms
+from tapl_lang.pythonlike import grammar
+from tapl_lang.pythonlike import rule_names as rn
+
+
+class CountingEngine(parser.PegEngine):
+    def __init__(self, line_records: list[line_record.LineRecord], grammar: parser.CompiledGrammar):
+        super().__init__(line_records, grammar)
+        self.call_count = 0
+
+    def call_parse_function(
+        self, offset: int, rule: int, function: parser.CompiledParseFunction, config: parser.Config
+    ) -> tuple[syntax.Term, int]:
+        self.call_count += 1
+        return super().call_parse_function(offset, rule, function, config)
+
+
+def parse_cost(text: str, rule: str) -> tuple[syntax.Term, int]:
+    compiled = grammar.get_grammar()
+    engine = CountingEngine(line_record.split_text_to_lines(text), compiled)
+    config = parser.Config(mode=terms.MODE_EVALUATE)
+    engine.lex(config)
+    term, next_offset = engine.apply_rule(0, compiled.rule_id(rule), config)
+    assert next_offset == len(text)
+    return term, engine.call_count
+
+
+def test_left_recursion_is_linear():
+    term, cost = parse_cost('.'.join(f'a{i}' for i in range(1000)), rn.PRIMARY)
+    assert isinstance(term, terms.Attribute)
+    _, double_cost = parse_cost('.'.join(f'a{i}' for i in range(2000)), rn.PRIMARY)
+    assert double_cost < 2.1 * cost
+
+
+def test_operator_chain_is_linear():
+    term, cost = parse_cost(' + '.join(f'a{i}' for i in range(1000)), rn.EXPRESSION)
+    assert isinstance(term, terms.BinOp)
+    _, double_cost = parse_cost(' + '.join(f'a{i}' for i in range(2000)), rn.EXPRESSION)
+    assert double_cost < 2.1 * cost
+
+
+def test_comma_separated_lists_are_linear():
+    for template in ['[{}]', 'f({})', '{{{}}}']:
+        element = 'a{0}: {0}' if template.startswith('{') else 'a{0}'
+        text = template.format(', '.join(element.format(i) for i in range(2000)))
+        _, cost = parse_cost(text, rn.EXPRESSION)
+        double_text = template.format(', '.join(element.format(i) for i in range(4000)))
+        _, double_cost = parse_cost(double_text, rn.EXPRESSION)
+        assert double_cost < 2.05 * cost
+
+
+def memo_high_water(text: str) -> int:
+    engine = parser.PegEngine(line_record.split_text_to_lines(text), grammar.get_grammar())
+    term = parser.parse_with_engine(engine, parser.Config(mode=terms.MODE_SAFE))
+    assert isinstance(term, terms.Assign)
+    return engine.cell_memo.high_water
+
+
+def test_memo_is_bounded_by_commit_points():
+    # The parse commits after the closing bracket of each element of a long list, so the memo does not grow with it.
+    high_water = memo_high_water('x = [' + ', '.join(f'f(a{i}) + {i}' for i in range(1000)) + ']\n')
+    assert high_water <= parser.MEMO_SHRINK_SIZE + 1
+    assert memo_high_water('x = [' + ', '.join(f'f(a{i}) + {i}' for i in range(4000)) + ']\n') == high_water
+
+
+def test_strict_engine_reuses_cursors():
+    text = 'x = [' + ', '.join(f'f(a{i}.b[{i}], {i} + c * (d - {i}))' for i in range(300)) + ']\n'
+    config = parser.Config(mode=terms.MODE_SAFE)
+    tolerant = CountingEngine(line_record.split_text_to_lines(text), grammar.get_grammar())
+    strict = parser.StrictPegEngine(line_record.split_text_to_lines(text), grammar.get_grammar())
+    assert repr(parser.parse_with_engine(strict, config)) == repr(parser.parse_with_engine(tolerant, config))
+    # The tolerant engine allocates a cursor per parse function call, the strict engine one per nesting level.
+    assert tolerant.call_count > 30_000
+    assert len(strict.free_cursors) < 30
+
+
+def parse_function_call_times(text: str, engine_classes: list[type[parser.PegEngine]]) -> list[float]:
+    """Returns the best time each engine takes for a batch of calls of a parse function, timing the engines in turn."""
+    compiled = grammar.get_grammar()
+    config = parser.Config(mode=terms.MODE_SAFE)
+    rule = compiled.rule_id(rn.ATOM)
+    function = compiled.rules[rule][0]
+    engines = [engine_class(line_record.split_text_to_lines(text), compiled) for engine_class in engine_classes]
+    for engine in engines:
+        engine.lex(config)
+    best = [float('inf')] * len(engines)
+    for _ in range(15):
+        for index, engine in enumerate(engines):
+            start = time.perf_counter()
+            for _ in range(2000):
+                engine.call_parse_function(0, rule, function, config)
+            best[index] = min(best[index], time.perf_counter() - start)
+    return best
+
+
+def test_strict_engine_calls_parse_functions_faster():
+    # Whole parses are dominated by the memo, which both engines share, and their wall time varies with the depth of
+    # the interpreter stack they start at. So the calls of a parse function are timed, which is what the engines do
+    # differently.
+    text = 'x = [' + ', '.join(f'f(a{i}.b[{i}], {i} + c * (d - {i}))' for i in range(300)) + ']\n'
+    tolerant, strict = parse_function_call_times(text, [parser.PegEngine, parser.StrictPegEngine])
+    assert strict < tolerant
+
+
+def parse_nested_lists(depth: int) -> tuple[syntax.Term, int]:
+    text = 'x = ' + '[' * depth + '1' + ']' * depth + '\n'
+    engine = parser.StackPegEngine(line_record.split_text_to_lines(text), grammar.get_grammar())
+    return parser.parse_with_engine(engine, parser.Config(mode=terms.MODE_SAFE)), engine.evaluations
+
+
+def test_deeply_nested_lists():
+    # Far beyond the interpreter recursion limit, as the rule applications run on the explicit stack of the engine.
+    term, cost = parse_nested_lists(10_000)
+    assert isinstance(term, terms.Assign)
+    depth = 0
+    value = term.value
+    while isinstance(value, terms.TypedList):
+        depth += 1
+        value = value.elements[0]
+    assert depth == 10_000
+    _, tenth_cost = parse_nested_lists(1000)
+    assert cost < 10.5 * tenth_cost